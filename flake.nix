@@ -30,6 +30,7 @@
         # ---------- Python environment (shared) ----------
         pythonEnv = pkgs.python3.withPackages (ps: with ps; [
           # Lightweight set used by lab/simulation helper scripts.
+          pyyaml        # assertions.yaml specs (python -m hdlwaves check)
         ]);
 
         # ---------- Python environment for site building ----------
@@ -113,6 +114,12 @@
           echo "  See the README in each lab/lecture/project directory for usage."
           echo ""
           unset -f __ver
+
+          # Vendored WaveDrom for offline waveform cells (no-op once present).
+          if [ -f shared/hdlwaves/fetch_wavedrom.py ]; then
+            python3 shared/hdlwaves/fetch_wavedrom.py >/dev/null 2>&1 \
+              || echo "  ⚠ WaveDrom not vendored (offline?) — notebooks will use the CDN."
+          fi
         '';
 
       in {
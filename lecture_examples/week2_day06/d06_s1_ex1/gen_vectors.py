@@ -24,45 +24,86 @@ Run with no args for 1000 random cases plus the four canonical edge cases:
 
 Pass `--count N` to produce a different number of cases. Pass `--seed S`
 to reproduce a specific vector set.
+
+Large regressions:
+  $ python3 gen_vectors.py --exhaustive             # all 65,536 (a, b) pairs
+  $ python3 gen_vectors.py --count 10000000 --shards 8 --mode edge
+  Wrote 10000000 vectors to 8 files (vectors_000.hex .. vectors_007.hex).
+
+This is the `adder8` spec of the course's vector engine (shared/hdlvectors):
+vectors are generated in chunks across a process pool (vectorised with
+NumPy when it is installed) and streamed to disk, and case i is a pure
+function of (seed, i), so a --seed gives the same files whatever the
+chunk, shard or worker count. --mode picks random, edge-biased,
+stratified or exhaustive coverage. Each shard is a complete $readmemh
+file; simulate them in parallel with the testbench's parameters
+overridden, e.g.
+
+  iverilog -g2012 -P tb_adder_file.MAX_VECTORS=1250000 \\
+           -P 'tb_adder_file.VECTOR_FILE="vectors_003.hex"' \\
+           -o sim_003.vvp tb_adder_file.v adder.v
+
+Other DUTs (ALU, multiplier, pipelined adder) use the same engine directly:
+  python -m hdlvectors gen alu4 --mode exhaustive -o alu_vectors.hex
 """
 
 import argparse
-import random
+import sys
+from pathlib import Path
+
+
+def _hdlvectors():
+    """Import the course vector engine from the repo's shared/ folder."""
+    try:
+        import hdlvectors
+    except ImportError:
+        here = Path(__file__).resolve().parent
+        for d in (here, *here.parents):
+            if (d / "shared" / "hdlvectors" / "__init__.py").is_file():
+                sys.path.insert(0, str(d / "shared"))
+                break
+        try:
+            import hdlvectors
+        except ImportError:
+            sys.exit("gen_vectors.py needs shared/hdlvectors "
+                     "(run from inside the course repo)")
+    return hdlvectors
 
 
 def main() -> None:
+    hv = _hdlvectors()
     ap = argparse.ArgumentParser()
     ap.add_argument("--count", type=int, default=1000)
     ap.add_argument("--seed",  type=int, default=0xD06)
     ap.add_argument("--out",   default="vectors.hex")
+    ap.add_argument("--mode", choices=hv.MODES, default="random",
+                    help="coverage mode (default: random after the edge cases)")
+    ap.add_argument("--exhaustive", action="store_true",
+                    help="enumerate all 65,536 (a, b) pairs (= --mode exhaustive)")
+    ap.add_argument("--shards", type=int, default=1,
+                    help="split into N files <out>_000.hex ... for parallel sims")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="generator processes (default: CPU count)")
+    ap.add_argument("--chunk", type=int, default=1 << 16,
+                    help="vectors generated per task")
+    ap.add_argument("--no-numpy", action="store_true",
+                    help="use the pure-Python generator (same output, slower)")
     args = ap.parse_args()
 
-    rng = random.Random(args.seed)
-    lines: list[str] = []
-
-    # Pin a few canonical edge cases at the top so head -3 always shows
-    # something interesting (matches the slide screenshot).
-    edge = [
-        (0x4F, 0x37),     # 0x4F + 0x37 = 0x86
-        (0x1C, 0xE9),     # 0x1C + 0xE9 = 0x105
-        (0xFF, 0xFF),
-        (0x00, 0x00),
-    ]
-
-    for a, b in edge:
-        lines.append(f"{a:02X}{b:02X}_{(a + b):04X}")
-
-    remaining = max(0, args.count - len(edge))
-    for _ in range(remaining):
-        a = rng.randint(0, 255)
-        b = rng.randint(0, 255)
-        lines.append(f"{a:02X}{b:02X}_{(a + b):04X}")
-
-    with open(args.out, "w") as fh:
-        fh.write("\n".join(lines))
-        fh.write("\n")
-
-    print(f"Wrote {len(lines)} vectors.")
+    mode = "exhaustive" if args.exhaustive else args.mode
+    try:
+        res = hv.generate(hv.SPECS["adder8"], args.out, count=args.count,
+                          mode=mode, seed=args.seed, shards=args.shards,
+                          workers=args.workers, chunk=args.chunk, header=False,
+                          use_numpy=False if args.no_numpy else None)
+    except ValueError as exc:
+        sys.exit(f"gen_vectors.py: {exc}")
+
+    if len(res.paths) == 1:
+        print(f"Wrote {res.vectors} vectors.")
+    else:
+        print(f"Wrote {res.vectors} vectors to {len(res.paths)} files "
+              f"({res.paths[0].name} .. {res.paths[-1].name}).")
 
 
 if __name__ == "__main__":
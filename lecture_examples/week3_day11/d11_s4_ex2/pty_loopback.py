@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+pty_loopback.py — d11_s4 helper, benchmark rx_display.py without a board
+
+Opens a pseudo-terminal pair and plays the Go Board's part on the master
+side: a repeating pattern (HELLO\\r\\n by default) paced at the line rate
+of the chosen baud (10 bits per 8N1 byte), optionally with an idle gap
+after each copy like the real emitter's ~200 ms. rx_display.py is then run
+on the slave side, exactly as it would open /dev/ttyUSB0:
+
+    $ python3 pty_loopback.py --baud 3000000 --seconds 5
+    [pty] /dev/pts/7 @ 3000000 for 5.0 s
+    [stats]    300.0 kB/s (100.0% of line)  rx 300580 B  overruns 0 ...
+    ...
+    [pty] sent 1500371 B, device dropped 0 B
+
+A pty has no real baud rate, so the pacing is done here. Bytes the
+kernel will not accept (reader too slow, pty buffer full) are dropped
+and counted, like a UART transmitter without flow control.
+
+--check turns it into a soak test for CI: the fake device injects faults
+(--drop-every / --dup-every / --corrupt-every N source bytes), runs
+rx_display.py --expect, and passes only if the receiver counted exactly
+the faults that were injected:
+
+    $ python3 pty_loopback.py --check --baud 921600 --seconds 3 \\
+          --drop-every 9973 --dup-every 7919 --corrupt-every 6007
+    ...
+    [check] PASS  dropped 28/28  duplicated 35/35  corrupted 46/46
+
+Keep faults sparse (a few pattern lengths apart), and note that this
+needs a POSIX pty, so it runs on Linux and macOS but not Windows.
+
+Use it as a library to feed your own receiver:
+
+    with FakeUart(baud=921600) as dev:
+        serial.Serial(dev.path, 921600).read(7)
+"""
+
+import argparse
+import json
+import os
+import pty
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tty
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+PATTERN = b"HELLO\r\n"
+TICK_S = 0.01               # pacing granularity: one write per 10 ms
+MAX_BAUD = 3_000_000
+CORRUPT_MASK = 0x40         # XORed into corrupted bytes
+SETTLE_S = 0.2              # let rx_display open the port before sending
+DRAIN_S = 1.0               # extra receive time after the device stops
+
+
+class FakeUart:
+    """
+    A pty whose master side transmits ``pattern`` forever at ``baud``.
+
+    ``path`` is the slave device to hand to pyserial; ``sent`` and
+    ``dropped`` count bytes accepted and refused by the pty. ``faults``
+    maps "drop" / "dup" / "corrupt" to an interval N: every Nth source
+    byte gets that fault, and ``injected`` counts the ones applied.
+    With ``hold=True`` nothing is sent until ``start()``.
+    """
+
+    def __init__(self, baud=115_200, pattern=PATTERN, gap_s=0.0,
+                 faults=None, hold=False):
+        if not 0 < baud <= MAX_BAUD:
+            raise ValueError(f"baud must be in 1..{MAX_BAUD}")
+        if not pattern:
+            raise ValueError("empty pattern")
+        self.baud = baud
+        self.pattern = pattern
+        self.gap_s = gap_s
+        self.faults = {k: v for k, v in (faults or {}).items() if v}
+        self.hold = hold
+        self.sent = 0
+        self.dropped = 0
+        self.injected = {"drop": 0, "dup": 0, "corrupt": 0}
+        self._pos = 0               # source bytes generated so far
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        os.set_blocking(self._master, False)
+        self.path = os.ttyname(self._slave)
+        if not self.hold:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._transmit, name="fake-uart",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop after finishing the current copy plus one clean copy."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _block(self, n, faults=True):
+        """The next ``n`` source bytes of the pattern, with faults applied."""
+        pat, pos = self.pattern, self._pos
+        start = pos % len(pat)
+        block = bytearray((pat * (2 + n // len(pat)))[start:start + n])
+        self._pos += n
+        if not (faults and self.faults):
+            return block
+        hits = {}                   # offset in block → fault (first wins)
+        for kind in ("drop", "dup", "corrupt"):
+            every = self.faults.get(kind)
+            if every:
+                for idx in range(pos + (-pos - 1) % every, pos + n, every):
+                    hits.setdefault(idx - pos, kind)
+        for j in sorted(hits, reverse=True):
+            kind = hits[j]
+            if kind == "drop":
+                del block[j]
+            elif kind == "dup":
+                block.insert(j, block[j])
+            else:
+                block[j] ^= CORRUPT_MASK
+            self.injected[kind] += 1
+        return block
+
+    def _due(self, elapsed):
+        """(source bytes due after ``elapsed`` s, seconds until the next write)."""
+        n = len(self.pattern)
+        rate = self.baud / 10.0           # bytes per second on the wire
+        frame_s = n / rate
+        full, rem = divmod(elapsed, frame_s + self.gap_s)
+        if rem >= frame_s:                # idle gap: sleep until the next copy
+            return int(full + 1) * n, frame_s + self.gap_s - rem
+        return int(full) * n + int(rem * rate), TICK_S
+
+    def _write(self, block):
+        try:
+            written = os.write(self._master, block)
+        except BlockingIOError:
+            written = 0
+        self.sent += written
+        self.dropped += len(block) - written
+
+    def _transmit(self):
+        start = time.monotonic()
+        stop_at = None
+        while True:
+            if stop_at is None and self._stop.is_set():
+                if not self.faults:
+                    return
+                # Finish the copy in flight plus one clean copy, so the
+                # receiver's lookahead can classify a fault near the end.
+                n = len(self.pattern)
+                stop_at = self._pos + (-self._pos) % n + n
+            due, wait = self._due(time.monotonic() - start)
+            if stop_at is not None:
+                due = min(due, stop_at)
+            try:
+                if due > self._pos:
+                    self._write(self._block(due - self._pos, faults=stop_at is None))
+            except OSError:                 # slave side went away
+                return
+            if stop_at is not None:
+                if self._pos >= stop_at:
+                    return
+                time.sleep(wait)
+            else:
+                self._stop.wait(wait)
+
+
+def _rx_display(dev, args, extra=()):
+    """Start rx_display.py on the pty; returns once the port is open."""
+    cmd = [sys.executable, str(HERE / "rx_display.py"), dev.path,
+           "--baud", str(args.baud), "--stats", "1",
+           "--duration", str(args.seconds + SETTLE_S + DRAIN_S), *extra]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE)
+    proc.stdout.readline()            # the "[port @ baud]" header
+    sink = sys.stdout.buffer if args.show else None
+
+    def drain():
+        for chunk in iter(lambda: proc.stdout.read1(1 << 16), b""):
+            if sink is not None:
+                sink.write(chunk)
+                sink.flush()
+
+    threading.Thread(target=drain, daemon=True).start()
+    time.sleep(SETTLE_S)
+    return proc
+
+
+def check(summary, dev) -> bool:
+    """Compare rx_display's counters with what the device injected."""
+    match = summary.get("match", {})
+    pairs = [("dropped", "drop"), ("duplicated", "dup"), ("corrupted", "corrupt")]
+    ok = (dev.dropped == 0 and match.get("resyncs") == 0
+          and match.get("frames", 0) > 0
+          and all(match.get(k) == dev.injected[f] for k, f in pairs))
+    counts = "  ".join(f"{k} {match.get(k)}/{dev.injected[f]}" for k, f in pairs)
+    print(f"[check] {'PASS' if ok else 'FAIL'}  {counts}  "
+          f"resyncs {match.get('resyncs')}  frames {match.get('frames')}",
+          file=sys.stderr)
+    if dev.dropped:
+        print(f"[check] device dropped {dev.dropped} B (receiver too slow); "
+              "counts are not comparable", file=sys.stderr)
+    return ok
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    ap.add_argument("--baud", type=int, default=115_200,
+                    help=f"simulated line rate (max {MAX_BAUD})")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--pattern", default="HELLO\\r\\n",
+                    help="repeating payload, Python escapes allowed")
+    ap.add_argument("--gap-ms", type=float, default=0.0,
+                    help="idle time after each copy of the pattern (board: ~200)")
+    ap.add_argument("--drop-every", type=int, default=0, metavar="N")
+    ap.add_argument("--dup-every", type=int, default=0, metavar="N")
+    ap.add_argument("--corrupt-every", type=int, default=0, metavar="N")
+    ap.add_argument("--check", action="store_true",
+                    help="run rx_display.py --expect and verify the fault counts")
+    ap.add_argument("--show", action="store_true",
+                    help="let rx_display.py print to the terminal")
+    args = ap.parse_args()
+
+    pattern = args.pattern.encode().decode("unicode_escape").encode("latin-1")
+    faults = {"drop": args.drop_every, "dup": args.dup_every,
+              "corrupt": args.corrupt_every}
+    extra = []
+    if args.check:
+        report = tempfile.NamedTemporaryFile(suffix=".json", delete=False)
+        report.close()
+        extra = ["--expect", args.pattern, "--json", report.name]
+
+    with FakeUart(args.baud, pattern, args.gap_ms / 1000.0, faults, hold=True) as dev:
+        print(f"[pty] {dev.path} @ {args.baud} for {args.seconds} s", file=sys.stderr)
+        proc = _rx_display(dev, args, extra)
+        dev.start()
+        time.sleep(args.seconds)
+        dev.stop()
+        rc = proc.wait()
+    print(f"[pty] sent {dev.sent} B, device dropped {dev.dropped} B", file=sys.stderr)
+
+    if not args.check:
+        return rc
+    try:
+        summary = json.loads(Path(report.name).read_text())
+    except (OSError, ValueError):
+        print("[check] FAIL  rx_display.py wrote no report", file=sys.stderr)
+        return 1
+    finally:
+        os.unlink(report.name)
+    return 0 if check(summary, dev) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
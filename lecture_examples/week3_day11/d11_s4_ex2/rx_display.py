@@ -19,11 +19,38 @@ Run with no args for the default port at 115200 baud:
 If your board enumerates somewhere else, pass it as the first arg
 (e.g. `python3 rx_display.py /dev/tty.usbserial-A1`).
 
+A background thread drains the port into a ring buffer with large reads,
+and the main thread writes to stdout in batches, so fast baud rates and
+slow terminals do not starve each other. For soak tests:
+
+    --stats 1       print throughput / error / gap statistics every second
+    --duration 30   stop after 30 s (prints final statistics)
+    > /dev/null     measure the link without the terminal in the way
+
+To check the stream instead of eyeballing it, give the expected repeating
+pattern; every byte is matched and the report adds dropped / duplicated /
+corrupted byte counts and the jitter of the frame-to-frame arrival time:
+
+    --expect 'HELLO\r\n' --stats 1
+    [match] frames 50  ok 350  dropped 0  dup 0  corrupt 0  resync 0 ...
+
+The exit status is 1 if any error was counted (or no frame arrived), and
+--json PATH writes the final counters for scripts.
+
+pty_loopback.py in this directory drives it from a fake device at up to
+3 Mbaud, with optional fault injection, so it can be benchmarked and
+checked in CI without a board.
+
 Requires `pyserial` — `pip install pyserial`.
 """
 
 import argparse
+import json
+import math
 import sys
+import threading
+import time
+from bisect import bisect_right
 
 try:
     import serial  # type: ignore
@@ -33,26 +60,373 @@ except ImportError:
         "Alternatively, run: screen /dev/ttyUSB0 115200"
     )
 
+RING_BYTES = 1 << 20        # 1 MiB: ~3.5 s of traffic at 3 Mbaud
+READ_BYTES = 1 << 14        # largest single read from the port
+FLUSH_S = 0.05              # stdout batching interval
+FLUSH_BYTES = 1 << 16       # ...or flush once this much is pending
+PORT_TIMEOUT_S = 0.1        # read timeout, bounds shutdown latency
+LOOKAHEAD = 4               # bytes that must agree before a repair is accepted
+MATCH_BLOCK = 4096          # bulk-compare size on the matcher's fast path
+
+
+class RingBuffer:
+    """
+    Fixed-size byte FIFO between the reader thread and the printer.
+
+    When the printer falls behind and the buffer fills, incoming bytes
+    are dropped and counted as overruns, like a UART FIFO would.
+    """
+
+    def __init__(self, size=RING_BYTES):
+        self._buf = bytearray(size)
+        self._size = size
+        self._head = 0          # next byte to read
+        self._len = 0
+        self._cond = threading.Condition()
+        self.overruns = 0
+
+    def __len__(self):
+        return self._len
+
+    def put(self, data):
+        with self._cond:
+            room = self._size - self._len
+            if len(data) > room:
+                self.overruns += len(data) - room
+                data = data[:room]
+            tail = (self._head + self._len) % self._size
+            first = min(len(data), self._size - tail)
+            self._buf[tail:tail + first] = data[:first]
+            self._buf[:len(data) - first] = data[first:]
+            self._len += len(data)
+            self._cond.notify()
+
+    def get(self, timeout):
+        """Everything buffered (waiting up to ``timeout`` for data)."""
+        with self._cond:
+            if not self._len:
+                self._cond.wait(timeout)
+            n, head = self._len, self._head
+            first = min(n, self._size - head)
+            out = bytes(self._buf[head:head + first]) + bytes(self._buf[:n - first])
+            self._head = (head + n) % self._size
+            self._len = 0
+            return out
+
+
+class LinkStats:
+    """Running counters for the --stats report (updated by the reader)."""
+
+    def __init__(self, baud, gap_s):
+        self.baud = baud
+        self.gap_s = gap_s
+        self.start = time.monotonic()
+        self.total = 0
+        self.errors = 0             # serial exceptions
+        self.suspect = 0            # bytes outside printable ASCII / CR / LF / TAB
+        self.gaps = 0
+        self.max_gap_s = 0.0
+        self._last_arrival = None
+        self._window_start = self.start
+        self._window_bytes = 0
+
+    def arrival(self, now, data):
+        if self._last_arrival is not None:
+            idle = now - self._last_arrival
+            if idle >= self.gap_s:
+                self.gaps += 1
+                self.max_gap_s = max(self.max_gap_s, idle)
+        self._last_arrival = now
+        self.total += len(data)
+        self._window_bytes += len(data)
+        self.suspect += sum(1 for b in data if b > 0x7E or (b < 0x20 and b not in b"\r\n\t"))
+
+    def report(self, overruns, final=False):
+        now = time.monotonic()
+        if final:
+            span, nbytes = now - self.start, self.total
+        else:
+            span, nbytes = now - self._window_start, self._window_bytes
+            self._window_start, self._window_bytes = now, 0
+        rate = nbytes / span if span > 0 else 0.0
+        load = 100.0 * rate * 10 / self.baud     # 10 line bits per 8N1 byte
+        label = "total" if final else "stats"
+        return (f"[{label}] {rate / 1000:8.1f} kB/s ({load:5.1f}% of line)  "
+                f"rx {self.total} B  overruns {overruns}  errors {self.errors}  "
+                f"suspect {self.suspect}  gaps {self.gaps} "
+                f"(max {self.max_gap_s * 1000:.0f} ms)")
+
+
+class PatternMatcher:
+    """
+    Streaming check of the received bytes against a repeating pattern.
+
+    Synchronises on the first complete copy of the pattern, then compares
+    in blocks. At a mismatch it waits for LOOKAHEAD more bytes and keeps
+    the first explanation under which they line up again: a duplicated
+    byte, 1..len-1 dropped bytes, or one corrupted byte. If none fits it
+    counts a resync and searches for the pattern again. Losses of whole
+    frames cannot be seen in a repeating pattern; they show up as gaps.
+
+    Frame timing: a frame ends at its last pattern byte. Arrival times are
+    only known per read, so earlier bytes of a read are back-dated from the
+    read's time by one character time (10 bits at ``baud``) each.
+    """
+
+    def __init__(self, pattern, baud):
+        if not pattern:
+            raise ValueError("empty pattern")
+        self.pattern = bytes(pattern)
+        self.byte_s = 10.0 / baud
+        n = len(self.pattern)
+        self._reps = self.pattern * (2 + (MATCH_BLOCK + LOOKAHEAD) // n)
+        self._hold = bytearray()
+        self._reads = []                # (end offset in _hold, arrival time)
+        self.phase = None               # index of the next expected byte
+        self.ok = self.dropped = self.duplicated = self.corrupted = 0
+        self.resyncs = 0
+        self.skipped = 0                # bytes discarded while unsynchronised
+        self.frames = 0
+        self._last_frame = None
+        self._n = 0                     # frame intervals seen (Welford)
+        self._mean = self._m2 = 0.0
+        self._lo, self._hi = math.inf, 0.0
+
+    @property
+    def errors(self):
+        return self.dropped + self.duplicated + self.corrupted + self.resyncs
+
+    def feed(self, data, now):
+        self._hold += data
+        self._reads.append((len(self._hold), now))
+        done = self._scan()
+        del self._hold[:done]
+        self._reads = [(end - done, t) for end, t in self._reads if end > done]
+
+    def _fits(self, start, phase):
+        return self._hold[start:start + LOOKAHEAD] == self._reps[phase:phase + LOOKAHEAD]
+
+    def _scan(self):
+        hold, pat, n = self._hold, self.pattern, len(self.pattern)
+        i, end = 0, len(hold)
+        while i < end:
+            p = self.phase
+            if p is None:
+                k = hold.find(pat, i)
+                if k < 0:
+                    keep = max(i, end - n + 1)
+                    self.skipped += keep - i
+                    return keep
+                self.skipped += k - i
+                self.phase, i = 0, k
+                continue
+            m = min(end - i, MATCH_BLOCK)
+            if hold[i:i + m] == self._reps[p:p + m]:
+                self.ok += m
+                self._advance(i, m)
+                i += m
+                continue
+            while hold[i] == pat[self.phase]:
+                self.ok += 1
+                self._advance(i, 1)
+                i += 1
+            if end - i <= LOOKAHEAD:
+                return i                # need more bytes to classify
+            i = self._repair(i)
+        return i
+
+    def _repair(self, i):
+        """Classify the mismatch at hold[i]; return the next index to scan."""
+        b, p, pat = self._hold[i], self.phase, self.pattern
+        n = len(pat)
+        if b == pat[p - 1] and self._fits(i + 1, p):
+            self.duplicated += 1
+            return i + 1
+        for k in range(1, n):
+            q = (p + k) % n
+            if b == pat[q] and self._fits(i + 1, (q + 1) % n):
+                self.dropped += k
+                self.ok += 1
+                self.phase = q
+                self._advance(i, 1)
+                return i + 1
+        if self._fits(i + 1, (p + 1) % n):
+            self.corrupted += 1
+            self._advance(i, 1)
+            return i + 1
+        self.resyncs += 1
+        self.phase = None
+        self._last_frame = None
+        return i
+
+    def _advance(self, i, m):
+        """Move the phase over hold[i:i+m], timing each frame that ends."""
+        n, p = len(self.pattern), self.phase
+        reads = self._reads
+        ends = [end for end, _ in reads]
+        for j in range(i + n - 1 - p, i + m, n):
+            end, now = reads[bisect_right(ends, j)]
+            t = now - (end - 1 - j) * self.byte_s
+            self.frames += 1
+            if self._last_frame is not None:
+                dt = t - self._last_frame
+                self._n += 1
+                delta = dt - self._mean
+                self._mean += delta / self._n
+                self._m2 += delta * (dt - self._mean)
+                self._lo, self._hi = min(self._lo, dt), max(self._hi, dt)
+            self._last_frame = t
+        self.phase = (p + m) % n
+
+    def summary(self):
+        std = math.sqrt(self._m2 / self._n) if self._n else 0.0
+        return {
+            "frames": self.frames, "ok": self.ok, "dropped": self.dropped,
+            "duplicated": self.duplicated, "corrupted": self.corrupted,
+            "resyncs": self.resyncs, "skipped": self.skipped,
+            "interval_ms": {
+                "mean": self._mean * 1e3, "std": std * 1e3,
+                "min": self._lo * 1e3 if self._n else 0.0, "max": self._hi * 1e3,
+            },
+        }
+
+    def report(self):
+        s = self.summary()
+        iv = s["interval_ms"]
+        return (f"[match] frames {s['frames']}  ok {s['ok']}  dropped {s['dropped']}  "
+                f"dup {s['duplicated']}  corrupt {s['corrupted']}  "
+                f"resync {s['resyncs']}  skipped {s['skipped']}  "
+                f"interval {iv['mean']:.3f} ms ±{iv['std']:.3f} "
+                f"(p-p {iv['max'] - iv['min']:.3f} ms)")
+
+
+class SerialReader(threading.Thread):
+    """Drain the port into a RingBuffer with as few syscalls as possible."""
+
+    def __init__(self, link, ring, stats, matcher=None):
+        super().__init__(name="serial-reader", daemon=True)
+        self.link = link
+        self.ring = ring
+        self.stats = stats
+        self.matcher = matcher
+        self.stop = threading.Event()
+        self.error = None
+
+    def run(self):
+        link = self.link
+        while not self.stop.is_set():
+            try:
+                # Block for the first byte, then take whatever else is queued.
+                data = link.read(1)
+                waiting = link.in_waiting
+                if data and waiting:
+                    data += link.read(min(waiting, READ_BYTES))
+            except (serial.SerialException, OSError) as exc:
+                self.stats.errors += 1
+                self.error = exc
+                break
+            if data:
+                now = time.monotonic()
+                self.stats.arrival(now, data)
+                if self.matcher is not None:
+                    self.matcher.feed(data, now)
+                self.ring.put(data)
+
+
+def run(link, args, out=sys.stdout):
+    """Echo the link to ``out`` until interrupted or --duration expires."""
+    ring = RingBuffer(args.ring)
+    stats = LinkStats(args.baud, args.gap_ms / 1000.0)
+    matcher = PatternMatcher(args.expect, args.baud) if args.expect else None
+    reader = SerialReader(link, ring, stats, matcher)
+    reader.start()
+
+    deadline = time.monotonic() + args.duration if args.duration else None
+    next_stats = time.monotonic() + args.stats if args.stats else None
+    pending, pending_len = [], 0
+    last_flush = time.monotonic()
+    try:
+        while reader.is_alive() or len(ring):
+            chunk = ring.get(FLUSH_S)
+            if chunk:
+                pending.append(chunk.decode("ascii", errors="replace"))
+                pending_len += len(chunk)
+            now = time.monotonic()
+            if pending and (pending_len >= FLUSH_BYTES or now - last_flush >= FLUSH_S):
+                out.write("".join(pending))
+                out.flush()
+                pending, pending_len = [], 0
+                last_flush = now
+            if next_stats is not None and now >= next_stats:
+                print(stats.report(ring.overruns), file=sys.stderr)
+                if matcher is not None:
+                    print(matcher.report(), file=sys.stderr)
+                next_stats = now + args.stats
+            if deadline is not None and now >= deadline:
+                break
+    finally:
+        reader.stop.set()
+        if pending:
+            out.write("".join(pending))
+            out.flush()
+        reader.join(timeout=2 * PORT_TIMEOUT_S)
+        if args.stats:
+            print(stats.report(ring.overruns, final=True), file=sys.stderr)
+        if matcher is not None:
+            print(matcher.report(), file=sys.stderr)
+        if args.json:
+            _write_json(args.json, stats, ring, matcher)
+    if reader.error is not None:
+        sys.exit(f"serial read failed: {reader.error}")
+    return matcher
+
+
+def _write_json(path, stats, ring, matcher):
+    summary = {
+        "baud": stats.baud, "seconds": time.monotonic() - stats.start,
+        "rx_bytes": stats.total, "overruns": ring.overruns,
+        "errors": stats.errors, "suspect": stats.suspect, "gaps": stats.gaps,
+    }
+    if matcher is not None:
+        summary["match"] = matcher.summary()
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+
 
 def main() -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("port", nargs="?", default="/dev/ttyUSB0")
     ap.add_argument("--baud", type=int, default=115_200)
+    ap.add_argument("--stats", type=float, default=0, metavar="SEC",
+                    help="report throughput/errors/gaps every SEC seconds (stderr)")
+    ap.add_argument("--duration", type=float, default=0, metavar="SEC",
+                    help="stop after SEC seconds (default: run until Ctrl-C)")
+    ap.add_argument("--gap-ms", type=float, default=20.0,
+                    help="idle time counted as a gap in the stats (default 20 ms)")
+    ap.add_argument("--ring", type=int, default=RING_BYTES,
+                    help=f"ring buffer size in bytes (default {RING_BYTES})")
+    ap.add_argument("--expect", metavar="PATTERN",
+                    help="verify the stream repeats PATTERN (Python escapes, "
+                         "e.g. 'HELLO\\r\\n')")
+    ap.add_argument("--json", metavar="PATH",
+                    help="write the final statistics as JSON")
     args = ap.parse_args()
+    if args.expect is not None:
+        args.expect = args.expect.encode().decode("unicode_escape").encode("latin-1")
+        if not args.expect:
+            ap.error("--expect needs a non-empty pattern")
 
-    print(f"[{args.port} @ {args.baud}]")
+    print(f"[{args.port} @ {args.baud}]", flush=True)
     try:
-        with serial.Serial(args.port, args.baud, timeout=1) as link:
-            while True:
-                chunk = link.read(64)
-                if chunk:
-                    sys.stdout.write(chunk.decode("ascii", errors="replace"))
-                    sys.stdout.flush()
+        with serial.Serial(args.port, args.baud, timeout=PORT_TIMEOUT_S) as link:
+            matcher = run(link, args)
     except serial.SerialException as exc:
         sys.exit(f"serial open failed: {exc}")
     except KeyboardInterrupt:
         print()
         return 0
+    if matcher is not None and (matcher.errors or not matcher.frames):
+        return 1
     return 0
 
 
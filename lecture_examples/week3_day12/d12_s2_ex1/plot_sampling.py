@@ -23,13 +23,51 @@ frame survives. The function below tabulates that cutoff for K in {4, 8, 16,
 
 Run with no arguments for an ASCII table; pass --plot to render a matplotlib
 figure (requires matplotlib).
+
+The bound is a worst case and says nothing about *how often* a receiver
+fails. --mc replaces it with a Monte Carlo simulation (requires NumPy) of
+the same receiver: random start phase against the RX tick grid, TX drift,
+random per-edge jitter, noise glitches and an optional majority voter, over
+millions of random frames per configuration. It prints bit-error-rate
+curves (one column per oversample rate / voter width); with --plot they
+are drawn on a log axis.
+
+    python3 plot_sampling.py --mc                          # 1M frames/config
+    python3 plot_sampling.py --mc --jitter 0.05 --glitch 1e-3 --voters 1 3
+    python3 plot_sampling.py --mc --jitter 0.03 --jitter-dist uniform --csv ber.csv
+
+Model (times in RX bit periods):
+  * TX bit j starts at t0 + j*(1+d) plus that edge's jitter (gauss: sigma
+    = --jitter UI; uniform: +-jitter UI), d = drift. Jitter is clipped to
+    0.45 UI so edges stay in order. The sign of d matters here: the late
+    start detection pulls samples later, which a slow TX (d > 0) partly
+    cancels and a fast TX (d < 0) makes worse.
+  * The RX sees the start edge on its next oversample tick, then samples
+    bit j (start, data 0..7, stop) at tick j*K + K/2 after it. A V-wide
+    voter takes the majority of the V ticks centered there.
+  * A noise glitch flips one sample with probability --glitch (glitches
+    shorter than a tick, so neighbouring voter samples fail independently).
+  * A start bit that reads 1 at its center loses the frame (all 8 data bits
+    count as errors); a stop bit that reads 0 is a framing error.
+Configurations run in parallel worker processes; each has its own seeded
+stream, so results do not depend on --workers.
 """
 
 import argparse
 import math
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # the closed-form table needs only the stdlib
+    np = None
 
 FRAME_BITS = 10  # start + 8 data + stop
+DATA_BITS = 8
+MC_CHUNK = 1 << 16     # frames per NumPy batch
+JITTER_CLIP = 0.45     # UI; keeps jittered edges in order
 
 
 def last_correct_bit(os_rate: int, drift_pct: float) -> int:
@@ -44,12 +82,175 @@ def last_correct_bit(os_rate: int, drift_pct: float) -> int:
     return min(last, FRAME_BITS - 1)
 
 
+def simulate_frames(rng, n: int, os_rate: int, drift_pct: float, jitter: float,
+                    jitter_dist: str, glitch: float, voter: int) -> tuple:
+    """Simulate n random 8N1 frames; return (data-bit errors, frame errors)."""
+    k = os_rate
+    period = 1.0 + drift_pct / 100.0
+
+    # Line levels per TX bit: start, 8 data, stop, then idle high.
+    data = rng.integers(0, 2, size=(n, DATA_BITS), dtype=np.int8)
+    levels = np.ones((n, FRAME_BITS + 2), dtype=np.int8)
+    levels[:, 0] = 0
+    levels[:, 1:1 + DATA_BITS] = data
+
+    # Edge j (start of TX bit j) relative to the start edge t0 = 0.
+    j = np.arange(FRAME_BITS + 2)
+    edges = np.broadcast_to(j * period, (n, FRAME_BITS + 2)).copy()
+    if jitter > 0 and jitter_dist != "none":
+        if jitter_dist == "gauss":
+            noise = rng.normal(0.0, jitter, size=(n, FRAME_BITS + 1))
+        else:
+            noise = rng.uniform(-jitter, jitter, size=(n, FRAME_BITS + 1))
+        edges[:, 1:] += np.clip(noise, -JITTER_CLIP, JITTER_CLIP)
+
+    # Start detection lands on the next RX tick after t0 (phase uniform).
+    detect = 1.0 / k - rng.uniform(0.0, 1.0 / k, size=n)
+    offsets = np.arange(voter) - voter // 2
+    ticks = (np.arange(FRAME_BITS)[:, None] * k + k // 2 + offsets) / k
+    t = detect[:, None, None] + ticks                       # (n, bits, voter)
+
+    # Which TX bit each sample falls in: the nominal index, corrected by
+    # the jitter of the two edges around it.
+    idx = np.clip(np.floor(t / period).astype(np.intp), 0, FRAME_BITS)
+    flat = idx.reshape(n, -1)
+    lo = np.take_along_axis(edges, flat, axis=1).reshape(idx.shape)
+    hi = np.take_along_axis(edges, flat + 1, axis=1).reshape(idx.shape)
+    idx = idx - (t < lo) + (t >= hi)
+    samples = np.take_along_axis(levels, idx.reshape(n, -1), axis=1).reshape(idx.shape)
+
+    if glitch > 0:
+        samples ^= (rng.random(samples.shape) < glitch).astype(np.int8)
+    bits = (samples.sum(axis=2) * 2 > voter).astype(np.int8)  # majority vote
+
+    lost = bits[:, 0] == 1                                  # start check failed
+    wrong = (bits[:, 1:1 + DATA_BITS] != data).sum(axis=1)
+    wrong[lost] = DATA_BITS
+    framing = lost | (bits[:, FRAME_BITS - 1] == 0)
+    return int(wrong.sum()), int((framing | (wrong > 0)).sum())
+
+
+def run_config(cfg: dict) -> dict:
+    """One grid point, in chunks of MC_CHUNK frames (runs in a worker)."""
+    rng = np.random.default_rng(cfg["seed"])
+    bit_errs = frame_errs = 0
+    left = cfg["frames"]
+    while left > 0:
+        n = min(left, MC_CHUNK)
+        b, f = simulate_frames(rng, n, cfg["rate"], cfg["drift"], cfg["jitter"],
+                               cfg["jitter_dist"], cfg["glitch"], cfg["voter"])
+        bit_errs += b
+        frame_errs += f
+        left -= n
+    return dict(cfg, ber=bit_errs / (cfg["frames"] * DATA_BITS),
+                fer=frame_errs / cfg["frames"])
+
+
+def monte_carlo(args) -> int:
+    if np is None:
+        print("plot_sampling --mc needs NumPy (pip install numpy).", file=sys.stderr)
+        return 1
+    for v in args.voters:
+        if v < 1 or v % 2 == 0 or any(v >= r for r in args.rates):
+            print(f"--voters: {v} must be odd and below every --rates value",
+                  file=sys.stderr)
+            return 2
+
+    # Seed per grid point, independent of how the grid is split over workers.
+    grid = [(r, v, d) for r in args.rates for v in args.voters for d in args.drifts]
+    seeds = np.random.SeedSequence(args.seed).spawn(len(grid))
+    cfgs = [{"rate": r, "voter": v, "drift": d, "frames": args.frames,
+             "jitter": args.jitter, "jitter_dist": args.jitter_dist,
+             "glitch": args.glitch, "seed": s}
+            for (r, v, d), s in zip(grid, seeds)]
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(cfgs)))
+    if workers == 1:
+        results = [run_config(c) for c in cfgs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_config, cfgs))
+
+    cols = [(r, v) for r in args.rates for v in args.voters]
+    by_key = {(x["rate"], x["voter"], x["drift"]): x for x in results}
+    floor = 1.0 / (args.frames * DATA_BITS)
+    print(f"UART RX Monte Carlo: {args.frames} frames/config, jitter "
+          f"{args.jitter} UI ({args.jitter_dist}), glitch {args.glitch}/sample")
+    print(f"(value = data bit-error rate; '0' means below {floor:.0e})\n")
+    header = "Drift    " + "".join(
+        f"{f'{r}x' + (f'/v{v}' if v > 1 else ''):>10}" for r, v in cols)
+    print(header)
+    print("-" * len(header))
+    for d in args.drifts:
+        cells = "".join(f"{_ber(by_key[(r, v, d)]['ber']):>10}" for r, v in cols)
+        print(f"{d:+5.1f}%  {cells}")
+
+    if args.csv:
+        with open(args.csv, "w") as fh:
+            fh.write("rate,voter,drift_pct,jitter_ui,jitter_dist,glitch,frames,ber,fer\n")
+            for x in results:
+                fh.write(f"{x['rate']},{x['voter']},{x['drift']},{x['jitter']},"
+                         f"{x['jitter_dist']},{x['glitch']},{x['frames']},"
+                         f"{x['ber']:.6g},{x['fer']:.6g}\n")
+        print(f"\nWrote {len(results)} rows to {args.csv}")
+
+    if args.plot:
+        try:
+            import matplotlib.pyplot as plt
+        except ImportError:
+            print("matplotlib not installed; skipping --plot.", file=sys.stderr)
+            return 0
+        fig, ax = plt.subplots(figsize=(7, 4))
+        for r, v in cols:
+            ys = [max(by_key[(r, v, d)]["ber"], floor / 10) for d in args.drifts]
+            ax.semilogy(args.drifts, ys, marker="o",
+                        label=f"{r}x" + (f", {v}-sample vote" if v > 1 else ""))
+        ax.axhline(floor, color="gray", linestyle=":", label="resolution")
+        ax.set_xlabel("TX clock drift (%)")
+        ax.set_ylabel("Data bit-error rate")
+        ax.set_title(f"UART RX Monte Carlo (jitter {args.jitter} UI, "
+                     f"glitch {args.glitch})")
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend(fontsize=8)
+        fig.tight_layout()
+        plt.show()
+    return 0
+
+
+def _ber(value: float) -> str:
+    return "0" if value == 0 else f"{value:.2e}"
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--plot", action="store_true",
                     help="render a matplotlib figure (requires matplotlib)")
+    mc = ap.add_argument_group("Monte Carlo (--mc, requires NumPy)")
+    mc.add_argument("--mc", action="store_true",
+                    help="simulate random frames instead of the worst-case bound")
+    mc.add_argument("--frames", type=int, default=1_000_000,
+                    help="frames per configuration")
+    mc.add_argument("--rates", type=int, nargs="+", default=[4, 8, 16, 64])
+    mc.add_argument("--drifts", type=float, nargs="+",
+                    default=[-8.0, -6.0, -5.0, -4.0, -3.0, -2.0, 0.0,
+                             2.0, 3.0, 4.0, 5.0, 6.0, 8.0],
+                    help="TX clock drift values in percent (+ = TX slower)")
+    mc.add_argument("--jitter", type=float, default=0.0,
+                    help="per-edge jitter in UI (sigma for gauss, bound for uniform)")
+    mc.add_argument("--jitter-dist", choices=("gauss", "uniform", "none"),
+                    default="gauss")
+    mc.add_argument("--glitch", type=float, default=0.0,
+                    help="probability that a noise glitch flips any one sample")
+    mc.add_argument("--voters", type=int, nargs="+", default=[1],
+                    help="majority-voter widths to compare (odd, e.g. 1 3)")
+    mc.add_argument("--workers", type=int, default=None,
+                    help="worker processes (default: CPU count)")
+    mc.add_argument("--seed", type=int, default=12)
+    mc.add_argument("--csv", help="also write every grid point to this CSV")
     args = ap.parse_args(argv)
 
+    if args.mc:
+        return monte_carlo(args)
+
     rates = [4, 8, 16, 64]
     drifts = [0.0, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0]
 
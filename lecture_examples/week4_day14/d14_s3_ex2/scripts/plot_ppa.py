@@ -5,64 +5,156 @@ CSV summary and a Pareto plot (Fmax vs cell count).
 
 Usage:
     python scripts/plot_ppa.py logs/report_pipe*.txt
+    python scripts/plot_ppa.py --out sweep.png logs/sweep/*/report_*.txt
 
 Each input file is expected to contain at least:
     - a "Number of cells: <N>" line (yosys synth_ice40 stat output)
     - a "Max frequency for clock '<name>': <X> MHz" line (nextpnr-ice40 output)
 
-The PIPE value is recovered from the filename (report_pipe{N}.txt).
+The PIPE value is recovered from the filename (report_pipe{N}.txt); grid
+reports from sweep_ppa.py (report_pipe{N}_w{W}_s{S}.txt) also carry the
+width and nextpnr seed.
+
+Reports are scanned line by line, and each one is appended (once) to the
+SQLite history ppa_history.sqlite -- query it with scripts/ppa_db.py.
 
 Output:
-    - prints a CSV summary table to stdout
-    - writes logs/ppa_curve.png (Fmax vs cells) when matplotlib is available
+    - prints a CSV summary table to stdout (with width/seed/pareto columns
+      for grid reports)
+    - writes logs/ppa_curve.png (Fmax vs cells) when matplotlib is available;
+      for a grid, every point is plotted and the Pareto front is drawn
 """
 from __future__ import annotations
 
-import os
+import argparse
+import json
 import re
 import sys
 from pathlib import Path
 
-PIPE_RE = re.compile(r"report_pipe(\d+)\.txt$")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import ppa_db  # noqa: E402
+
+PIPE_RE = re.compile(r"report_pipe(\d+)(?:_w(\d+))?(?:_s(\d+))?\.txt$")
 CELLS_RE = re.compile(r"Number of cells:\s*(\d+)")
 FMAX_RE = re.compile(r"Max frequency for clock\s+'[^']*':\s*([0-9.]+)\s*MHz")
 
 
-def parse_report(path: Path) -> dict:
-    text = path.read_text(errors="ignore")
+def report_params(path: Path) -> dict:
     m = PIPE_RE.search(path.name)
-    pipe = int(m.group(1)) if m else -1
+    return {"pipe": int(m.group(1)) if m else -1,
+            "width": int(m.group(2)) if m and m.group(2) else None,
+            "seed": int(m.group(3)) if m and m.group(3) else None}
 
-    # Take the LAST cells / fmax match in case the file contains both yosys
-    # (per-pass) and final-summary lines.
-    cells_matches = CELLS_RE.findall(text)
-    fmax_matches = FMAX_RE.findall(text)
-    cells = int(cells_matches[-1]) if cells_matches else None
-    fmax = float(fmax_matches[-1]) if fmax_matches else None
 
-    return {"pipe": pipe, "cells": cells, "fmax_mhz": fmax, "path": str(path)}
+def parse_report(path: Path) -> dict:
+    # Stream the file and keep the LAST cells / fmax match, in case it
+    # contains both yosys (per-pass) and final-summary lines. A nextpnr log
+    # runs to megabytes; only lines holding the key phrase reach the regex.
+    cells = fmax = None
+    with open(path, errors="ignore") as fh:
+        for line in fh:
+            if "Number of cells" in line:
+                m = CELLS_RE.search(line)
+                if m:
+                    cells = int(m.group(1))
+            elif "Max frequency" in line:
+                m = FMAX_RE.search(line)
+                if m:
+                    fmax = float(m.group(1))
+
+    return dict(report_params(path), cells=cells, fmax_mhz=fmax, path=str(path))
+
+
+_context: dict = {}   # git rev / tool versions, looked up once per run
+
+
+def load_report(path: Path, con) -> dict:
+    """parse_report, via the results database when one is open.
+
+    A report already recorded (same path, size and mtime) is not read again;
+    a new one is parsed and appended with its design, parameters, git rev
+    and toolchain (from the sweep's meta.json when present, else from the
+    current checkout and tools on PATH).
+    """
+    if con is None:
+        return parse_report(path)
+    row = ppa_db.lookup(con, path)
+    if row is not None:
+        return dict(report_params(path), cells=row["cells"],
+                    fmax_mhz=row["fmax_mhz"], path=str(path))
+    r = parse_report(path)
+    meta_path = path.parent / "meta.json"
+    meta = json.loads(meta_path.read_text()) if meta_path.is_file() else {}
+    params = meta.get("params") or {k: r[k] for k in ("pipe", "width", "seed")
+                                    if r[k] is not None}
+    if "git_rev" not in meta and "git_rev" not in _context:
+        _context["git_rev"] = ppa_db.git_rev()
+    if "tools" not in meta and "tools" not in _context:
+        _context["tools"] = ppa_db.toolchain()
+    ppa_db.record(con, path, design=meta.get("design", ppa_db.DESIGN),
+                  params=params, rev=meta.get("git_rev", _context.get("git_rev")),
+                  tools=meta.get("tools", _context.get("tools")),
+                  cells=r["cells"], fmax_mhz=r["fmax_mhz"])
+    return r
 
 
 def fmt(value, spec):
     return format(value, spec) if value is not None else "n/a"
 
 
+def pareto_front(rows: list[dict]) -> list[dict]:
+    """Rows no other row beats on both cells (fewer) and Fmax (higher)."""
+    pts = [r for r in rows if r["cells"] is not None and r["fmax_mhz"] is not None]
+    front = [r for r in pts
+             if not any(o["cells"] <= r["cells"] and o["fmax_mhz"] >= r["fmax_mhz"]
+                        and (o["cells"], o["fmax_mhz"]) != (r["cells"], r["fmax_mhz"])
+                        for o in pts)]
+    return sorted(front, key=lambda r: r["cells"])
+
+
 def main(argv: list[str]) -> int:
-    if len(argv) < 2:
+    ap = argparse.ArgumentParser(prog="plot_ppa.py", add_help=True)
+    ap.add_argument("reports", nargs="*")
+    ap.add_argument("--out", help="plot path (default: ppa_curve.png beside "
+                                  "the first report)")
+    ap.add_argument("--db", type=Path, default=ppa_db.DEFAULT_DB,
+                    help="append results to this SQLite history "
+                         "(default: ppa_history.sqlite; see ppa_db.py)")
+    ap.add_argument("--no-db", action="store_true",
+                    help="parse the reports without touching the history")
+    args = ap.parse_args(argv[1:])
+    if not args.reports:
         print(__doc__.strip(), file=sys.stderr)
         return 2
 
-    paths = [Path(p) for p in argv[1:]]
-    rows = sorted((parse_report(p) for p in paths if p.is_file()),
-                  key=lambda r: r["pipe"])
+    paths = [Path(p) for p in args.reports]
+    con = None if args.no_db else ppa_db.connect(args.db)
+    try:
+        rows = [load_report(p, con) for p in paths if p.is_file()]
+    finally:
+        if con is not None:
+            con.commit()
+            con.close()
+    rows.sort(key=lambda r: (r["pipe"], r["width"] or 0, r["seed"] or 0))
 
     if not rows:
-        print(f"plot_ppa: no readable reports in {argv[1:]}", file=sys.stderr)
+        print(f"plot_ppa: no readable reports in {args.reports}", file=sys.stderr)
         return 1
 
-    print("pipe,cells,fmax_mhz")
-    for r in rows:
-        print(f"{r['pipe']},{fmt(r['cells'], 'd')},{fmt(r['fmax_mhz'], '.2f')}")
+    grid = any(r["width"] is not None or r["seed"] is not None for r in rows)
+    front = pareto_front(rows)
+    if grid:
+        on_front = {id(r) for r in front}
+        print("pipe,width,seed,cells,fmax_mhz,pareto")
+        for r in rows:
+            print(f"{r['pipe']},{fmt(r['width'], 'd')},{fmt(r['seed'], 'd')},"
+                  f"{fmt(r['cells'], 'd')},{fmt(r['fmax_mhz'], '.2f')},"
+                  f"{int(id(r) in on_front)}")
+    else:
+        print("pipe,cells,fmax_mhz")
+        for r in rows:
+            print(f"{r['pipe']},{fmt(r['cells'], 'd')},{fmt(r['fmax_mhz'], '.2f')}")
 
     # Plot if matplotlib is available; otherwise skip silently.
     try:
@@ -76,19 +168,27 @@ def main(argv: list[str]) -> int:
     if not plottable:
         return 0
 
-    out_dir = Path(rows[0]["path"]).parent
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_png = out_dir / "ppa_curve.png"
-
-    pipe_vals = [r["pipe"] for r in plottable]
-    cells = [r["cells"] for r in plottable]
-    fmaxes = [r["fmax_mhz"] for r in plottable]
+    out_png = Path(args.out) if args.out else Path(rows[0]["path"]).parent / "ppa_curve.png"
+    out_png.parent.mkdir(parents=True, exist_ok=True)
 
     fig, ax = plt.subplots(figsize=(6, 4))
-    ax.plot(cells, fmaxes, marker="o", linewidth=2)
-    for p, c, f in zip(pipe_vals, cells, fmaxes):
-        ax.annotate(f"PIPE={p}", (c, f), textcoords="offset points",
-                    xytext=(6, 6), fontsize=9)
+    if grid:
+        pipes = sorted({r["pipe"] for r in plottable})
+        for p in pipes:
+            pts = [r for r in plottable if r["pipe"] == p]
+            ax.scatter([r["cells"] for r in pts], [r["fmax_mhz"] for r in pts],
+                       label=f"PIPE={p}", alpha=0.7)
+        ax.step([r["cells"] for r in front], [r["fmax_mhz"] for r in front],
+                where="post", color="black", linewidth=1.5, label="Pareto front")
+        ax.legend(fontsize=8)
+    else:
+        pipe_vals = [r["pipe"] for r in plottable]
+        cells = [r["cells"] for r in plottable]
+        fmaxes = [r["fmax_mhz"] for r in plottable]
+        ax.plot(cells, fmaxes, marker="o", linewidth=2)
+        for p, c, f in zip(pipe_vals, cells, fmaxes):
+            ax.annotate(f"PIPE={p}", (c, f), textcoords="offset points",
+                        xytext=(6, 6), fontsize=9)
     ax.set_xlabel("Cells (yosys synth_ice40)")
     ax.set_ylabel("Fmax (MHz, nextpnr-ice40)")
     ax.set_title("Pipelined Adder: Fmax vs. Cells")
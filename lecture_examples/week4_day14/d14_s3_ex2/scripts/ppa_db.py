@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+ppa_db.py -- append-only SQLite history of PPA results, so Fmax / cell-count
+trends can be followed across many sweeps and commits without re-reading
+the (multi-MB) yosys + nextpnr reports.
+
+Usage (from the example directory):
+    python scripts/ppa_db.py history                 # every recorded result
+    python scripts/ppa_db.py history --pipe 2 --last 10
+    python scripts/ppa_db.py best                    # best Fmax per PIPE/W, per git rev
+
+plot_ppa.py records each report it reads (see --db / --no-db there). A row
+is keyed by design, parameters, git revision and toolchain version; the
+report path, size and mtime identify the measurement, so a report that is
+already in the database is never parsed again. Rows are only ever inserted:
+UPDATE and DELETE are refused by triggers. The database lives beside the
+Makefile (ppa_history.sqlite), outside logs/, so `make clean` keeps it.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sqlite3
+import subprocess
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+
+EXAMPLE = Path(__file__).resolve().parent.parent
+DEFAULT_DB = EXAMPLE / "ppa_history.sqlite"
+DESIGN = "pipelined_adder"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id              INTEGER PRIMARY KEY,
+    recorded_at     TEXT    NOT NULL,
+    design          TEXT    NOT NULL,
+    params          TEXT    NOT NULL,   -- canonical JSON, e.g. {"pipe": 2, "width": 32}
+    git_rev         TEXT    NOT NULL,
+    toolchain       TEXT    NOT NULL,   -- canonical JSON {"yosys": ..., "nextpnr": ...}
+    cells           INTEGER,
+    fmax_mhz        REAL,
+    report          TEXT    NOT NULL,
+    report_size     INTEGER NOT NULL,
+    report_mtime_ns INTEGER NOT NULL,
+    UNIQUE (report, report_size, report_mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS results_key
+    ON results (design, params, git_rev, toolchain);
+CREATE TRIGGER IF NOT EXISTS results_no_update BEFORE UPDATE ON results
+    BEGIN SELECT RAISE(ABORT, 'ppa_db: results are append-only'); END;
+CREATE TRIGGER IF NOT EXISTS results_no_delete BEFORE DELETE ON results
+    BEGIN SELECT RAISE(ABORT, 'ppa_db: results are append-only'); END;
+"""
+
+
+def canonical(obj: dict) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+
+
+def connect(path: Path = DEFAULT_DB) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(path)
+    con.row_factory = sqlite3.Row
+    con.executescript(SCHEMA)
+    return con
+
+
+def git_rev(where: Path = EXAMPLE) -> str:
+    """HEAD of the checkout, with "+dirty" if this example has local edits."""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short=12", "HEAD"], cwd=where,
+                             capture_output=True, text=True, timeout=30)
+        if rev.returncode != 0:
+            return "unknown"
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=where,
+                               capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+    # Build outputs are untracked; only edits to tracked files make it dirty.
+    edited = [ln for ln in dirty.stdout.splitlines() if not ln.startswith("??")]
+    return rev.stdout.strip() + ("+dirty" if edited else "")
+
+
+def tool_version(cmd: list[str]) -> str:
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return "missing"
+    text = (out.stdout or out.stderr).strip()
+    return text.splitlines()[0] if text else "?"
+
+
+def toolchain() -> dict:
+    return {"yosys": tool_version(["yosys", "-V"]),
+            "nextpnr": tool_version(["nextpnr-ice40", "--version"])}
+
+
+def _stamp(path: Path) -> tuple[str, int, int]:
+    st = path.stat()
+    return str(path.resolve()), st.st_size, st.st_mtime_ns
+
+
+def lookup(con: sqlite3.Connection, path: Path) -> sqlite3.Row | None:
+    """The recorded row for this exact report file (same size and mtime)."""
+    return con.execute(
+        "SELECT * FROM results WHERE report = ? AND report_size = ? "
+        "AND report_mtime_ns = ?", _stamp(path)).fetchone()
+
+
+def record(con: sqlite3.Connection, path: Path, *, design: str, params: dict,
+           rev: str, tools: dict, cells: int | None, fmax_mhz: float | None) -> bool:
+    """Append one result; False if this report file was already recorded."""
+    cur = con.execute(
+        "INSERT OR IGNORE INTO results (recorded_at, design, params, git_rev, "
+        "toolchain, cells, fmax_mhz, report, report_size, report_mtime_ns) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (time.strftime("%Y-%m-%dT%H:%M:%S"), design, canonical(params), rev,
+         canonical(tools), cells, fmax_mhz, *_stamp(path)))
+    return cur.rowcount == 1
+
+
+def _where(args) -> tuple[str, list]:
+    sql, vals = ["design = ?"], [args.design]
+    for name in ("pipe", "width", "seed"):
+        value = getattr(args, name)
+        if value is not None:
+            sql.append(f"json_extract(params, '$.{name}') = ?")
+            vals.append(value)
+    return " AND ".join(sql), vals
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "n/a"
+
+
+def _cmd_history(con: sqlite3.Connection, args) -> int:
+    where, vals = _where(args)
+    rows = con.execute(f"SELECT * FROM results WHERE {where} ORDER BY id DESC"
+                       + (" LIMIT ?" if args.last else ""),
+                       vals + ([args.last] if args.last else [])).fetchall()
+    out = csv.writer(sys.stdout, lineterminator="\n")
+    out.writerow(["id", "recorded_at", "git_rev", "params", "cells", "fmax_mhz",
+                  "yosys", "nextpnr"])
+    for r in reversed(rows):
+        tools = json.loads(r["toolchain"])
+        out.writerow([r["id"], r["recorded_at"], r["git_rev"], r["params"],
+                      _fmt(r["cells"], "d"), _fmt(r["fmax_mhz"], ".2f"),
+                      tools.get("yosys", "?"), tools.get("nextpnr", "?")])
+    return 0
+
+
+def _cmd_best(con: sqlite3.Connection, args) -> int:
+    where, vals = _where(args)
+    rows = con.execute(
+        "SELECT git_rev, json_extract(params, '$.pipe') AS pipe, "
+        "json_extract(params, '$.width') AS width, MIN(cells) AS cells, "
+        "MAX(fmax_mhz) AS fmax_mhz, COUNT(*) AS runs, MIN(id) AS first "
+        f"FROM results WHERE {where} GROUP BY git_rev, pipe, width "
+        "ORDER BY first, pipe, width", vals).fetchall()
+    print("git_rev,pipe,width,runs,min_cells,best_fmax_mhz")
+    for r in rows:
+        print(f"{r['git_rev']},{r['pipe']},{_fmt(r['width'], 'd')},{r['runs']},"
+              f"{_fmt(r['cells'], 'd')},{_fmt(r['fmax_mhz'], '.2f')}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB)
+    ap.add_argument("--design", default=DESIGN)
+    sub = ap.add_subparsers(dest="command", required=True)
+    for name, func, text in (("history", _cmd_history, "recorded results as CSV"),
+                             ("best", _cmd_best, "best result per git rev, PIPE and W")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("--pipe", type=int)
+        p.add_argument("--width", type=int)
+        p.add_argument("--seed", type=int)
+        if name == "history":
+            p.add_argument("--last", type=int, help="only the N most recent rows")
+        p.set_defaults(func=func)
+    args = ap.parse_args(argv)
+
+    if not args.db.is_file():
+        print(f"ppa_db: no database at {args.db} (run plot_ppa.py first)",
+              file=sys.stderr)
+        return 1
+    with closing(connect(args.db)) as con:
+        return args.func(con, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+sweep_ppa.py -- run the pipelined-adder PPA sweep over a parameter grid in
+parallel, then hand the reports to plot_ppa.py.
+
+Usage (from the example directory):
+    python scripts/sweep_ppa.py                          # PIPE 0-4 x seeds 1-4
+    python scripts/sweep_ppa.py --pipe 0 1 2 4 --width 16 32 --seed 1 2 3
+    python scripts/sweep_ppa.py --jobs 4 --force         # rebuild everything
+
+Every grid point (PIPE, W, nextpnr seed) is built by the same yosys +
+nextpnr-ice40 flow as `make all PIPE=N`, in its own directory:
+
+    logs/sweep/pipe{P}_w{W}_s{S}-{key}/
+        report_pipe{P}_w{W}_s{S}.txt   same layout as logs/report_pipeN.txt
+        meta.json                      parameters, git rev, tool versions, runtimes
+
+``key`` hashes the Verilog source, the PCF, the parameters and the tool
+command lines, so editing the design (or the flow) rebuilds every point
+while an unchanged point is skipped. Points run in a bounded pool of
+--jobs tool processes (default: all cores). The reports then go through
+plot_ppa.py, which prints the CSV table, draws the Pareto plot and appends
+each new report to the results history (scripts/ppa_db.py).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+EXAMPLE = HERE.parent
+sys.path.insert(0, str(HERE))
+import plot_ppa  # noqa: E402
+import ppa_db  # noqa: E402
+
+TOP = "pipelined_adder"
+SRC = EXAMPLE / "day14_ex02_pipelined_adder.v"
+PCF = EXAMPLE.parent / "go_board.pcf"
+SWEEP_DIR = EXAMPLE / "logs" / "sweep"
+SWEEP_VERSION = "1"     # bump when the flow changes in a way the key misses
+
+YOSYS_SCRIPT = ("read_verilog {src}; chparam -set PIPE {pipe} -set W {width} {top}; "
+                "synth_ice40 -top {top} -json {json}; stat")
+NEXTPNR_ARGS = ["--{device}", "--package", "{package}", "--pcf", "{pcf}",
+                "--json", "{json}", "--asc", "{asc}", "--freq", "{freq}",
+                "--seed", "{seed}"]
+
+
+def point_name(pipe: int, width: int, seed: int) -> str:
+    return f"pipe{pipe}_w{width}_s{seed}"
+
+
+def point_key(params: dict) -> str:
+    """Hash of everything that determines a point's report."""
+    h = hashlib.sha256(SWEEP_VERSION.encode())
+    for path in (SRC, PCF):
+        h.update(path.read_bytes() if path.is_file() else b"")
+    h.update(YOSYS_SCRIPT.encode())
+    h.update(" ".join(NEXTPNR_ARGS).encode())
+    h.update(json.dumps(params, sort_keys=True).encode())
+    return h.hexdigest()[:12]
+
+
+def build_point(params: dict, build_dir: Path, versions: dict, rev: str) -> dict:
+    """Run synth + PnR for one point; the report appears only on completion."""
+    name = point_name(params["pipe"], params["width"], params["seed"])
+    build_dir.mkdir(parents=True, exist_ok=True)
+    fields = dict(params, src=SRC, pcf=PCF, top=TOP,
+                  json=f"{TOP}.json", asc=f"{TOP}.asc")
+    log = [f"=== Pipelined Adder PPA report (PIPE={params['pipe']} "
+           f"W={params['width']} seed={params['seed']}) ===\n"]
+    times, codes = {}, {}
+
+    steps = [("yosys", ["yosys", "-q", "-p", YOSYS_SCRIPT.format(**fields)])]
+    if not params["synth_only"]:
+        steps.append(("nextpnr", ["nextpnr-ice40"]
+                      + [a.format(**fields) for a in NEXTPNR_ARGS]))
+    for tool, cmd in steps:
+        t0 = time.monotonic()
+        try:
+            out = subprocess.run(cmd, cwd=build_dir, capture_output=True, text=True)
+            log += [out.stdout, out.stderr]
+            codes[tool] = out.returncode
+        except OSError as exc:
+            log.append(f"{tool}: {exc}\n")
+            codes[tool] = None
+        times[tool] = round(time.monotonic() - t0, 3)
+        if codes[tool] != 0:
+            break
+
+    # Same trailer as the Makefile, so plot_ppa.py reads both alike.
+    body = "".join(log)
+    summary = [ln for ln in body.splitlines()
+               if "Number of cells" in ln or "Max frequency" in ln]
+    text = body + f"\n--- Summary (PIPE={params['pipe']}) ---\n" + "".join(
+        ln + "\n" for ln in summary)
+
+    meta = {"design": TOP, "params": params, "key": build_dir.name.rsplit("-", 1)[-1],
+            "git_rev": rev, "tools": versions, "seconds": times, "returncodes": codes}
+    (build_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+    # Tool failures are as reproducible as the design (the Makefile keeps
+    # those reports too); a tool that could not start is not cached.
+    if None not in codes.values():
+        report = build_dir / f"report_{name}.txt"
+        tmp = report.with_suffix(".tmp")
+        tmp.write_text(text)
+        tmp.replace(report)
+    return meta
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--pipe", type=int, nargs="+", default=[0, 1, 2, 3, 4])
+    ap.add_argument("--width", type=int, nargs="+", default=[32])
+    ap.add_argument("--seed", type=int, nargs="+", default=[1, 2, 3, 4],
+                    help="nextpnr placement seeds (spread of Fmax per design)")
+    ap.add_argument("--freq", type=float, default=200,
+                    help="nextpnr target MHz (as the Makefile)")
+    ap.add_argument("--device", default="hx1k")
+    ap.add_argument("--package", default="vq100")
+    ap.add_argument("--synth-only", action="store_true",
+                    help="skip nextpnr (cells only, no Fmax)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--force", action="store_true",
+                    help="rebuild points even if a cached report exists")
+    ap.add_argument("--no-plot", action="store_true",
+                    help="build only; skip plot_ppa.py")
+    args = ap.parse_args(argv)
+
+    grid = []
+    for pipe, width, seed in itertools.product(args.pipe, args.width, args.seed):
+        params = {"pipe": pipe, "width": width, "seed": seed, "freq": args.freq,
+                  "device": args.device, "package": args.package,
+                  "synth_only": args.synth_only}
+        d = SWEEP_DIR / f"{point_name(pipe, width, seed)}-{point_key(params)}"
+        grid.append((params, d, d / f"report_{point_name(pipe, width, seed)}.txt"))
+
+    todo = [(p, d) for p, d, r in grid if args.force or not r.is_file()]
+    print(f"[sweep] {len(grid)} points, {len(grid) - len(todo)} cached, "
+          f"{len(todo)} to build on {min(args.jobs, len(todo)) if todo else 0} workers",
+          file=sys.stderr)
+
+    failed = 0
+    if todo:
+        if not shutil.which("yosys"):
+            print("[sweep] yosys not found on PATH (nix develop?)", file=sys.stderr)
+            return 1
+        versions, rev = ppa_db.toolchain(), ppa_db.git_rev()
+        t0 = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = {pool.submit(build_point, p, d, versions, rev): d for p, d in todo}
+            for fut in as_completed(futures):
+                meta = fut.result()
+                p = meta["params"]
+                ok = all(c == 0 for c in meta["returncodes"].values())
+                failed += not ok
+                print(f"[{'built' if ok else 'FAIL '}] "
+                      f"{point_name(p['pipe'], p['width'], p['seed'])}  "
+                      f"{sum(meta['seconds'].values()):6.1f} s", file=sys.stderr)
+        print(f"[sweep] built {len(todo)} points in {time.monotonic() - t0:.1f} s"
+              f"{f', {failed} failed' if failed else ''}", file=sys.stderr)
+
+    if args.no_plot:
+        return 1 if failed else 0
+    reports = [str(r) for _, _, r in grid if r.is_file()]
+    rc = plot_ppa.main(["plot_ppa.py", "--out", str(SWEEP_DIR / "ppa_pareto.png"),
+                        *reports])
+    return rc or (1 if failed else 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
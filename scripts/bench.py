@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+bench.py — Benchmarks for the course build toolchain on a scaled-up corpus.
+
+Usage:
+    python3 scripts/bench.py                          # 1x and 10x trees, 1M-100M VCDs
+    python3 scripts/bench.py --scale 1 10 100 --vcd 1M 10M 100M 1G
+    python3 scripts/bench.py --only build_site vcd    # phases whose name contains any
+    python3 scripts/bench.py --check                  # exit 1 on a regression
+    python3 scripts/bench.py --show                   # print the history, run nothing
+
+Corpus: for each --scale N, .cache/bench/corpus_xN/ is a copy of the repo
+in which every lab exercise (labs/*/ex*), lecture example, slide deck
+(lectures/*/dNN_s*.html) and docs/*.md page is cloned N times under a
+`_bNN` suffix, each clone mutated with a marker comment so no content
+cache can serve it, and each day-level README / lecture markdown has its
+body repeated N times. The scripts are copied too, so they resolve REPO
+to the corpus. A corpus is rebuilt only when the repo's files change.
+Synthetic VCDs (clock, reset, counters, buses, an FSM) of each --vcd
+size are written to .cache/bench/vcd/ once.
+
+Phases: build_site.py, prep_mkdocs.py, md2nb.py --force and seal_all.py
+on every corpus, starting from no outputs or render caches (seal_all
+only where iverilog, vvp and openssl are installed); and, on
+every VCD, vcd_to_wavedrom (the notebook helper) with a cold and a warm
+columnar cache and parse_vcd of two signals. Each phase runs in its own
+process: wall and CPU time and peak RSS come from that process alone.
+The "Phase N: ..." / "Converting ..." banners a script prints split its
+time into sub-phases.
+
+Every run is appended to .cache/bench/history.json (--history to keep
+it elsewhere, e.g. under version control) with the commit and host. A
+phase is flagged when it is more than 25% (and 0.5 s / 20 MB) slower or
+bigger than the median of the last five runs on the same host.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO / ".cache" / "bench"
+HISTORY = CACHE_DIR / "history.json"
+
+BENCH_VERSION = "1"             # bump when the corpus or the phases change meaning
+COPY_IGNORE = {".git", ".cache", ".hdlwaves", "site", "notebooks", "__pycache__",
+               ".direnv", "result", ".pytest_cache", ".venv", "venv"}
+MARKERS = {                     # per-extension mutation appended to each clone
+    ".md": "\n<!-- bench clone {n} -->\n",
+    ".html": "\n<!-- bench clone {n} -->\n",
+    ".v": "\n// bench clone {n}\n",
+    ".sv": "\n// bench clone {n}\n",
+    ".vh": "\n// bench clone {n}\n",
+    ".svh": "\n// bench clone {n}\n",
+}
+SIZE_UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+TAIL_LINES = 20                 # output kept for a phase that fails
+REGRESSION = 1.25               # slower / bigger than baseline by this factor ...
+MIN_DELTA_S = 0.5               # ... and by at least this much
+MIN_DELTA_MB = 20
+BASELINE_RUNS = 5
+
+
+class Phase(NamedTuple):
+    name: str
+    argv: tuple                 # run with python3 -u from the corpus root
+    marker: str                 # regex: group 1 of each match opens a sub-phase
+    outputs: tuple              # corpus paths removed first, for a cold start
+    needs: tuple = ()           # executables without which the phase is skipped
+
+
+PIPELINE = [
+    Phase("build_site", ("scripts/build_site.py",), r"^Phase \d+: (.+)",
+          ("site", ".cache/waves")),
+    Phase("prep_mkdocs", ("scripts/prep_mkdocs.py",), "", (".cache/waves",)),
+    Phase("md2nb", ("scripts/md2nb.py", "--force"), r"^Converting (\w+):",
+          ("notebooks", ".cache/waves")),
+    Phase("seal_all", ("scripts/lab_ctf/seal_all.py", "--course-key", "bench",
+                       "--flag-seed", "bench"), "", (), ("iverilog", "vvp", "openssl")),
+]
+
+# Run as `python3 -c SNIPPET vcd` with shared/ on sys.path.
+VCD_PHASES = [
+    ("vcd_to_wavedrom cold", "from hdlwaves import vcd_to_wavedrom as f; f(sys.argv[1])", True),
+    ("vcd_to_wavedrom warm", "from hdlwaves import vcd_to_wavedrom as f; f(sys.argv[1])", False),
+    ("parse_vcd", "from hdlwaves import parse_vcd as f; f(sys.argv[1], signals=['clk', 'data'])",
+     False),
+]
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+def _ignore(directory: str, names: list[str]) -> set[str]:
+    return {n for n in names if n in COPY_IGNORE}
+
+
+def fingerprint() -> str:
+    """Hash of every copied file's path, size and mtime, plus BENCH_VERSION."""
+    h = hashlib.sha256(BENCH_VERSION.encode())
+    for root, dirs, files in os.walk(REPO):
+        dirs[:] = sorted(d for d in dirs if d not in COPY_IGNORE)
+        for name in sorted(files):
+            st = os.lstat(os.path.join(root, name))
+            h.update(f"{root}/{name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _mutate(path: Path, n: int) -> None:
+    marker = MARKERS.get(path.suffix)
+    if marker and path.is_file() and not path.is_symlink():
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(marker.format(n=n))
+
+
+def _clone_dir(src: Path, n: int) -> None:
+    dst = src.with_name(f"{src.name}_b{n:02d}")
+    shutil.copytree(src, dst, symlinks=True, ignore=_ignore)
+    for f in dst.rglob("*"):
+        _mutate(f, n)
+
+
+def _clone_file(src: Path, n: int) -> None:
+    dst = src.with_name(f"{src.stem}_b{n:02d}{src.suffix}")
+    shutil.copy2(src, dst)
+    _mutate(dst, n)
+
+
+def _repeat_body(path: Path, times: int) -> None:
+    text = path.read_text(encoding="utf-8", errors="replace")
+    path.write_text(text + "".join(MARKERS[".md"].format(n=n) + text
+                                   for n in range(1, times)), encoding="utf-8")
+
+
+def build_corpus(scale: int) -> tuple[Path, float]:
+    """The corpus for `scale` (built or reused) and the seconds spent building it."""
+    root = CACHE_DIR / f"corpus_x{scale}"
+    stamp = root / ".bench_corpus.json"
+    fp = fingerprint()
+    if stamp.is_file() and json.loads(stamp.read_text()).get("fingerprint") == fp:
+        return root, 0.0
+    t0 = time.perf_counter()
+    shutil.rmtree(root, ignore_errors=True)
+    shutil.copytree(REPO, root, symlinks=True, ignore=_ignore)
+    exercises = sorted(p for p in root.glob("labs/week*/ex*") if p.is_dir())
+    examples = sorted(p for p in root.glob("lecture_examples/week*/*") if p.is_dir())
+    slides = sorted(root.glob("lectures/week*/d[0-9][0-9]_s*.html"))
+    docs = sorted(root.glob("docs/*.md"))
+    for n in range(1, scale):
+        for d in exercises + examples:
+            _clone_dir(d, n)
+        for f in slides + docs:
+            _clone_file(f, n)
+    if scale > 1:
+        for f in [*root.glob("labs/week*/README.md"), *root.glob("lectures/week*/*.md")]:
+            _repeat_body(f, scale)
+    files = sum(1 for _ in root.rglob("*"))
+    stamp.write_text(json.dumps({"fingerprint": fp, "scale": scale, "files": files}))
+    return root, time.perf_counter() - t0
+
+
+def parse_size(text: str) -> int:
+    m = re.fullmatch(r"(\d+)([KMG]?)B?", text.upper())
+    if not m:
+        raise argparse.ArgumentTypeError(f"size like 1M / 100M / 1G, not {text!r}")
+    return int(m.group(1)) * SIZE_UNITS.get(m.group(2), 1)
+
+
+def size_label(size: int) -> str:
+    for suffix in ("G", "M", "K"):
+        unit = SIZE_UNITS[suffix]
+        if size >= unit and size % unit == 0:
+            return f"{size // unit}{suffix}"
+    return str(size)
+
+
+VCD_HEADER = """$timescale 1ns $end
+$scope module tb $end
+$var reg 1 ! clk $end
+$var reg 1 " rst $end
+$var reg 1 # valid $end
+$var reg 8 $ data [7:0] $end
+$scope module dut $end
+$var wire 1 ! i_clk $end
+$var wire 8 $ i_data [7:0] $end
+$var reg 16 % r_count [15:0] $end
+$var reg 32 & r_addr [31:0] $end
+$var reg 3 ' r_state [2:0] $end
+$var reg 1 ( o_tx $end
+$var wire 1 ) o_busy $end
+$upscope $end
+$upscope $end
+$enddefinitions $end
+#0
+$dumpvars
+0!
+1"
+0#
+b0 $
+b0 %
+b0 &
+b0 '
+1(
+0)
+$end
+"""
+
+
+def _vcd_block(rng: random.Random, cycles: int, count: int) -> tuple[list, int]:
+    """[(time offset, value lines)] for `cycles` clock periods of 10 ns."""
+    out = []
+    state = 0
+    for c in range(cycles):
+        lines = ["1!"]
+        count = (count + 1) & 0xFFFF
+        lines.append(f"b{count:b} %")
+        if rng.random() < 0.3:
+            lines.append(f"{rng.getrandbits(1)}#")
+            lines.append(f"b{rng.getrandbits(8):b} $")
+        if rng.random() < 0.1:
+            lines.append(f"b{rng.getrandbits(32):b} &")
+        if rng.random() < 0.05:
+            state = rng.randrange(5)
+            lines.append(f"b{state:b} '")
+            lines.append(f"{int(state != 0)})")
+        if state:
+            lines.append(f"{rng.getrandbits(1)}(")
+        out.append((c * 10, "\n".join(lines) + "\n"))
+        out.append((c * 10 + 5, "0!\n"))
+    return out, count
+
+
+def synth_vcd(size: int) -> Path:
+    """A synthetic dump of about `size` bytes in .cache/bench/vcd/ (kept once written)."""
+    path = CACHE_DIR / "vcd" / f"synth_{size}.vcd"
+    if path.is_file():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(size)
+    count, blocks = 0, []
+    for _ in range(4):
+        block, count = _vcd_block(rng, 512, count)
+        blocks.append(block)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        f.write(VCD_HEADER)
+        written, base, i = len(VCD_HEADER), 10, 0
+        f.write('#5\n0"\n')
+        while written < size:
+            text = "".join(f"#{base + off}\n{seg}" for off, seg in blocks[i % len(blocks)])
+            f.write(text)
+            written += len(text)
+            base += 512 * 10
+            i += 1
+        f.write(f"#{base}\n")
+    tmp.replace(path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def run_phase(argv: list[str], cwd: Path, marker: str = "") -> dict:
+    """Run one phase in its own process; wall / CPU time, peak RSS, sub-phases."""
+    rx = re.compile(marker) if marker else None
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-u", *argv], cwd=cwd, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            stdin=subprocess.DEVNULL, text=True, errors="replace")
+    marks, tail = [], deque(maxlen=TAIL_LINES)
+    for line in proc.stdout:
+        tail.append(line.rstrip())
+        m = rx.match(line) if rx else None
+        if m:
+            marks.append((m.group(1).strip(), time.perf_counter()))
+    _, status, usage = os.wait4(proc.pid, 0)
+    end = time.perf_counter()
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    proc.stdout.close()
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    res = {"status": "ok" if proc.returncode == 0 else "error",
+           "wall_s": round(end - t0, 3),
+           "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+           "peak_mb": round(peak, 1)}
+    if marks:
+        bounds = [t for _, t in marks[1:]] + [end]
+        res["sub"] = {name: round(stop - start, 3)
+                      for (name, start), stop in zip(marks, bounds)}
+    if proc.returncode != 0:
+        res["output"] = "\n".join(tail) + f"\n[bench] exited with {proc.returncode}"
+    return res
+
+
+def run_pipeline(scale: int, wanted, results: dict) -> None:
+    root, built = build_corpus(scale)
+    note = f"built in {built:.1f} s" if built else "reused"
+    print(f"corpus x{scale}: {root.relative_to(REPO)} ({note})", file=sys.stderr)
+    for phase in PIPELINE:
+        key = f"x{scale}/{phase.name}"
+        if not wanted(key):
+            continue
+        missing = [tool for tool in phase.needs if not shutil.which(tool)]
+        if missing:
+            print(f"[SKIP ] {key}  ({', '.join(missing)} not on PATH)", file=sys.stderr)
+            continue
+        for rel in phase.outputs:
+            shutil.rmtree(root / rel, ignore_errors=True)
+        results[key] = run_phase(list(phase.argv), root, phase.marker)
+        _progress(key, results[key])
+
+
+def run_vcd(size: int, wanted, results: dict) -> None:
+    label = size_label(size)
+    keys = [(f"vcd/{label}/{name}", snippet, cold) for name, snippet, cold in VCD_PHASES]
+    if not any(wanted(k) for k, _, _ in keys):
+        return
+    t0 = time.perf_counter()
+    vcd = synth_vcd(size)
+    print(f"vcd {label}: {vcd.relative_to(REPO)} ({time.perf_counter() - t0:.1f} s)",
+          file=sys.stderr)
+    prelude = f"import sys; sys.path.insert(0, {str(REPO / 'shared')!r}); "
+    for key, snippet, cold in keys:
+        if not wanted(key):
+            continue
+        if cold:
+            shutil.rmtree(vcd.parent / ".hdlwaves", ignore_errors=True)
+        results[key] = run_phase(["-c", prelude + snippet, str(vcd)], vcd.parent)
+        _progress(key, results[key])
+
+
+def _progress(key: str, res: dict) -> None:
+    print(f"[{res['status'].upper():<5}] {key}  {res['wall_s']:.2f} s, "
+          f"{res['peak_mb']:.0f} MB", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+
+def host() -> str:
+    return (f"{platform.node()} {platform.system()} {platform.machine()} "
+            f"{os.cpu_count()} cpu, python {platform.python_version()}")
+
+
+def commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO,
+                             capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return out.stdout.strip()
+
+
+def load_history(path: Path) -> list[dict]:
+    return json.loads(path.read_text())["runs"] if path.is_file() else []
+
+
+def regressions(run: dict, past: list[dict]) -> dict:
+    """{phase: reason} for phases slower or bigger than their recent median."""
+    same = [r for r in past if r["host"] == run["host"]
+            and r["bench_version"] == run["bench_version"]][-BASELINE_RUNS:]
+    flagged = {}
+    for key, res in run["results"].items():
+        base = [r["results"][key] for r in same
+                if r["results"].get(key, {}).get("status") == "ok"]
+        if not base or res["status"] != "ok":
+            continue
+        for field, unit, floor in (("wall_s", "s", MIN_DELTA_S), ("peak_mb", "MB", MIN_DELTA_MB)):
+            ref = statistics.median(b[field] for b in base)
+            if res[field] > ref * REGRESSION and res[field] - ref > floor:
+                flagged.setdefault(key, []).append(
+                    f"{field} {res[field]:g} {unit} vs median {ref:g} {unit}")
+    return {k: "; ".join(v) for k, v in flagged.items()}
+
+
+def print_table(run: dict, flagged: dict) -> None:
+    rows = run["results"]
+    width = max((len(k) for k in rows), default=10)
+    print(f"{'phase':<{width}}  {'wall s':>8}  {'cpu s':>8}  {'peak MB':>8}")
+    for key, res in rows.items():
+        mark = "  REGRESSION" if key in flagged else (
+            "  ERROR" if res["status"] != "ok" else "")
+        print(f"{key:<{width}}  {res['wall_s']:>8.2f}  {res['cpu_s']:>8.2f}  "
+              f"{res['peak_mb']:>8.0f}{mark}")
+        for name, secs in res.get("sub", {}).items():
+            print(f"  {name[:width - 2]:<{width - 2}}  {secs:>8.2f}")
+    for key, why in flagged.items():
+        print(f"regression: {key}: {why}")
+    for key, res in rows.items():
+        if res["status"] != "ok":
+            print(f"\n{key} failed:\n{res.get('output', '')}")
+
+
+def show_history(runs: list[dict], last: int = 8) -> None:
+    runs = runs[-last:]
+    keys = list(dict.fromkeys(k for r in runs for k in r["results"]))
+    if not keys:
+        print("no benchmark runs recorded yet")
+        return
+    width = max(len(k) for k in keys)
+    print(f"{'phase (wall s)':<{width}}  " + "  ".join(
+        f"{r['commit'] or r['when'][:10]:>9}" for r in runs))
+    for key in keys:
+        cells = []
+        for r in runs:
+            res = r["results"].get(key)
+            cells.append(f"{res['wall_s']:>9.2f}" if res and res["status"] == "ok"
+                         else f"{'-' if res is None else 'error':>9}")
+        print(f"{key:<{width}}  " + "  ".join(cells))
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scale", type=int, nargs="+", default=[1, 10],
+                    help="corpus sizes, as multiples of the repo (default: 1 10)")
+    ap.add_argument("--vcd", type=parse_size, nargs="+", default=[1 << 20, 10 << 20, 100 << 20],
+                    help="synthetic VCD sizes (default: 1M 10M 100M; up to 1G)")
+    ap.add_argument("--only", nargs="+", metavar="PATTERN",
+                    help="phases whose key (e.g. x10/md2nb, vcd/1G/parse_vcd) contains any")
+    ap.add_argument("--history", type=Path, default=HISTORY)
+    ap.add_argument("--no-record", action="store_true",
+                    help="do not append this run to the history")
+    ap.add_argument("--check", action="store_true",
+                    help="exit 1 when a phase regressed or failed")
+    ap.add_argument("--show", action="store_true",
+                    help="print the recorded history and exit")
+    ap.add_argument("--clean", action="store_true",
+                    help="delete the cached corpora and VCDs, then exit")
+    args = ap.parse_args(argv)
+
+    if args.clean:
+        for p in [*CACHE_DIR.glob("corpus_x*"), CACHE_DIR / "vcd"]:
+            shutil.rmtree(p, ignore_errors=True)
+        return 0
+    past = load_history(args.history)
+    if args.show:
+        show_history(past)
+        return 0
+
+    def wanted(key: str) -> bool:
+        return not args.only or any(p in key for p in args.only)
+
+    results: dict = {}
+    t0 = time.perf_counter()
+    for scale in args.scale:
+        run_pipeline(scale, wanted, results)
+    for size in args.vcd:
+        run_vcd(size, wanted, results)
+    if not results:
+        print(f"bench: no phases match {args.only}", file=sys.stderr)
+        return 1
+
+    run = {"when": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+           "commit": commit(), "host": host(), "bench_version": BENCH_VERSION,
+           "wall_s": round(time.perf_counter() - t0, 3), "results": results}
+    flagged = regressions(run, past)
+    print()
+    print_table(run, flagged)
+    if not args.no_record:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        tmp = args.history.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"runs": past + [run]}, indent=1) + "\n")
+        tmp.replace(args.history)
+        print(f"History: {args.history}")
+    failed = any(r["status"] != "ok" for r in results.values())
+    return 1 if args.check and (flagged or failed) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@
 #   ./scripts/build_all.sh              # everything
 #   ./scripts/build_all.sh --quick      # skip standalone site (build_site.py)
 #   ./scripts/build_all.sh --serve      # build then serve MkDocs locally
+#   ./scripts/build_all.sh --profile    # + per-phase timing (.cache/profile/)
 #
 # Requirements:
 #   nix develop .#full   (or have mkdocs + markdown installed)
@@ -36,16 +37,19 @@ fail() { echo -e "${RED}  ✗ $1${NC}"; exit 1; }
 
 MODE="full"
 SERVE=false
+PROFILE=false
 for arg in "$@"; do
     case "$arg" in
         --quick)     MODE="quick" ;;
         --serve)     SERVE=true ;;
+        --profile)   PROFILE=true ;;
         --help|-h)
-            echo "Usage: $0 [--quick|--serve|--help]"
+            echo "Usage: $0 [--quick|--serve|--profile|--help]"
             echo ""
             echo "  (default)    Run all build steps"
             echo "  --quick      Skip standalone site (build_site.py)"
             echo "  --serve      Build then serve MkDocs at localhost:8000"
+            echo "  --profile    Time every phase; Chrome trace + summary in .cache/profile/"
             exit 0
             ;;
     esac
@@ -71,6 +75,22 @@ check_cmd() {
 check_cmd python3
 check_cmd mkdocs
 
+# Vendored WaveDrom for offline notebooks (downloads only what is missing)
+if python3 shared/hdlwaves/fetch_wavedrom.py >/dev/null 2>&1; then
+    ok "WaveDrom vendored in shared/hdlwaves/vendor/"
+else
+    warn "WaveDrom not vendored (offline?) — run shared/hdlwaves/fetch_wavedrom.py"
+fi
+
+# --profile: each Python step records its phases (scripts/instrument.py)
+# into $HDL_PROFILE; mkdocs is timed as one span; merged at the end.
+TIMED=()
+if $PROFILE; then
+    export HDL_PROFILE="$REPO/.cache/profile"
+    rm -rf "$HDL_PROFILE"
+    TIMED=(python3 scripts/instrument.py run "mkdocs build" --)
+fi
+
 # ═══════════════════════════════════════════════════════════════════
 # Phase 1: Prep MkDocs source (docs_src/, downloads/)
 # ═══════════════════════════════════════════════════════════════════
@@ -93,7 +113,7 @@ fi
 # Phase 3: Build MkDocs site (_site/)
 # ═══════════════════════════════════════════════════════════════════
 step "Phase 3: Building MkDocs site"
-mkdocs build --site-dir _site 2>&1 | tail -5
+${TIMED[@]+"${TIMED[@]}"} mkdocs build --site-dir _site 2>&1 | tail -5
 
 # Post-build: copy slides and downloads into _site/
 cp -r lectures _site/lectures 2>/dev/null && ok "Copied lectures → _site/lectures/"
@@ -113,6 +133,11 @@ echo -e "  ${GREEN}Site:${NC}       ${HTML} HTML pages in _site/"
 echo -e "${BOLD}═══════════════════════════════════════════════════${NC}"
 echo ""
 
+if $PROFILE; then
+    step "Build profile"
+    python3 scripts/instrument.py report "$HDL_PROFILE"
+fi
+
 if $SERVE; then
     step "Serving MkDocs at http://127.0.0.1:8000"
     echo "  Press Ctrl+C to stop."
@@ -5,13 +5,14 @@ build_site.py — Generate the HDL Course Portal
 Converts all markdown to styled HTML, generates navigation manifest,
 and creates the main index.html landing page.
 
-Run from repo root:  python3 scripts/build_site.py
+Run from repo root:  python3 scripts/build_site.py [--profile [DIR]]
 Output:              site/
 """
 
 import json
 import re
 import shutil
+import sys
 import zipfile
 from pathlib import Path
 
@@ -26,6 +27,15 @@ REPO = Path(__file__).resolve().parent.parent
 SITE = REPO / "site"
 CONTENT = SITE / "content"
 
+# Pre-rendered waveform SVGs, keyed by VCD content hash (see hdlwaves.svg)
+WAVE_CACHE = REPO / ".cache" / "waves"
+
+sys.path.insert(0, str(REPO / "shared"))
+from hdlwaves.svg import prerender  # noqa: E402
+
+import instrument  # noqa: E402
+from instrument import phase, timed  # noqa: E402
+
 # GitHub raw base for direct file viewing
 GITHUB_RAW_BASE = "https://github.com/ucf-draco-mike/hdl-for-dsd/blob/main"
 
@@ -79,6 +89,7 @@ WEEKS = [
 
 # ─── Slide segment titles (extracted from file naming) ─────────────
 
+@timed
 def get_slide_segments(day_num, youtube_ids=None):
     """Find reveal.js slide files for a day, return list of {file, title, segment, youtube_id}."""
     if youtube_ids is None:
@@ -135,11 +146,12 @@ MD = markdown.Markdown(extensions=[
 ], output_format="html5")
 
 
-def convert_md(md_path, title=None, css_path="../../css/content.css"):
-    """Convert a markdown file to styled HTML page."""
+@timed
+def convert_md(md_path, title=None, css_path="../../css/content.css", extra=""):
+    """Convert a markdown file to styled HTML page (extra HTML is appended)."""
     text = md_path.read_text(encoding="utf-8")
     MD.reset()
-    body = MD.convert(text)
+    body = MD.convert(text) + extra
 
     if not title:
         # Try to extract from first H1
@@ -207,6 +219,22 @@ def build_quizzes():
     print(f"  Converted: {count} quizzes → content/quizzes/")
 
 
+@timed
+def build_lab_waves(lab_dir, out_dir):
+    """Pre-render a lab's VCDs (left by `make sim`) → <figure> HTML, or ""."""
+    vcds = sorted(lab_dir.rglob("*.vcd"))
+    rendered = prerender(vcds, out_dir, WAVE_CACHE) if vcds else {}
+    if not rendered:
+        return ""
+    figs = ["<h2>Waveforms</h2>"]
+    for vcd, svg_name in rendered.items():
+        caption = vcd.relative_to(lab_dir)
+        figs.append(f'<figure class="waveform"><img src="waves/{svg_name}" '
+                    f'alt="{caption}"><figcaption><code>{caption}</code>'
+                    f'</figcaption></figure>')
+    return "\n".join(figs)
+
+
 def build_labs():
     """Convert lab README.md files → site/content/labs/*.html."""
     out = CONTENT / "labs"
@@ -217,7 +245,9 @@ def build_labs():
         day_match = re.search(r"day(\d+)", day_dir)
         if day_match:
             day_num = int(day_match.group(1))
-            html = convert_md(readme, title=f"Day {day_num} Lab Guide")
+            waves = build_lab_waves(readme.parent, out / "waves")
+            html = convert_md(readme, title=f"Day {day_num} Lab Guide",
+                              extra=waves)
             (out / f"day{day_num:02d}_lab.html").write_text(html, encoding="utf-8")
             count += 1
 
@@ -401,7 +431,8 @@ def build_lab_code_assets():
             # Create day-level "all starter code" zip
             all_zip_name = f"day{dz}_all_starter.zip"
             all_zip_path = day_dl / all_zip_name
-            with zipfile.ZipFile(all_zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            with phase("Zip day starter code", day=dz), \
+                    zipfile.ZipFile(all_zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
                 for f in all_files_for_day_zip:
                     try:
                         arcname = f"day{dz}_lab/{f.relative_to(lab_dir)}"
@@ -468,6 +499,7 @@ def _file_entry(filepath, rel_path):
     }
 
 
+@timed(name="Zip exercise code")
 def _create_zip(zip_path, files, arcname_base=""):
     """Create a zip archive from a list of files."""
     with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
@@ -724,6 +756,11 @@ hr {
 
 /* Images */
 img { max-width: 100%; height: auto; border-radius: 6px; }
+
+/* Pre-rendered waveforms */
+figure.waveform { margin: 16px 0; overflow-x: auto; }
+figure.waveform img { border: 1px solid var(--gray-200); }
+figure.waveform figcaption { font-size: 0.85em; color: var(--gray-600); }
 """
 
 OVERVIEW_HTML = """<!DOCTYPE html>
@@ -1286,6 +1323,7 @@ function renderCodePanel(dayData) {
 # ─── Main ─────────────────────────────────────────────────────────
 
 def main():
+    instrument.start_from_argv(script="build_site")
     print("╔══════════════════════════════════════════╗")
     print("║  Building HDL Course Portal              ║")
     print("╚══════════════════════════════════════════╝")
@@ -1298,31 +1336,40 @@ def main():
     CONTENT.mkdir()
 
     print("Phase 1: Content CSS")
-    build_content_css()
+    with phase("Content CSS"):
+        build_content_css()
 
     print("Phase 2: Convert documents")
-    build_docs()
+    with phase("Convert documents"):
+        build_docs()
 
     print("Phase 3: Convert quizzes")
-    build_quizzes()
+    with phase("Convert quizzes"):
+        build_quizzes()
 
     print("Phase 4: Convert lab guides")
-    build_labs()
+    with phase("Convert lab guides"):
+        build_labs()
 
     print("Phase 5: Convert misc docs")
-    build_misc()
+    with phase("Convert misc docs"):
+        build_misc()
 
     print("Phase 6: Generate overview")
-    build_overview()
+    with phase("Generate overview"):
+        build_overview()
 
     print("Phase 7: Build lab code assets (zips + file manifest)")
-    code_assets = build_lab_code_assets()
+    with phase("Build lab code assets"):
+        code_assets = build_lab_code_assets()
 
     print("Phase 8: Generate manifest")
-    manifest = build_manifest(code_assets)
+    with phase("Generate manifest"):
+        manifest = build_manifest(code_assets)
 
     print("Phase 9: Generate index.html")
-    build_index(manifest)
+    with phase("Generate index.html"):
+        build_index(manifest)
 
     # Summary
     total = sum(1 for _ in SITE.rglob("*.html"))
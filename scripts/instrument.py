@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+instrument.py — Phase timing, trace export and optional cProfile capture
+shared by the build scripts (build_site, prep_mkdocs, md2nb, seal_all).
+
+In a script:
+
+    from instrument import phase, timed
+    import instrument
+
+    @timed                              # every call is one span
+    def convert_md(...): ...
+
+    def main():
+        instrument.start_from_argv()    # or add_arguments(ap) + start(...)
+        with phase("Convert documents"):
+            build_docs()
+
+Nothing is recorded unless profiling is on: `--profile [DIR]` on the
+script's command line, or HDL_PROFILE=DIR in the environment (which is
+how `build_all.sh --profile` reaches every step). Then, when the script
+exits, it writes DIR/<script>.<pid>.trace.json — Chrome trace / Perfetto
+JSON (chrome://tracing, ui.perfetto.dev) with one complete event per span
+— and prints a summary table (calls, total and self time per span) to
+stderr. `--profile-phase NAME` also runs cProfile inside every span
+called NAME (a phase title or a function name), saves DIR/<script>.NAME.prof
+and prints its top functions.
+
+Command line, for whole-build views:
+
+    python3 scripts/instrument.py report .cache/profile   # merge traces + one table
+    python3 scripts/instrument.py run "mkdocs build" -- mkdocs build ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+DEFAULT_DIR = REPO / ".cache" / "profile"
+ENV_VAR = "HDL_PROFILE"
+SUMMARY_ROWS = 25               # spans listed in the summary table
+PSTATS_ROWS = 20                # functions listed for --profile-phase
+
+# Trace timestamps are wall-clock microseconds so the traces of several
+# processes (one per build step) line up when merged.
+_EPOCH_US = time.time_ns() // 1000
+_PERF0 = time.perf_counter_ns()
+
+_enabled = False
+_out_dir: Path | None = None
+_script = Path(sys.argv[0]).stem or "python"
+_events: list = []
+_local = threading.local()
+_cprofile_name: str | None = None
+_cprofile: cProfile.Profile | None = None
+_cprofile_depth = 0
+_quiet = False
+_root: list | None = None       # [start, time in children] of the whole run
+
+
+def _now_us() -> float:
+    return _EPOCH_US + (time.perf_counter_ns() - _PERF0) / 1000
+
+
+class phase:
+    """Context manager timing one named span (a no-op unless profiling)."""
+
+    __slots__ = ("name", "args", "_frame")
+
+    def __init__(self, name: str, **args):
+        self.name, self.args = name, args
+
+    def __enter__(self):
+        if _enabled:
+            stack = getattr(_local, "stack", None)
+            if stack is None:
+                stack = _local.stack = []
+            self._frame = [_now_us(), 0.0]      # start, time spent in children
+            stack.append(self._frame)
+            if self.name == _cprofile_name:
+                _cprofile_enter()
+        return self
+
+    def __exit__(self, *exc):
+        if _enabled and getattr(self, "_frame", None) is not None:
+            end = _now_us()
+            start, children = self._frame
+            _local.stack.pop()
+            if _local.stack:
+                _local.stack[-1][1] += end - start
+            event = {"name": self.name, "cat": _script, "ph": "X", "ts": round(start, 1),
+                     "dur": round(end - start, 1), "pid": os.getpid(),
+                     "tid": threading.get_native_id(),
+                     "self": round(end - start - children, 1)}
+            if self.args:
+                event["args"] = {k: str(v) for k, v in self.args.items()}
+            _events.append(event)
+            self._frame = None
+            if self.name == _cprofile_name:
+                _cprofile_exit()
+        return False
+
+
+def timed(fn=None, *, name: str | None = None):
+    """Decorator: every call of the function is one span (named after it)."""
+    if fn is None:
+        return functools.partial(timed, name=name)
+    label = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*a, **kw):
+        if not _enabled:
+            return fn(*a, **kw)
+        with phase(label):
+            return fn(*a, **kw)
+    return wrapper
+
+
+def _cprofile_enter() -> None:
+    global _cprofile, _cprofile_depth
+    _cprofile_depth += 1
+    if _cprofile_depth == 1:            # recursive / nested calls profile once
+        if _cprofile is None:
+            _cprofile = cProfile.Profile()
+        _cprofile.enable()
+
+
+def _cprofile_exit() -> None:
+    global _cprofile_depth
+    _cprofile_depth -= 1
+    if _cprofile_depth == 0 and _cprofile is not None:
+        _cprofile.disable()
+
+
+# ---------------------------------------------------------------------------
+# Switching on, and writing results at exit
+# ---------------------------------------------------------------------------
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    """Add --profile [DIR] and --profile-phase NAME to a script's parser."""
+    ap.add_argument("--profile", nargs="?", const=str(DEFAULT_DIR),
+                    default=os.environ.get(ENV_VAR) or None, metavar="DIR",
+                    help=f"write a Chrome trace and timing summary to DIR "
+                         f"(default {DEFAULT_DIR.relative_to(REPO)}; or set {ENV_VAR})")
+    ap.add_argument("--profile-phase", metavar="NAME",
+                    help="also run cProfile inside the phase / function NAME")
+
+
+def start(profile: str | None = None, profile_phase: str | None = None,
+          script: str | None = None, quiet: bool = False) -> None:
+    """Turn recording on when `profile` (a directory) or `profile_phase` is
+    set; `quiet` writes the trace without printing the summary."""
+    global _enabled, _out_dir, _script, _cprofile_name, _quiet, _root
+    profile = profile or (profile_phase and str(DEFAULT_DIR))
+    if not profile or _enabled:
+        return
+    _enabled, _out_dir = True, Path(profile)
+    _root = [_now_us(), 0.0]
+    _local.stack = [_root]      # top-level spans add to the run's child time
+    _script = script or _script
+    _cprofile_name, _quiet = profile_phase, quiet
+    atexit.register(finish)
+
+
+def start_from_argv(argv: list[str] | None = None, script: str | None = None) -> None:
+    """start() from --profile / --profile-phase in argv, ignoring other options."""
+    ap = argparse.ArgumentParser(add_help=False)
+    add_arguments(ap)
+    args, _ = ap.parse_known_args(sys.argv[1:] if argv is None else argv)
+    start(args.profile, args.profile_phase, script)
+
+
+def _metadata(pid: int, label: str) -> dict:
+    return {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}}
+
+
+def finish() -> Path | None:
+    """Write this process's trace, print its summary; called at exit."""
+    global _enabled
+    if not _enabled:
+        return None
+    _enabled = False
+    end = _now_us()
+    _events.append({"name": "(run)", "cat": _script, "ph": "X", "ts": round(_root[0], 1),
+                    "dur": round(end - _root[0], 1), "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                    "self": round(end - _root[0] - _root[1], 1)})
+    _out_dir.mkdir(parents=True, exist_ok=True)
+    path = _out_dir / f"{_script}.{os.getpid()}.trace.json"
+    trace = {"traceEvents": [_metadata(os.getpid(), _script), *_events],
+             "displayTimeUnit": "ms"}
+    path.write_text(json.dumps(trace))
+    if not _quiet:
+        print(f"\n{summary(_events, title=_script)}\nTrace: {path}", file=sys.stderr)
+    if _cprofile is not None:
+        prof = _out_dir / f"{_script}.{_cprofile_name}.prof"
+        _cprofile.dump_stats(prof)
+        out = io.StringIO()
+        pstats.Stats(_cprofile, stream=out).sort_stats("cumulative").print_stats(PSTATS_ROWS)
+        print(f"cProfile of {_cprofile_name!r} ({prof}):{out.getvalue()}", file=sys.stderr)
+    return path
+
+
+def summary(events: list, title: str = "") -> str:
+    """Table of spans by self time: calls, total, self, mean, share of wall."""
+    spans = [e for e in events if e.get("ph") == "X"]
+    if not spans:
+        return f"{title}: no spans recorded"
+    wall = max(e["ts"] + e["dur"] for e in spans) - min(e["ts"] for e in spans)
+    rows: dict = {}
+    for e in spans:
+        key = (e.get("cat", ""), e["name"])
+        r = rows.setdefault(key, [0, 0.0, 0.0])
+        r[0] += 1
+        r[1] += e["dur"]
+        r[2] += e.get("self", e["dur"])
+    order = sorted(rows.items(), key=lambda kv: -kv[1][2])
+    many = len({cat for cat, _ in rows}) > 1        # merged: prefix the script
+    width = min(max(len(f"{c}: {n}" if many else n) for c, n in rows), 48)
+    lines = [f"{title} — {len(spans)} spans over {wall / 1e6:.2f} s",
+             f"  {'span':<{width}}  {'calls':>6}  {'total s':>8}  {'self s':>8}  "
+             f"{'mean ms':>8}  {'self %':>6}"]
+    for (cat, name), (calls, total, own) in order[:SUMMARY_ROWS]:
+        label = (f"{cat}: {name}" if many else name)[:width]
+        lines.append(f"  {label:<{width}}  {calls:>6}  {total / 1e6:>8.2f}  "
+                     f"{own / 1e6:>8.2f}  {total / calls / 1e3:>8.1f}  "
+                     f"{100 * own / wall if wall else 0:>5.1f}%")
+    if len(order) > SUMMARY_ROWS:
+        lines.append(f"  … {len(order) - SUMMARY_ROWS} more")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Command line: merge traces, time an external command
+# ---------------------------------------------------------------------------
+
+def _cmd_report(args) -> int:
+    files = sorted(Path(args.dir).glob("*.trace.json"))
+    files = [f for f in files if f.name != Path(args.out).name]
+    if not files:
+        print(f"instrument: no traces in {args.dir}", file=sys.stderr)
+        return 1
+    events = []
+    for f in files:
+        events.extend(json.loads(f.read_text())["traceEvents"])
+    out = Path(args.out) if Path(args.out).is_absolute() else Path(args.dir) / args.out
+    out.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+    print(summary(events, title=f"{len(files)} traces"))
+    print(f"Merged trace: {out}  (open in https://ui.perfetto.dev)")
+    return 0
+
+
+def _cmd_run(args) -> int:
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    start(args.dir, script=args.name.split()[0], quiet=True)
+    with phase(args.name, command=" ".join(cmd)):
+        rc = subprocess.call(cmd)
+    return rc
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("report", help="merge every trace in DIR and print one table")
+    p.add_argument("dir", nargs="?", default=os.environ.get(ENV_VAR) or str(DEFAULT_DIR))
+    p.add_argument("-o", "--out", default="merged.trace.json")
+    p.set_defaults(func=_cmd_report)
+    p = sub.add_parser("run", help="run a command as one span of a profiled build")
+    p.add_argument("name", help="span name, e.g. \"mkdocs build\"")
+    p.add_argument("cmd", nargs=argparse.REMAINDER)
+    p.add_argument("--dir", default=os.environ.get(ENV_VAR) or str(DEFAULT_DIR))
+    p.set_defaults(func=_cmd_run)
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
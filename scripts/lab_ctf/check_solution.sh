@@ -15,6 +15,9 @@
 # Run from inside an exercise's starter/ dir. Assumes ../solution/ holds:
 #   tb/tb_*.v       (plaintext testbench)
 #   .flag.enc       (encrypted per-exercise flag)
+# and optionally tb/assertions.yaml (or .py): properties checked over the
+# run's VCD before the flag is tried, so a DUT must behave, not just
+# reproduce the stdout of a testbench that only $displays.
 
 set -euo pipefail
 
@@ -94,6 +97,40 @@ fi
 ( cd "$work" && vvp sim.vvp 2>/dev/null ) > "$work/vvp.out"
 cat "$work/vvp.out"
 
+HDLWAVES_DIR="$STARTER_DIR/../../../../shared"
+# Newest dump the run wrote (nullglob is on, so no dump → empty array).
+vcds=("$work"/*.vcd "$work"/build/*.vcd)
+dut_vcd=""
+for f in "${vcds[@]}"; do
+    [[ -z "$dut_vcd" || "$f" -nt "$dut_vcd" ]] && dut_vcd=$f
+done
+spec=""
+for f in assertions.yaml assertions.yml assertions.py; do
+    [[ -f "$work/$f" ]] && { spec=$f; break; }
+done
+if [[ -n "$spec" && -d "$HDLWAVES_DIR/hdlwaves" ]] && command -v python3 >/dev/null; then
+    if [[ -z "$dut_vcd" ]]; then
+        echo "❌ No waveform written — this exercise checks assertions on the VCD."
+        exit 1
+    fi
+    # hdlwaves check: 1 = a property failed, 2 = it could not check at all
+    # (PyYAML missing, bad spec, signal not in the dump).
+    rc=0
+    PYTHONPATH="$HDLWAVES_DIR" python3 -m hdlwaves check \
+        "$work/$spec" "$dut_vcd" > "$work/assert.log" 2>&1 || rc=$?
+    if [[ $rc -eq 1 ]]; then
+        echo ""
+        echo "❌ Assertions failed on your waveform:"
+        sed 's/^/   /' "$work/assert.log"
+        exit 1
+    elif [[ $rc -ne 0 ]]; then
+        echo ""
+        echo "❌ Could not check the assertions (a setup problem, not your design):"
+        sed 's/^/   /' "$work/assert.log"
+        exit "$rc"
+    fi
+fi
+
 key=$(sha256sum "$work/vvp.out" | awk '{print $1}')
 
 if flag=$(openssl enc -d -aes-256-cbc -pbkdf2 \
@@ -121,5 +158,19 @@ else
     echo "❌ Output did not match the reference. Keep iterating — your DUT"
     echo "   compiles, but its behaviour under the testbench differs from"
     echo "   the expected canonical run."
+    # When the instructor shipped the reference waveform (seal_all.py
+    # --ship-vcd), show where this run's dump first departs from it.
+    ref_vcd="$SOLN_DIR/expected.vcd.gz"
+    if [[ -f "$ref_vcd" && -n "$dut_vcd" && -d "$HDLWAVES_DIR/hdlwaves" ]] \
+            && command -v python3 >/dev/null; then
+        echo ""
+        echo "   First differences from the reference waveform:"
+        rm -f "$STARTER_DIR/diff_window.svg"
+        PYTHONPATH="$HDLWAVES_DIR" python3 -m hdlwaves diff -n 5 \
+            --svg "$STARTER_DIR/diff_window.svg" "$ref_vcd" "$work/$dut_vcd" \
+            | sed 's/^/   /' || true
+        [[ -f "$STARTER_DIR/diff_window.svg" ]] && \
+            echo "   Waveform around the first one: diff_window.svg"
+    fi
     exit 1
 fi
@@ -21,6 +21,11 @@ Skips exercises that:
   - have no DUT source file, or
   - fail to compile/run with iverilog+vvp.
 
+An exercise whose solution/ holds an assertions spec (assertions.yaml or
+assertions.py, see shared/hdlwaves/assertions.py) ships it with the
+testbench in tb/; the reference run must satisfy it or the exercise is
+skipped, and check_solution.sh holds students' runs to the same spec.
+
 A skipped exercise is left untouched (plaintext layout preserved) and does
 not advance the chain.
 
@@ -31,6 +36,7 @@ records, for visibility and downstream tooling.
 from __future__ import annotations
 
 import argparse
+import gzip
 import hashlib
 import json
 import os
@@ -46,6 +52,18 @@ SCRIPTS = REPO / "scripts" / "lab_ctf"
 SEAL_SH = SCRIPTS / "seal_exercise.sh"
 CHAIN_JSON = SCRIPTS / "chain.json"
 
+sys.path.insert(0, str(REPO / "shared"))
+from hdlwaves.assertions import SPEC_NAMES, check_vcd, find_spec, load_spec  # noqa: E402
+
+sys.path.insert(0, str(REPO / "scripts"))
+import instrument  # noqa: E402
+from instrument import timed  # noqa: E402
+
+# Default seconds vvp may run per testbench (--sim-timeout). The long UART /
+# SPI benches take tens of seconds under vvp; the flag key is sha256 of vvp's
+# stdout, so these stay on vvp even where `make sim` uses Verilator.
+SIM_TIMEOUT = 30
+
 STARTER_MAKEFILE_BLOCK = """
 # CTF gating — see scripts/lab_ctf/README.md
 CTF_DIR := ../../../../scripts/lab_ctf
@@ -107,7 +125,9 @@ def classify(soln: Path) -> tuple[list[Path], list[Path], list[Path]]:
         if f.name.startswith("."):
             continue
         ext = f.suffix.lower()
-        if ext in (".v", ".sv", ".svh"):
+        if f.name in SPEC_NAMES:            # published with the testbench
+            tb.append(f)
+        elif ext in (".v", ".sv", ".svh"):
             (tb if is_tb(f) else dut).append(f)
         elif ext in (".vh", ".hex"):
             dut.append(f)
@@ -138,6 +158,7 @@ def _move_keeping_symlink(src: Path, dst: Path) -> None:
         src.rename(dst)
 
 
+@timed
 def reorganize(soln: Path, dut: list[Path], tb: list[Path]) -> None:
     (soln / "ref").mkdir(exist_ok=True)
     (soln / "tb").mkdir(exist_ok=True)
@@ -174,9 +195,13 @@ def patch_starter_makefile(starter: Path) -> bool:
     return True
 
 
-def run_canonical(input_files: list[Path]) -> bytes | None:
+@timed
+def run_canonical(input_files: list[Path], vcd_out: Path | None = None,
+                  timeout: float = SIM_TIMEOUT) -> bytes | None:
     """Compile + run input_files in a tmp dir; return vvp stdout (bytes)
-    or None on failure.
+    or None on failure (or if vvp runs longer than `timeout` seconds).
+    With vcd_out, the newest VCD the run wrote is saved there gzipped
+    (nothing is written if it wrote none).
 
     Returns bytes (not str) because some testbenches emit non-UTF-8 data
     and we want byte-exact reproducibility. Symlinks are followed. Some
@@ -236,13 +261,31 @@ def run_canonical(input_files: list[Path]) -> bytes | None:
         try:
             r2 = subprocess.run(
                 ["vvp", "sim.vvp"], cwd=tdir,
-                capture_output=True, timeout=30,
+                capture_output=True, timeout=timeout,
             )
         except subprocess.TimeoutExpired:
             # Testbench likely lacks $finish or has an infinite loop.
             return None
         if not r2.stdout:
             return None
+        dumps = sorted(list(tdir.glob("*.vcd")) + list(tdir.glob("build/*.vcd")),
+                       key=lambda p: p.stat().st_mtime)
+        spec = find_spec(tdir)
+        if spec is not None:
+            # The reference must satisfy the assertions students are held to.
+            try:
+                report = check_vcd(dumps[-1], load_spec(spec)) if dumps else None
+            except ValueError as exc:
+                print(f"    {spec.name}: {exc}")
+                return None
+            if report is None or not report.ok:
+                print(f"    {spec.name} fails on the reference run:")
+                print(report.summary() if report else "    (no VCD written)")
+                return None
+        if vcd_out is not None:
+            if dumps:
+                with open(dumps[-1], "rb") as src, gzip.open(vcd_out, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
         return r2.stdout
 
 
@@ -276,8 +319,14 @@ def write_chain_pointers(chain: list[dict]) -> None:
         ctf_meta.write_text(text)
 
 
-def seal_one(ex: Path, unlock_key: str, flag: str) -> bool:
-    """Return True if sealed successfully, False otherwise. Mutates the tree."""
+@timed
+def seal_one(ex: Path, unlock_key: str, flag: str,
+             sim_timeout: float = SIM_TIMEOUT, ship_vcd: bool = False) -> bool:
+    """Return True if sealed successfully, False otherwise. Mutates the tree.
+
+    ship_vcd keeps the reference run's waveform as solution/expected.vcd.gz
+    so check_solution.sh can point a failing student at the first divergence.
+    """
     soln = ex / "solution"
 
     if already_organized(soln):
@@ -296,7 +345,9 @@ def seal_one(ex: Path, unlock_key: str, flag: str) -> bool:
         # exercise in an inconsistent half-reorganized state.
         input_files = dut + tb_files
 
-    canonical = run_canonical(input_files)
+    canonical = run_canonical(input_files,
+                              soln / "expected.vcd.gz" if ship_vcd else None,
+                              timeout=sim_timeout)
     if canonical is None:
         print(f"  SKIP (compile/run failed): {ex.relative_to(REPO)}")
         return False
@@ -347,7 +398,14 @@ def main() -> int:
                     help="Master seed — per-exercise flags are derived from this.")
     ap.add_argument("--only", nargs="+", metavar="PATTERN",
                     help="Restrict to exercises whose path contains any of these substrings.")
+    ap.add_argument("--sim-timeout", type=float, default=SIM_TIMEOUT,
+                    help="Seconds allowed per vvp pre-flight run (default: %(default)s).")
+    ap.add_argument("--ship-vcd", action="store_true",
+                    help="Save each reference waveform as solution/expected.vcd.gz "
+                         "for check_solution.sh's divergence report.")
+    instrument.add_arguments(ap)
     args = ap.parse_args()
+    instrument.start(args.profile, args.profile_phase, "seal_all")
 
     exercises = find_exercises()
     if args.only:
@@ -359,7 +417,7 @@ def main() -> int:
     for ex in exercises:
         unlock_key = prev_flag if prev_flag else args.course_key
         flag = derive_flag(args.flag_seed, ex)
-        if seal_one(ex, unlock_key, flag):
+        if seal_one(ex, unlock_key, flag, args.sim_timeout, args.ship_vcd):
             chain.append({
                 "path": str(ex.relative_to(REPO)),
                 "unlock_key": unlock_key,
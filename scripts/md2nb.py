@@ -8,21 +8,30 @@ Usage:
     python scripts/md2nb.py --lectures            # lectures only
     python scripts/md2nb.py --day 5               # single day
     python scripts/md2nb.py --out notebooks/      # custom output root
+    python scripts/md2nb.py --force               # rebuild even if up to date
+    python scripts/md2nb.py --standalone          # inline the waveform helper
+    python scripts/md2nb.py --profile             # + timing trace (see instrument.py)
 
 The generated notebooks use a standard Python 3 kernel with:
   - %%writefile cells for Verilog source
   - ! shell commands for iverilog / vvp / yosys
-  - Inline WaveDrom waveform rendering from VCD output
+  - Inline WaveDrom waveform rendering from VCD output, via the shared
+    shared/hdlwaves package (imported from the checkout, or inlined with
+    --standalone)
 
 Design principle: content is IDENTICAL to the source markdown except for
 the addition of executable cells and waveform rendering.  Re-running this
-script overwrites previous output, keeping notebooks in sync with the repo.
+script keeps notebooks in sync with the repo: every source a notebook
+consumed (README, each %%writefile source, the waveform helper, the
+script version) is hashed into <out>/.md2nb_deps.json, and a notebook is
+only rewritten when one of those inputs changed.
 """
 
 from __future__ import annotations
 
 import argparse
 import glob
+import hashlib
 import json
 import os
 import re
@@ -32,7 +41,7 @@ from pathlib import Path
 from typing import Optional
 
 import nbformat
-from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook
+from nbformat.v4 import new_code_cell, new_markdown_cell, new_notebook, new_output
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -42,6 +51,10 @@ LABS_DIR = REPO_ROOT / "labs"
 LECTURES_DIR = REPO_ROOT / "lectures"
 DEFAULT_OUT = REPO_ROOT / "notebooks"
 
+# Bump whenever cell generation changes so existing notebooks are rebuilt.
+MD2NB_VERSION = "4"
+DEPS_MANIFEST = ".md2nb_deps.json"
+
 KERNEL_SPEC = {
     "display_name": "Python 3",
     "language": "python",
@@ -56,145 +69,247 @@ BUILD_EXTS = {".pcf"}
 # ---------------------------------------------------------------------------
 # Waveform helper — included once per notebook that has testbenches
 # ---------------------------------------------------------------------------
+# The VCD parser and renderers live in shared/hdlwaves/. Notebooks import
+# them from the checkout, so engine fixes reach every notebook without
+# regenerating it; --standalone inlines the modules for notebooks that
+# travel without the repo.
+HDLWAVES_DIR = REPO_ROOT / "shared" / "hdlwaves"
+HDLWAVES_INLINE = ("vcd.py", "wavedrom.py")  # dependency order
+# Pre-rendered waveform SVGs, keyed by VCD content hash (see hdlwaves.svg)
+WAVE_CACHE = REPO_ROOT / ".cache" / "waves"
+
+sys.path.insert(0, str(HDLWAVES_DIR.parent))
+from hdlwaves.svg import SVG_RENDERER_VERSION, render_cached  # noqa: E402
+
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+import instrument  # noqa: E402
+from instrument import phase, timed  # noqa: E402
+
 WAVEDROM_HELPER = r'''
-# --- WaveDrom / VCD rendering utilities (auto-generated — do not edit) ---
-import json, re, subprocess
-from IPython.display import HTML, display
+# --- WaveDrom / VCD rendering utilities (shared/hdlwaves) ---
+import sys
+from pathlib import Path
+
+try:
+    import hdlwaves
+except ImportError:
+    # Walk up from the notebook's directory to the repo's shared/ folder
+    for _d in (Path.cwd(), *Path.cwd().parents):
+        if (_d / "shared" / "hdlwaves" / "__init__.py").is_file():
+            sys.path.insert(0, str(_d / "shared"))
+            break
+    import hdlwaves
+
+from hdlwaves import _vcd_to_wavedrom, show_wavedrom, show_waves
 
-def _vcd_to_wavedrom(vcd_path, max_cycles=80, signals=None):
+print("✓ WaveDrom helpers loaded — use show_waves('dump.vcd') after simulation")
+'''.strip()
+
+
+def _standalone_helper(strict: bool = True) -> Optional[str]:
     """
-    Minimal VCD → WaveDrom JSON converter.
-    Works for single-bit and multi-bit signals from iverilog output.
+    Inline copy of the hdlwaves modules for notebooks used outside the repo.
+
+    The modules only import each other through top-level ``from .x import``
+    lines; dropping those and concatenating in dependency order yields one
+    self-contained cell. Without the vendored WaveDrom this exits, or
+    returns None when ``strict`` is false.
     """
-    with open(vcd_path) as f:
-        vcd = f.read()
-
-    # Parse variable declarations
-    var_map = {}  # id_code → (name, width)
-    for m in re.finditer(
-        r"\$var\s+\w+\s+(\d+)\s+(\S+)\s+(\S+)", vcd
-    ):
-        width, code, name = int(m.group(1)), m.group(2), m.group(3)
-        if signals is None or name in signals:
-            var_map[code] = (name, width)
-
-    if not var_map:
-        print(f"⚠  No matching signals in {vcd_path}")
+    wavedrom = _vendored_wavedrom(strict)
+    if wavedrom is None:
         return None
+    parts = ["# --- WaveDrom / VCD rendering utilities "
+             "(inlined from shared/hdlwaves — do not edit) ---"]
+    for name in HDLWAVES_INLINE:
+        src = (HDLWAVES_DIR / name).read_text()
+        parts.append("\n".join(
+            line for line in src.splitlines() if not line.startswith("from .")
+        ))
+    parts.append(f"_EMBEDDED.update({wavedrom!r})")
+    parts.append('print("✓ WaveDrom helpers loaded — '
+                 'use show_waves(\'dump.vcd\') after simulation")')
+    return "\n\n".join(parts)
 
-    # Parse value changes
-    changes = {}  # id_code → [(time, value), ...]
-    current_time = 0
-    for line in vcd.splitlines():
-        line = line.strip()
-        if line.startswith("#"):
-            current_time = int(line[1:])
-        elif line.startswith("b"):
-            parts = line.split()
-            if len(parts) == 2 and parts[1] in var_map:
-                val = int(parts[0][1:], 2) if parts[0][1:] else 0
-                changes.setdefault(parts[1], []).append((current_time, val))
-        elif len(line) >= 2 and line[0] in "01xXzZ" and line[1:] in var_map:
-            code = line[1:]
-            val = {"0": 0, "1": 1, "x": "x", "X": "x", "z": "z", "Z": "z"}[line[0]]
-            changes.setdefault(code, []).append((current_time, val))
-
-    # Determine time step (smallest non-zero delta)
-    all_times = sorted({t for ch in changes.values() for t, _ in ch})
-    if len(all_times) < 2:
-        return None
-    deltas = [all_times[i+1] - all_times[i] for i in range(len(all_times)-1) if all_times[i+1] != all_times[i]]
-    if not deltas:
+
+def _vendored_wavedrom(strict: bool = True) -> Optional[dict]:
+    """The vendored WaveDrom sources a standalone notebook carries. When they
+    have not been fetched (the notebook would need the CDN) this exits, or
+    returns None when ``strict`` is false."""
+    from hdlwaves.wavedrom import WAVEDROM_FILES, vendor_dir
+
+    vdir = vendor_dir()
+    missing = [local for local, _ in WAVEDROM_FILES if not (vdir / local).is_file()]
+    if missing and not strict:
         return None
-    step = min(deltas)
-    end_time = min(all_times[-1], step * max_cycles) if max_cycles else all_times[-1]
-    sample_times = list(range(0, end_time + 1, step))[:max_cycles]
-
-    # Build WaveDrom signal list
-    wave_signals = []
-    for code, (name, width) in sorted(var_map.items(), key=lambda x: x[1][0]):
-        ch = sorted(changes.get(code, []))
-        # Sample at each time point
-        samples = []
-        cur_val = 0
-        ci = 0
-        for t in sample_times:
-            while ci < len(ch) and ch[ci][0] <= t:
-                cur_val = ch[ci][1]
-                ci += 1
-            samples.append(cur_val)
-
-        if width == 1:
-            # Single-bit: WaveDrom wave string
-            wave_str = ""
-            for v in samples:
-                if v == "x":
-                    wave_str += "x"
-                elif v == "z":
-                    wave_str += "z"
-                else:
-                    wave_str += str(int(v))
-            wave_signals.append({"name": name, "wave": wave_str})
-        else:
-            # Multi-bit: use '=' for data with labels
-            wave_str = ""
-            data = []
-            prev = None
-            for v in samples:
-                if v == prev:
-                    wave_str += "."
-                else:
-                    wave_str += "="
-                    data.append(f"0x{v:X}" if isinstance(v, int) else str(v))
-                    prev = v
-            wave_signals.append({"name": name, "wave": wave_str, "data": data})
+    if missing:
+        sys.exit(f"md2nb: --standalone needs the vendored WaveDrom ({', '.join(missing)} "
+                 f"missing from {vdir}); run python3 shared/hdlwaves/fetch_wavedrom.py")
+    return {local: (vdir / local).read_text() for local, _ in WAVEDROM_FILES}
 
-    return {"signal": wave_signals, "config": {"hscale": 1}}
 
+def _helper_cell(standalone: bool) -> tuple[str, str]:
+    """Return (dependency label, cell source) for the waveform helper cell."""
+    if standalone:
+        return "WAVEDROM_HELPER[standalone]", _standalone_helper()
+    return "WAVEDROM_HELPER", WAVEDROM_HELPER
 
-def show_waves(vcd_path="dump.vcd", max_cycles=80, signals=None, width=900):
-    """Render VCD waveforms inline using WaveDrom."""
-    wd = _vcd_to_wavedrom(vcd_path, max_cycles=max_cycles, signals=signals)
-    if wd is None:
-        print("No waveform data to display.")
-        return
-    wd_json = json.dumps(wd)
-    html = f"""
-    <div id="wd_{id(wd):x}"></div>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/wavedrom/3.5.0/wavedrom.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/wavedrom/3.5.0/skins/default.js"></script>
-    <script>
-    (function() {{
-        var container = document.getElementById("wd_{id(wd):x}");
-        container.innerHTML = '<div id="wd_tgt_{id(wd):x}"><script type="WaveDrom">' +
-            JSON.stringify({wd_json}) + '</' + 'script></div>';
-        WaveDrom.ProcessAll();
-    }})();
-    </script>
+# ---------------------------------------------------------------------------
+# Dependency tracking — skip notebooks whose inputs are unchanged
+# ---------------------------------------------------------------------------
+
+# Files whose presence shapes a notebook (new starter file, new testbench).
+TRACKED_EXTS = HDL_EXTS | DATA_EXTS | BUILD_EXTS | {".md"}
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _tree_listing(root: Path) -> str:
+    """Newline-joined relative paths of every tracked file under root."""
+    names = sorted(
+        p.relative_to(root).as_posix() for p in root.rglob("*")
+        if p.is_file() and (p.suffix in TRACKED_EXTS or p.name == "Makefile")
+    )
+    return "\n".join(names)
+
+
+def _vcd_listing(ex_dir: Path) -> str:
+    """Newline-joined relative paths of the VCDs a show_waves cell can draw."""
+    return "\n".join(sorted(p.relative_to(ex_dir).as_posix()
+                            for p in ex_dir.rglob("*.vcd")))
+
+
+class InputTracker:
     """
-    display(HTML(html))
-
-
-def show_wavedrom(wave_dict, width=900):
-    """Render a raw WaveDrom JSON dict inline."""
-    wd_json = json.dumps(wave_dict)
-    html = f"""
-    <div id="wd_{id(wave_dict):x}"></div>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/wavedrom/3.5.0/wavedrom.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/wavedrom/3.5.0/skins/default.js"></script>
-    <script>
-    (function() {{
-        var container = document.getElementById("wd_{id(wave_dict):x}");
-        container.innerHTML = '<div id="wd_tgt_{id(wave_dict):x}"><script type="WaveDrom">' +
-            JSON.stringify({wd_json}) + '</' + 'script></div>';
-        WaveDrom.ProcessAll();
-    }})();
-    </script>
+    Record every source a notebook build consumes, keyed by a stable label
+    (repo-relative path for files), with the sha256 of its content.
     """
-    display(HTML(html))
 
-print("✓ WaveDrom helpers loaded — use show_waves('dump.vcd') after simulation")
-'''.strip()
+    def __init__(self):
+        self.inputs: dict[str, str] = {}
+
+    def read(self, path: Path) -> str:
+        """Read a source file and record its hash."""
+        text = path.read_text()
+        self.inputs[path.relative_to(REPO_ROOT).as_posix()] = _sha256(text)
+        return text
+
+    def add(self, label: str, text: str):
+        """Record a non-file input (helper source, script version, listing)."""
+        self.inputs[label] = _sha256(text)
+
+    def add_tree(self, root: Path):
+        """Record the tracked-file listing so added/removed files are seen."""
+        self.add(f"tree:{root.relative_to(REPO_ROOT).as_posix()}",
+                 _tree_listing(root))
+
+
+def _current_hash(label: str, options: str = "") -> Optional[str]:
+    """Recompute the hash for a recorded label (None if it can't be)."""
+    if label == "md2nb":
+        return _sha256(MD2NB_VERSION + options)
+    if label == "WAVEDROM_HELPER[standalone]":
+        # Never exit from a staleness check; a rebuild reports the missing files.
+        helper = _standalone_helper(strict=False)
+        return _sha256(helper) if helper is not None else "missing"
+    if label == "WAVEDROM_HELPER":
+        return _sha256(WAVEDROM_HELPER)
+    if label.startswith("tree:"):
+        root = REPO_ROOT / label[len("tree:"):]
+        return _sha256(_tree_listing(root)) if root.is_dir() else None
+    if label.startswith("vcds:"):
+        root = REPO_ROOT / label[len("vcds:"):]
+        return _sha256(_vcd_listing(root)) if root.is_dir() else None
+    if label == "hdlwaves.svg":
+        return _sha256(SVG_RENDERER_VERSION)
+    path = REPO_ROOT / label
+    return _sha256(path.read_text()) if path.is_file() else None
+
+
+def _stale_inputs(record: Optional[dict], out_path: Path,
+                  options: str = "") -> list[str]:
+    """
+    Return the reasons a notebook must be rebuilt; an empty list means the
+    notebook on disk was built from exactly the current inputs.
+    """
+    if not out_path.exists():
+        return ["output missing"]
+    if not record:
+        return ["no dependency record"]
+    reasons = []
+    for label, digest in sorted(record.items()):
+        now = _current_hash(label, options)
+        if now is None:
+            reasons.append(f"{label} (removed)")
+        elif now != digest:
+            reasons.append(f"{label} (modified)")
+    return reasons
+
+
+def _diff_inputs(old: Optional[dict], new: dict) -> list[str]:
+    """Describe how the recorded input set changed between two builds."""
+    old = old or {}
+    changes = [f"{k} (added)" for k in sorted(new.keys() - old.keys())]
+    changes += [f"{k} (removed)" for k in sorted(old.keys() - new.keys())]
+    changes += [f"{k} (modified)" for k in sorted(new.keys() & old.keys())
+                if new[k] != old[k]]
+    return changes
+
+
+def _load_manifest(out_root: Path) -> dict:
+    path = out_root / DEPS_MANIFEST
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(out_root: Path, manifest: dict):
+    path = out_root / DEPS_MANIFEST
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp, path)
+
+
+@timed(name="Write notebook")
+def _write_if_stale(
+    build, out_root: Path, out_path: Path, manifest: dict, force: bool,
+    options: str = "",
+) -> bool:
+    """
+    Rebuild and write one notebook unless its recorded inputs are current.
+
+    ``build`` is called with an InputTracker and returns the notebook.
+    ``options`` names CLI flags that change the output (e.g. "standalone");
+    it is recorded with the script version. Returns True if the notebook
+    was (re)written.
+    """
+    key = out_path.relative_to(out_root).as_posix()
+    record = manifest.get(key)
+    reasons = ["--force"] if force else _stale_inputs(record, out_path, options)
+    if not reasons:
+        print(f"    ✓ up to date: {out_path.relative_to(REPO_ROOT)}")
+        return False
+
+    deps = InputTracker()
+    deps.add("md2nb", MD2NB_VERSION + options)
+    nb = build(deps)
+
+    # Prefer the precise input diff — it also names inputs that only became
+    # visible by rebuilding (e.g. a newly added starter file).
+    if record:
+        reasons = _diff_inputs(record, deps.inputs) or reasons
+    print(f"    ↻ rebuild: {', '.join(reasons)}")
+
+    with open(out_path, "w") as f:
+        nbformat.write(nb, f)
+    manifest[key] = deps.inputs
+    print(f"    → {out_path.relative_to(REPO_ROOT)}")
+    return True
+
 
 # ---------------------------------------------------------------------------
 # Markdown parser helpers
@@ -291,12 +406,49 @@ def _shell_cell(cmd: str, comment: str = "") -> nbformat.NotebookNode:
     return new_code_cell("\n".join(lines))
 
 
+@timed(name="Waveform cell")
+def _show_waves_cell(ex_dir: Path, deps: InputTracker) -> nbformat.NotebookNode:
+    """
+    Create the show_waves cell for an exercise.
+
+    If a local simulation left a VCD in the exercise directory, its
+    pre-rendered SVG is attached as the cell's output, so the notebook
+    shows a waveform before anything is run (and on static viewers).
+    """
+    cell = _code_cell("show_waves('dump.vcd')")
+    # Only the dump that is drawn is an input; the listing notices a dump
+    # appearing or going away, the renderer version a change in drawing.
+    deps.add(f"vcds:{ex_dir.relative_to(REPO_ROOT).as_posix()}", _vcd_listing(ex_dir))
+    for vcd in sorted(ex_dir.rglob("*.vcd")):
+        try:
+            svg = render_cached(vcd, WAVE_CACHE)
+        except (OSError, ValueError) as exc:
+            print(f"  ⚠  {vcd.relative_to(REPO_ROOT)}: {exc}")
+            continue
+        if svg is not None:
+            deps.read(vcd)
+            deps.add("hdlwaves.svg", SVG_RENDERER_VERSION)
+            cell.outputs.append(new_output(
+                "display_data",
+                data={"image/svg+xml": svg.read_text(encoding="utf-8"),
+                      "text/plain": f"<waveform: {vcd.name}>"},
+            ))
+            break
+    return cell
+
+
 # ---------------------------------------------------------------------------
 # Lab notebook builder
 # ---------------------------------------------------------------------------
 
-def _build_lab_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
-    """Build a notebook for a single lab day."""
+@timed(name="Build lab notebook")
+def _build_lab_notebook(
+    day_dir: Path, day_num: int, deps: Optional[InputTracker] = None,
+    standalone: bool = False,
+) -> nbformat.NotebookNode:
+    """Build a notebook for a single lab day, recording inputs in ``deps``."""
+    deps = deps if deps is not None else InputTracker()
+    deps.add_tree(day_dir)
     nb = new_notebook()
     nb.metadata["kernelspec"] = KERNEL_SPEC
     cells = nb["cells"]
@@ -306,7 +458,7 @@ def _build_lab_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
         print(f"  ⚠  No README.md in {day_dir}")
         return nb
 
-    readme = readme_path.read_text()
+    readme = deps.read(readme_path)
 
     # Detect if this lab has testbenches → need wavedrom helper
     has_testbenches = any(day_dir.rglob("tb_*.v")) or any(day_dir.rglob("tb_*.sv"))
@@ -318,7 +470,9 @@ def _build_lab_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
     ))
 
     if has_testbenches:
-        cells.append(_code_cell(WAVEDROM_HELPER))
+        label, helper = _helper_cell(standalone)
+        cells.append(_code_cell(helper))
+        deps.add(label, helper)
 
     # Detect lab structure: flat (day01 style) vs exercise-dirs (day05+ style)
     exercise_dirs = sorted(
@@ -361,7 +515,7 @@ def _build_lab_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
         if prev_ex > 0 and ex_num != prev_ex and prev_ex not in injected:
             _inject_exercise_files(
                 cells, day_dir, prev_ex, injected,
-                has_exercise_dirs, exercise_dirs, has_flat_starters
+                has_exercise_dirs, exercise_dirs, has_flat_starters, deps
             )
 
         # Emit this section's markdown + code cells
@@ -372,7 +526,7 @@ def _build_lab_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
     if prev_ex > 0 and prev_ex not in injected:
         _inject_exercise_files(
             cells, day_dir, prev_ex, injected,
-            has_exercise_dirs, exercise_dirs, has_flat_starters
+            has_exercise_dirs, exercise_dirs, has_flat_starters, deps
         )
 
     # For overview-style READMEs that don't have inline exercise headings
@@ -389,7 +543,7 @@ def _build_lab_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
             ex_label = ex_match.group(2).replace("_", " ").title()
             _inject_exercise_files(
                 cells, day_dir, ex_n, injected,
-                has_exercise_dirs, exercise_dirs, has_flat_starters
+                has_exercise_dirs, exercise_dirs, has_flat_starters, deps
             )
 
     return nb
@@ -478,25 +632,28 @@ def _inject_exercise_files(
     has_exercise_dirs: bool,
     exercise_dirs: list[Path],
     has_flat_starters: bool,
+    deps: InputTracker,
 ):
     """Inject %%writefile cells for exercise starter files."""
     injected.add(ex_num)
 
     files_to_inject: list[tuple[str, str]] = []  # (display_name, content)
+    ex_dir: Optional[Path] = None
 
     if has_exercise_dirs:
         # Find exercise dir matching this number
         for ed in exercise_dirs:
             if ed.name.startswith(f"ex{ex_num}_") or ed.name == f"ex{ex_num}":
+                ex_dir = ed
                 starter_dir = ed / "starter"
                 if starter_dir.is_dir():
                     for f in sorted(starter_dir.iterdir()):
                         if f.suffix in HDL_EXTS | DATA_EXTS and f.name != "Makefile":
-                            files_to_inject.append((f.name, f.read_text()))
+                            files_to_inject.append((f.name, deps.read(f)))
                     # Also grab the Makefile content for reference
                     mf = starter_dir / "Makefile"
                     if mf.exists():
-                        files_to_inject.append(("Makefile", mf.read_text()))
+                        files_to_inject.append(("Makefile", deps.read(mf)))
                 break
 
     elif has_flat_starters:
@@ -505,7 +662,7 @@ def _inject_exercise_files(
         pattern = re.compile(rf"ex{ex_num}_|w\d+d\d+_ex{ex_num}_", re.IGNORECASE)
         for f in sorted(starter_dir.iterdir()):
             if f.suffix in HDL_EXTS and pattern.search(f.name):
-                files_to_inject.append((f.name, f.read_text()))
+                files_to_inject.append((f.name, deps.read(f)))
 
     if not files_to_inject:
         return
@@ -532,15 +689,23 @@ def _inject_exercise_files(
             f"iverilog -g2012 -Wall -o sim.vvp {tb} {srcs} && vvp sim.vvp",
             "Compile and simulate"
         ))
-        cells.append(_code_cell("show_waves('dump.vcd')"))
+        if ex_dir is not None:
+            cells.append(_show_waves_cell(ex_dir, deps))
+        else:
+            cells.append(_code_cell("show_waves('dump.vcd')"))
 
 
 # ---------------------------------------------------------------------------
 # Lecture notebook builder
 # ---------------------------------------------------------------------------
 
-def _build_lecture_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNode:
-    """Build a notebook for a single lecture day."""
+@timed(name="Build lecture notebook")
+def _build_lecture_notebook(
+    day_dir: Path, day_num: int, deps: Optional[InputTracker] = None
+) -> nbformat.NotebookNode:
+    """Build a notebook for a single lecture day, recording inputs in ``deps``."""
+    deps = deps if deps is not None else InputTracker()
+    deps.add_tree(day_dir)
     nb = new_notebook()
     nb.metadata["kernelspec"] = KERNEL_SPEC
     cells = nb["cells"]
@@ -560,7 +725,7 @@ def _build_lecture_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNod
         print(f"  ⚠  No readme in {day_dir}")
         return nb
 
-    readme = readme_path.read_text()
+    readme = deps.read(readme_path)
 
     # Title cell
     sections = _split_md_sections(readme)
@@ -575,7 +740,7 @@ def _build_lecture_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNod
         cells.append(_md_cell("---\n## Code Examples"))
         for f in sorted(code_dir.iterdir()):
             if f.suffix in HDL_EXTS:
-                content = f.read_text()
+                content = deps.read(f)
                 cells.append(_md_cell(f"### `{f.name}`"))
                 cells.append(_md_cell(f"```verilog\n{content}```"))
 
@@ -587,7 +752,7 @@ def _build_lecture_notebook(day_dir: Path, day_num: int) -> nbformat.NotebookNod
     for qp in quiz_candidates:
         if qp.exists():
             cells.append(_md_cell("---\n## Pre-Class Self-Check Quiz"))
-            quiz_text = qp.read_text()
+            quiz_text = deps.read(qp)
             # Strip the top heading if it duplicates
             quiz_text = re.sub(r"^#[^\n]*\n(?:##[^\n]*\n)?", "", quiz_text, count=1)
             cells.append(_md_cell(quiz_text.strip()))
@@ -606,8 +771,11 @@ def _day_num_from_dir(d: Path) -> Optional[int]:
     return int(m.group(1)) if m else None
 
 
-def convert_labs(out_root: Path, day_filter: Optional[int] = None):
+def convert_labs(out_root: Path, day_filter: Optional[int] = None,
+                 manifest: Optional[dict] = None, force: bool = False,
+                 standalone: bool = False):
     """Convert all lab days (or a single day) to notebooks."""
+    manifest = manifest if manifest is not None else {}
     out_dir = out_root / "labs"
     out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -621,15 +789,18 @@ def convert_labs(out_root: Path, day_filter: Optional[int] = None):
             continue
 
         print(f"  Lab day {day_num:02d}: {day_dir.name}")
-        nb = _build_lab_notebook(day_dir, day_num)
         out_path = out_dir / f"lab_day{day_num:02d}.ipynb"
-        with open(out_path, "w") as f:
-            nbformat.write(nb, f)
-        print(f"    → {out_path.relative_to(REPO_ROOT)}")
+        _write_if_stale(
+            lambda deps: _build_lab_notebook(day_dir, day_num, deps, standalone),
+            out_root, out_path, manifest, force,
+            "standalone" if standalone else "",
+        )
 
 
-def convert_lectures(out_root: Path, day_filter: Optional[int] = None):
+def convert_lectures(out_root: Path, day_filter: Optional[int] = None,
+                     manifest: Optional[dict] = None, force: bool = False):
     """Convert all lecture days (or a single day) to notebooks."""
+    manifest = manifest if manifest is not None else {}
     out_dir = out_root / "lectures"
     out_dir.mkdir(parents=True, exist_ok=True)
 
@@ -643,11 +814,11 @@ def convert_lectures(out_root: Path, day_filter: Optional[int] = None):
             continue
 
         print(f"  Lecture day {day_num:02d}: {day_dir.name}")
-        nb = _build_lecture_notebook(day_dir, day_num)
         out_path = out_dir / f"lecture_day{day_num:02d}.ipynb"
-        with open(out_path, "w") as f:
-            nbformat.write(nb, f)
-        print(f"    → {out_path.relative_to(REPO_ROOT)}")
+        _write_if_stale(
+            lambda deps: _build_lecture_notebook(day_dir, day_num, deps),
+            out_root, out_path, manifest, force,
+        )
 
 
 def main():
@@ -661,7 +832,14 @@ def main():
                         help="Convert a single day number")
     parser.add_argument("--out", type=str, default=str(DEFAULT_OUT),
                         help="Output directory root")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild every notebook, ignoring recorded inputs")
+    parser.add_argument("--standalone", action="store_true",
+                        help="Inline shared/hdlwaves into lab notebooks instead "
+                             "of importing it (for use outside the repo)")
+    instrument.add_arguments(parser)
     args = parser.parse_args()
+    instrument.start(args.profile, args.profile_phase, "md2nb")
 
     out_root = Path(args.out)
     do_labs = not args.lectures  # do labs unless --lectures only
@@ -670,16 +848,23 @@ def main():
     print(f"md2nb: converting HDL-for-DSD → {out_root.relative_to(REPO_ROOT)}/")
     print()
 
+    out_root.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(out_root)
+
     if do_labs:
         print("Converting labs:")
-        convert_labs(out_root, args.day)
+        with phase("Convert labs"):
+            convert_labs(out_root, args.day, manifest, args.force, args.standalone)
         print()
 
     if do_lectures:
         print("Converting lectures:")
-        convert_lectures(out_root, args.day)
+        with phase("Convert lectures"):
+            convert_lectures(out_root, args.day, manifest, args.force)
         print()
 
+    _save_manifest(out_root, manifest)
+
     print("Done.")
 
 
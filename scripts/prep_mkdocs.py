@@ -6,6 +6,7 @@ Usage:
     python3 scripts/prep_mkdocs.py          # prep only
     python3 scripts/prep_mkdocs.py --serve   # prep + mkdocs serve
     python3 scripts/prep_mkdocs.py --build   # prep + mkdocs build
+    python3 scripts/prep_mkdocs.py --profile # + timing trace (see instrument.py)
 """
 
 import json, os, re, shutil, subprocess, sys, zipfile
@@ -14,6 +15,16 @@ from pathlib import Path
 REPO = Path(__file__).resolve().parent.parent
 DOCS = REPO / "docs_src"
 YOUTUBE_FILE = REPO / "youtube_ids.json"
+# Pre-rendered waveform SVGs, keyed by VCD content hash (see hdlwaves.svg)
+WAVE_CACHE = REPO / ".cache" / "waves"
+
+sys.path.insert(0, str(REPO / "shared"))
+from hdlwaves.svg import prerender  # noqa: E402
+# Resource table from the last `scripts/synth_table.py` run (synth_table.TABLE_JSON)
+SYNTH_TABLE = REPO / ".cache" / "synth" / "table.json"
+sys.path.insert(0, str(REPO / "scripts"))
+import instrument  # noqa: E402
+from instrument import phase, timed  # noqa: E402
 
 GITHUB_RAW_BASE = "https://github.com/ucf-draco-mike/hdl-for-dsd/blob/main"
 
@@ -48,6 +59,7 @@ def load_youtube_ids():
         return {k: v for k, v in raw.items() if not k.startswith("_") and v}
     return {}
 
+@timed
 def get_slides(day_num, dir_name, yt_ids):
     slide_dir = REPO / "lectures" / dir_name
     if not slide_dir.exists():
@@ -70,6 +82,7 @@ def get_slides(day_num, dir_name, yt_ids):
         })
     return results
 
+@timed
 def generate_day_page(day_num, dir_name, title, yt_ids, code_assets=None):
     slides = get_slides(day_num, dir_name, yt_ids)
     wk = (day_num - 1) // 4 + 1
@@ -170,6 +183,7 @@ def generate_day_page(day_num, dir_name, title, yt_ids, code_assets=None):
 
 # ─── Lab code asset discovery ────────────────────────────────────
 
+@timed
 def discover_lab_code():
     """Scan labs/ and return code asset metadata per day.
 
@@ -244,6 +258,7 @@ def discover_lab_code():
     return day_assets
 
 
+@timed
 def build_lab_zips(code_assets):
     """Create zip archives in docs_src/downloads/ for MkDocs to pick up.
 
@@ -299,6 +314,7 @@ def build_lab_zips(code_assets):
     return code_assets
 
 
+@timed
 def generate_code_page(day_num, code_assets):
     """Generate a code.md page for a given day with download links."""
     if day_num not in code_assets:
@@ -410,6 +426,7 @@ def threads_for_day(day_num):
 
 
 
+@timed
 def generate_lab_page(day_num, dir_name, code_assets):
     """Generate an enriched lab.md by reading the lab README and injecting code links.
 
@@ -554,6 +571,7 @@ def generate_lab_page(day_num, dir_name, code_assets):
     return "\n".join(output)
 
 
+@timed
 def generate_homepage():
     """Generate a visually rich landing page."""
     lines = []
@@ -725,6 +743,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     return "\n".join(lines)
 
+@timed
 def post_build():
     """Copy non-markdown assets (slides, theme CSS) into _site/ for deployment."""
     site = REPO / "_site"
@@ -761,17 +780,79 @@ def post_build():
 
 
 
+@timed
+def generate_wave_section(dir_name, out_dir):
+    """Pre-render any lab VCDs (left behind by `make sim`) as static SVGs.
+
+    SVGs land in out_dir (docs_src/days/dayNN/waves/); returns a markdown
+    section embedding them, or "" when the lab has no dumps on disk.
+    """
+    lab_dir = REPO / "labs" / dir_name
+    vcds = sorted(lab_dir.rglob("*.vcd"))
+    if not vcds:
+        return ""
+    rendered = prerender(vcds, out_dir, WAVE_CACHE)
+    if not rendered:
+        return ""
+    lines = ["\n---\n", "## :material-waveform: Waveforms\n"]
+    for vcd, svg_name in rendered.items():
+        caption = str(vcd.relative_to(lab_dir))
+        lines.append(f"![{caption}](waves/{svg_name})\n")
+        lines.append(f"*`{caption}`*\n")
+    return "\n".join(lines)
+
+
+def load_synth_table():
+    """The last synth_table.py run's table, or None. Read here rather than
+    through synth_table, which imports the regression and sealing tools."""
+    try:
+        return json.loads(SYNTH_TABLE.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def generate_resource_section(dir_name, table):
+    """Cells / LUT / FF / Fmax of this day's lab solutions, from the cached
+    synth_table.py run; "" when the table has no rows for the lab."""
+    prefix = f"labs/{dir_name}/"
+    rows = [r for r in (table or {}).get("rows", []) if r["name"].startswith(prefix)]
+    if not rows:
+        return ""
+    from synth_table import markdown_table
+    return ("\n---\n\n## :material-chip: Resource Usage\n\n"
+            f"Reference solutions, {table['device']} "
+            f"(`scripts/synth_table.py`, {table['generated']}).\n\n"
+            + markdown_table(rows, strip=prefix))
+
+
+def generate_resources_page(table):
+    """Course-wide resource table (every lab solution and shared/lib module)."""
+    head = "# Resource Usage\n\n"
+    if not table:
+        return head + ("No synthesis results yet. Generate them with\n\n"
+                       "```bash\npython3 scripts/synth_table.py --pnr\n```\n")
+    from synth_table import markdown_table
+    tools = ", ".join(f"{k} `{v}`" for k, v in table["toolchain"].items())
+    return (head + f"`yosys synth_ice40` + `stat` on every lab solution and "
+            f"shared/lib module, {table['device']}. Generated {table['generated']} "
+            f"with {tools}.\n\n" + markdown_table(table["rows"]))
+
+
 def main():
+    instrument.start_from_argv(script="prep_mkdocs")
     print("\u2554\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2557")
     print("\u2551  Preparing MkDocs source                 \u2551")
     print("\u255a\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u2550\u255d")
 
     if DOCS.exists():
-        shutil.rmtree(DOCS)
+        with phase("Remove old docs_src"):
+            shutil.rmtree(DOCS)
     DOCS.mkdir()
 
     yt_ids = load_youtube_ids()
     print(f"  YouTube: {len(yt_ids)} video IDs loaded")
+    synth = load_synth_table()
+    print(f"  Resources: {len(synth['rows']) if synth else 0} synthesized designs")
 
     # Discover lab code assets and build zips
     code_assets = discover_lab_code()
@@ -795,6 +876,7 @@ def main():
         ("barcelona-project.md",  REPO / "docs" / "barcelona_project.md"),
     ]:
         if src.exists(): symlink(src, DOCS / name)
+    (DOCS / "resources.md").write_text(generate_resources_page(synth), encoding="utf-8")
     print(f"  Created: top-level pages (symlinks + index.md generated)")
 
     # Barcelona sub-pages
@@ -837,6 +919,8 @@ def main():
         # Generate enriched lab page (with code links injected)
         lab_md = generate_lab_page(day_num, dir_name, code_assets)
         if lab_md:
+            lab_md += generate_wave_section(dir_name, dd / "waves")
+            lab_md += generate_resource_section(dir_name, synth)
             (dd / "lab.md").write_text(lab_md, encoding="utf-8")
         else:
             lab = REPO / "labs" / dir_name / "README.md"
@@ -875,7 +959,8 @@ def main():
     if "--serve" in sys.argv:
         subprocess.run(["mkdocs", "serve"], cwd=REPO)
     elif "--build" in sys.argv:
-        subprocess.run(["mkdocs", "build"], cwd=REPO)
+        with phase("mkdocs build"):
+            subprocess.run(["mkdocs", "build"], cwd=REPO)
         post_build()
         print("  Output: _site/")
 
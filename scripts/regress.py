@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+regress.py — Course-wide simulation regression: every testbench in the
+repo, compiled with iverilog and run with vvp, in parallel.
+
+Usage:
+    python3 scripts/regress.py                     # everything, all cores
+    python3 scripts/regress.py week2_day07 d12_    # units whose path contains any
+    python3 scripts/regress.py --list              # show units and their sources
+    python3 scripts/regress.py -j 8 --timeout 120 --force
+
+Units are discovered, not configured:
+    labs/*/ex*/solution/        ref/ + tb/ (sealed layout) or flat
+    lecture_examples/*/*/
+    shared/lib/
+
+Every top-level testbench in those directories (seal_all.py's tb_ / _tb
+naming, or any file in a sealed tb/ dir, that no sibling instantiates)
+is one unit. Its sources are the modules it instantiates, resolved by
+name, recursively, from its own directory first and shared/lib second:
+the same helper lookup check_solution.sh and seal_all.py use. Data
+files (.hex, .mem, .vh, ...) from the unit's directories are copied next
+to the simulation, which runs in a scratch dir with a build/ subdir.
+
+A unit PASSes when it compiles, vvp finishes inside --timeout, exits 0
+and prints no failure line ("FAIL...", "ERROR...", "N failed" with
+N > 0, "SOME TESTS FAILED"). Observational testbenches therefore pass
+when they run to completion. Units matching scripts/regress_skip.txt,
+or instantiating iCE40 primitives (SB_*), are SKIPPED.
+
+A unit whose testbench directory holds an assertions spec
+(assertions.yaml / assertions.py, see shared/hdlwaves/assertions.py)
+must also satisfy it: after a passing run the spec's properties are
+checked over the VCD the simulation wrote, and any failure FAILs the
+unit, whatever the testbench printed.
+
+A unit whose Makefile sets `SIM_BACKEND ?= verilator` is built as a
+Verilator model (cached by simcache.py) and run natively, falling back to
+iverilog/vvp when Verilator is missing or cannot compile the testbench;
+--backend forces one simulator for every unit.
+
+Each unit compiles with the -D / -P / -g / -W flags of its Makefile's
+IVFLAGS (or IVERILOG_FLAGS), as `make sim` does, so a lecture example
+built with -DSIMULATION gets its short simulation timings here too;
+-g2012 is used when the Makefile names no language generation.
+
+Results are cached in .cache/regress/ by a hash of the sources, data
+files, assertions spec, flags, backend and tool versions, so a rerun only simulates what
+changed. Jobs start longest-first, using the durations from the last
+run. Each run writes .cache/regress/report.json (per-unit status,
+timings, output on failure) and .cache/regress/junit.xml.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+REPO = Path(__file__).resolve().parent.parent
+SHARED_LIB = REPO / "shared" / "lib"
+CACHE_DIR = REPO / ".cache" / "regress"
+SKIP_LIST = REPO / "scripts" / "regress_skip.txt"
+
+sys.path.insert(0, str(REPO / "scripts" / "lab_ctf"))
+sys.path.insert(0, str(REPO / "shared"))
+from seal_all import is_tb  # noqa: E402
+import simcache  # noqa: E402
+from hdlwaves.assertions import check_vcd, find_spec, load_spec  # noqa: E402
+
+REGRESS_VERSION = "4"           # bump when pass/fail rules change
+IVFLAGS = ["-g2012"]            # when the Makefile names no -g generation
+MAKEFILE_FLAGS = ("-D", "-P", "-g", "-W")   # taken from IVFLAGS / IVERILOG_FLAGS
+HDL_EXT = (".v", ".sv")
+DATA_EXT = (".hex", ".mem", ".vh", ".svh", ".txt", ".dat")
+TAIL_LINES = 40                 # output kept in the report for failures
+
+DECL_RE = re.compile(r"^\s*(?:module|macromodule|interface|package)\s+(\w+)", re.M)
+IDENT_RE = re.compile(r"\b[A-Za-z_]\w*\b")
+COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+PRIMITIVE_RE = re.compile(r"\bSB_[A-Z0-9_]+\s+(?:#\s*\(|\w+\s*\()")
+FAIL_RE = re.compile(
+    r"^\W*(?:FAIL|ERROR)"                           # FAIL: ..., *** ERROR
+    r"|\bSOME TESTS FAILED\b"
+    r"|\b[1-9]\d*\s+(?:FAILED|FAILURES|TESTS FAILED|failed|failures)\b",
+    re.M)
+BACKEND_RE = re.compile(r"^\s*SIM_BACKEND\s*[?:]?=\s*(\w+)", re.M)
+FLAGS_RE = re.compile(r"^\s*(?:IVFLAGS|IVERILOG_FLAGS)\s*([?:+]?)=(.*)$", re.M)
+RECIPE_RE = re.compile(r"(?:\$\(IVERILOG\)|\biverilog)\s([^;&|\n]*)")
+
+
+class Unit(NamedTuple):
+    name: str                   # repo-relative path of the testbench
+    top: Path
+    sources: tuple              # testbench first, then DUT / helpers
+    data: tuple                 # files copied next to the simulation
+    skip: str                   # reason, or "" to run
+    backend: str                # "iverilog" or "verilator" (from the Makefile)
+    flags: tuple                # iverilog -D / -P / -g / -W flags (from the Makefile)
+    assertions: Path | None     # spec checked against the dump, if any
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+_scan: dict = {}
+
+
+def scan(path: Path) -> tuple[frozenset, frozenset]:
+    """(declared modules, identifiers used) for one HDL file, comments removed."""
+    if path not in _scan:
+        text = COMMENT_RE.sub(" ", path.read_text(errors="replace"))
+        decls = frozenset(DECL_RE.findall(text))
+        _scan[path] = (decls, frozenset(IDENT_RE.findall(text)) - decls)
+    return _scan[path]
+
+
+def _hdl(dirs: list[Path]) -> list[Path]:
+    return sorted(f for d in dirs if d.is_dir() for f in d.iterdir()
+                  if f.is_file() and f.suffix in HDL_EXT)
+
+
+def _index(files: list[Path]) -> dict:
+    """module name -> file; a file named after the module wins a tie."""
+    out: dict = {}
+    for f in files:
+        for name in scan(f)[0]:
+            if name not in out or f.stem == name:
+                out[name] = f
+    return out
+
+
+def _closure(top: Path, local: dict, shared: dict) -> list[Path]:
+    order, seen, todo = [], set(), [top]
+    while todo:
+        f = todo.pop(0)
+        if f in seen:
+            continue
+        seen.add(f)
+        order.append(f)
+        for ident in sorted(scan(f)[1]):
+            dep = local.get(ident) or shared.get(ident)
+            if dep is not None and dep not in seen:
+                todo.append(dep)
+    return order
+
+
+def _groups() -> list[tuple[list[Path], bool]]:
+    """(directories, sealed-layout) for every place testbenches live."""
+    groups = []
+    for soln in sorted(REPO.glob("labs/week*/ex*/solution")):
+        if (soln / "ref").is_dir() and (soln / "tb").is_dir():
+            groups.append(([soln / "tb", soln / "ref"], True))
+        else:
+            groups.append(([soln], False))
+    for d in sorted(REPO.glob("lecture_examples/week*/*")):
+        if d.is_dir():
+            groups.append(([d], False))
+    groups.append(([SHARED_LIB], False))
+    return groups
+
+
+def makefile_backend(d: Path) -> str:
+    """The SIM_BACKEND an exercise's Makefile asks for (default iverilog)."""
+    mk = d / "Makefile"
+    m = BACKEND_RE.search(mk.read_text(errors="replace")) if mk.is_file() else None
+    return m.group(1) if m and m.group(1) in simcache.BACKENDS else "iverilog"
+
+
+def makefile_flags(d: Path) -> tuple:
+    """The -D / -P / -g / -W flags an exercise's Makefile gives iverilog, in
+    IVFLAGS / IVERILOG_FLAGS or on the iverilog recipe line itself."""
+    mk = d / "Makefile"
+    words: list = []
+    if mk.is_file():
+        text = mk.read_text(errors="replace")
+        for op, value in FLAGS_RE.findall(text):
+            words = words + value.split() if op == "+" else value.split()
+        for cmd in RECIPE_RE.findall("\n".join(
+                ln for ln in text.splitlines() if ln.startswith("\t"))):
+            words += [w for w in cmd.split() if "$(" not in w]
+    flags = list(dict.fromkeys(w for w in words if w.startswith(MAKEFILE_FLAGS)))
+    if not any(f.startswith("-g") for f in flags):
+        flags = [*IVFLAGS, *flags]
+    return tuple(flags)
+
+
+def load_skip_list(path: Path = SKIP_LIST) -> list[tuple[str, str]]:
+    """(glob, reason) pairs; '#' starts the reason / a comment line."""
+    if not path.exists():
+        return []
+    out = []
+    for raw in path.read_text(encoding="utf-8").splitlines():
+        pattern, _, reason = raw.partition("#")
+        if pattern.strip():
+            out.append((pattern.strip(), reason.strip() or "listed in regress_skip.txt"))
+    return out
+
+
+def discover(filters: list[str] | None = None, backend: str = "auto") -> list[Unit]:
+    shared_files = [f for f in _hdl([SHARED_LIB]) if not is_tb(f)]
+    shared = _index(shared_files)
+    skips = load_skip_list()
+    units = []
+    for dirs, sealed in _groups():
+        files = _hdl(dirs)
+        if sealed:
+            tbs = [f for f in files if f.parent == dirs[0]]
+        else:
+            tbs = [f for f in files if is_tb(f)]
+        local = _index(files)
+        used = set().union(*(scan(f)[1] for f in files)) if files else set()
+        data = tuple(sorted(f for d in dirs if d.is_dir() for f in d.iterdir()
+                            if f.is_file() and f.suffix in DATA_EXT))
+        home = dirs[0].parent if sealed else dirs[0]
+        chosen = backend if backend != "auto" else makefile_backend(home)
+        flags = makefile_flags(home)
+        for tb in tbs:
+            if scan(tb)[0] & used:          # instantiated by a sibling: a helper
+                continue
+            name = tb.relative_to(REPO).as_posix()
+            if filters and not any(p in name for p in filters):
+                continue
+            sources = _closure(tb, local, shared)
+            skip = next((reason for pattern, reason in skips
+                         if fnmatch.fnmatch(name, pattern)), "")
+            if not skip and any(PRIMITIVE_RE.search(COMMENT_RE.sub(" ", f.read_text(
+                    errors="replace"))) for f in sources):
+                skip = "instantiates iCE40 primitives (SB_*)"
+            units.append(Unit(name, tb, tuple(sources), data, skip, chosen, flags,
+                              find_spec(tb.parent)))
+    return units
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def tool_version(cmd: list[str]) -> str:
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return "missing"
+    text = (out.stdout or out.stderr).strip()
+    return text.splitlines()[0] if text else "?"
+
+
+def unit_key(unit: Unit, toolchain: str) -> str:
+    h = hashlib.sha256(f"{REGRESS_VERSION}\0{' '.join(unit.flags)}\0{toolchain}\0"
+                       f"{unit.backend}".encode())
+    for f in unit.sources + unit.data + ((unit.assertions,) if unit.assertions else ()):
+        h.update(f"\0{f.name}\0".encode())
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def _tail(text: str) -> str:
+    return "\n".join(text.splitlines()[-TAIL_LINES:])
+
+
+def check_assertions(spec_path: Path, work: Path) -> dict:
+    """Result updates after checking a spec over the run's newest VCD."""
+    try:
+        spec = load_spec(spec_path)
+        if "vcd" in spec:
+            dumps = [work / spec["vcd"]]
+        else:
+            dumps = sorted([*work.glob("*.vcd"), *work.glob("build/*.vcd")],
+                           key=lambda f: f.stat().st_mtime)
+        if not dumps or not dumps[-1].is_file():
+            return {"status": "fail",
+                    "output": f"[regress] {spec_path.name}: the simulation wrote no VCD"}
+        report = check_vcd(dumps[-1], spec)
+    except (OSError, ValueError) as exc:
+        return {"status": "error", "output": f"[regress] {spec_path.name}: {exc}"}
+    if report.ok:
+        return {}
+    return {"status": "fail", "output": report.summary()}
+
+
+def simulate(unit: Unit, compile_timeout: float, timeout: float) -> dict:
+    """Compile and run one unit in a scratch dir; never raises."""
+    res = {"status": "pass", "backend": "iverilog", "compile_s": 0.0, "run_s": 0.0,
+           "output": ""}
+    with tempfile.TemporaryDirectory(prefix="regress_") as t:
+        work = Path(t)
+        (work / "build").mkdir()
+        for f in unit.data:
+            shutil.copy(f, work / f.name)
+        inc = sorted({f"-I{f.parent}" for f in unit.sources})
+        compile_args = [*unit.flags, *inc, "-o", "sim.vvp", *[str(f) for f in unit.sources]]
+        steps = [
+            ("compile", ["iverilog", *compile_args], compile_timeout),
+            ("run", ["vvp", "-n", "sim.vvp"], timeout),
+        ]
+        if unit.backend == "verilator":
+            t0 = time.monotonic()
+            model = simcache.build_model(compile_args, quiet=True)
+            # Otherwise (or when make sim found its output differs from
+            # vvp's) fall back to iverilog/vvp.
+            if model is not None and simcache.model_verdict(model) is not False:
+                res.update(backend="verilator", compile_s=round(time.monotonic() - t0, 3))
+                steps = [("run", [str(model)], timeout)]
+        for step, cmd, limit in steps:
+            t0 = time.monotonic()
+            try:
+                out = subprocess.run(cmd, cwd=work, capture_output=True, timeout=limit)
+            except subprocess.TimeoutExpired as exc:
+                res[f"{step}_s"] = round(time.monotonic() - t0, 3)
+                res.update(status="timeout", output=_tail(
+                    (exc.stdout or b"").decode(errors="replace")
+                    + f"\n[regress] {step} exceeded {limit:g} s"))
+                return res
+            except OSError as exc:
+                res.update(status="error", output=f"[regress] {cmd[0]}: {exc}")
+                return res
+            res[f"{step}_s"] = round(time.monotonic() - t0, 3)
+            if res["backend"] == "verilator":
+                out.stdout = simcache.strip_chatter(out.stdout)
+            text = (out.stdout + out.stderr).decode(errors="replace")
+            if step == "compile" and out.returncode != 0:
+                res.update(status="error", output=_tail(text))
+                return res
+        res["output"] = text
+        if out.returncode != 0:
+            res["status"] = "fail"
+            sim = "Verilator model" if res["backend"] == "verilator" else "vvp"
+            res["output"] = text + f"\n[regress] {sim} exited with {out.returncode}"
+        elif FAIL_RE.search(out.stdout.decode(errors="replace")):
+            res["status"] = "fail"
+        elif unit.assertions is not None:
+            res.update(check_assertions(unit.assertions, work))
+    if res["status"] == "pass":
+        res["output"] = ""
+    else:
+        res["output"] = _tail(res["output"])
+    return res
+
+
+def run_unit(unit: Unit, toolchain: str, args) -> dict:
+    base = {"name": unit.name, "sources": [f.relative_to(REPO).as_posix()
+                                           for f in unit.sources],
+            "flags": list(unit.flags)}
+    if unit.skip:
+        return dict(base, status="skip", output=unit.skip, cached=False,
+                    backend=unit.backend, compile_s=0.0, run_s=0.0)
+    key = unit_key(unit, toolchain)
+    entry = CACHE_DIR / "results" / f"{key[:32]}.json"
+    if not args.force and entry.is_file():
+        return dict(base, **json.loads(entry.read_text()), cached=True)
+    res = simulate(unit, args.compile_timeout, args.timeout)
+    if res["status"] != "timeout":          # a slow machine is not a result
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(res))
+        tmp.replace(entry)
+    return dict(base, **res, cached=False)
+
+
+# ---------------------------------------------------------------------------
+# Reports
+# ---------------------------------------------------------------------------
+
+def write_junit(results: list[dict], path: Path) -> None:
+    root = ET.Element("testsuites", name="hdl-for-dsd regression")
+    for suite in ("labs", "lecture_examples", "shared"):
+        rows = [r for r in results if r["name"].startswith(suite + "/")]
+        if not rows:
+            continue
+        el = ET.SubElement(root, "testsuite", name=suite, tests=str(len(rows)),
+                           failures=str(sum(r["status"] == "fail" for r in rows)),
+                           errors=str(sum(r["status"] in ("error", "timeout")
+                                          for r in rows)),
+                           skipped=str(sum(r["status"] == "skip" for r in rows)),
+                           time=f"{sum(r['compile_s'] + r['run_s'] for r in rows):.3f}")
+        for r in rows:
+            cls, _, name = r["name"].rpartition("/")
+            case = ET.SubElement(el, "testcase", classname=cls.replace("/", "."),
+                                 name=name, time=f"{r['compile_s'] + r['run_s']:.3f}")
+            if r["status"] == "skip":
+                ET.SubElement(case, "skipped", message=r["output"])
+            elif r["status"] == "fail":
+                ET.SubElement(case, "failure", message="testbench reported failure"
+                              ).text = r["output"]
+            elif r["status"] in ("error", "timeout"):
+                ET.SubElement(case, "error", message=r["status"]).text = r["output"]
+    ET.indent(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("filters", nargs="*", metavar="PATTERN",
+                    help="only units whose path contains any of these substrings")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--timeout", type=float, default=60,
+                    help="seconds per vvp run (default 60)")
+    ap.add_argument("--compile-timeout", type=float, default=60)
+    ap.add_argument("--backend", choices=("auto", *simcache.BACKENDS), default="auto",
+                    help="simulator for every unit (default: each Makefile's SIM_BACKEND)")
+    ap.add_argument("--force", action="store_true", help="ignore cached results")
+    ap.add_argument("--list", action="store_true",
+                    help="list units and their resolved sources, then exit")
+    ap.add_argument("--json", type=Path, default=CACHE_DIR / "report.json")
+    ap.add_argument("--junit", type=Path, default=CACHE_DIR / "junit.xml")
+    args = ap.parse_args(argv)
+
+    units = discover(args.filters, args.backend)
+    if args.list:
+        for u in units:
+            deps = " ".join(f.relative_to(REPO).as_posix() for f in u.sources[1:])
+            tags = "".join(f"  [{t}]" for t in (
+                f"skip: {u.skip}" if u.skip else "",
+                u.backend if u.backend != "iverilog" else "",
+                " ".join(f for f in u.flags if f[:2] in ("-D", "-P")),
+                u.assertions.name if u.assertions else "") if t)
+            print(f"{u.name}{tags}\n    {deps}")
+        print(f"{len(units)} units")
+        return 0
+    if not units:
+        print(f"regress: no testbenches match {args.filters}", file=sys.stderr)
+        return 1
+    if not shutil.which("iverilog") or not shutil.which("vvp"):
+        print("regress: iverilog/vvp not found on PATH (nix develop?)", file=sys.stderr)
+        return 1
+    toolchain = tool_version(["iverilog", "-V"])
+    if any(u.backend == "verilator" for u in units):
+        toolchain += f"; {simcache.tool_version('verilator') or 'verilator missing'}"
+
+    # Longest first, by last run's durations, so one slow UART bench does
+    # not start last and set the wall-clock time on its own.
+    timings_path = CACHE_DIR / "timings.json"
+    timings = json.loads(timings_path.read_text()) if timings_path.is_file() else {}
+    order = sorted(units, key=lambda u: -timings.get(u.name, 0.0))
+
+    t0 = time.monotonic()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(run_unit, u, toolchain, args) for u in order]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            secs = r["compile_s"] + r["run_s"]
+            note = "cached" if r["cached"] else (r["output"] if r["status"] == "skip"
+                                                 else f"{secs:.1f} s")
+            if r["backend"] != "iverilog":
+                note += f", {r['backend']}"
+            print(f"[{r['status'].upper():<7}] {r['name']}  ({note})", file=sys.stderr)
+    wall = time.monotonic() - t0
+
+    results.sort(key=lambda r: r["name"])
+    counts = {s: sum(r["status"] == s for r in results)
+              for s in ("pass", "fail", "error", "timeout", "skip")}
+    timings.update({r["name"]: r["compile_s"] + r["run_s"]
+                    for r in results if r["status"] != "skip"})
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    timings_path.write_text(json.dumps(timings, indent=1, sort_keys=True) + "\n")
+
+    report = {"toolchain": toolchain, "default_flags": IVFLAGS, "jobs": args.jobs,
+              "wall_s": round(wall, 3), "counts": counts,
+              "cached": sum(r["cached"] for r in results), "units": results}
+    args.json.parent.mkdir(parents=True, exist_ok=True)
+    args.json.write_text(json.dumps(report, indent=2) + "\n")
+    write_junit(results, args.junit)
+
+    print(f"\n{len(results)} units in {wall:.1f} s ({report['cached']} cached): "
+          + ", ".join(f"{n} {s}" for s, n in counts.items() if n))
+    for r in results:
+        if r["status"] in ("fail", "error", "timeout"):
+            print(f"  {r['status'].upper():<7} {r['name']}")
+    print(f"Reports: {args.json}  {args.junit}")
+    return 0 if counts["fail"] + counts["error"] + counts["timeout"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
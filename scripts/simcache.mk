@@ -0,0 +1,33 @@
+# simcache.mk — included (optionally) by the lab / lecture Makefiles
+#
+# Routes `make sim` through scripts/simcache.py, which replays the compiled
+# image, stdout and VCDs of an unchanged simulation instead of rerunning
+# iverilog and vvp. Each Makefile has:
+#
+#   -include ../../../../scripts/simcache.mk
+#   IVERILOG ?= iverilog
+#   VVP      ?= vvp
+#
+# and calls $(IVERILOG) / $(VVP) in its recipes, so a copy of the folder
+# without scripts/ (a download zip) falls back to the plain tools.
+# Bypass for one run with `make sim SIMCACHE=off`; see simcache.py for
+# the cache location and size limit.
+#
+# SIM_BACKEND picks the simulator behind $(IVERILOG) / $(VVP): iverilog
+# (default) or verilator, which builds a cached Verilator model and runs
+# it once its stdout has matched vvp's byte for byte; testbenches it cannot
+# compile, or whose output differs, stay on iverilog/vvp. Long reference
+# solutions and lecture examples set `SIM_BACKEND ?= verilator` above the
+# include (student starters do not); override with
+# `make sim SIM_BACKEND=iverilog`.
+
+_SIMCACHE_MK := $(lastword $(MAKEFILE_LIST))
+SIMCACHE_PY  ?= $(abspath $(dir $(_SIMCACHE_MK)))/simcache.py
+
+SIM_BACKEND  ?= iverilog
+export SIM_BACKEND
+
+ifneq ($(SIMCACHE),off)
+IVERILOG ?= python3 $(SIMCACHE_PY) iverilog
+VVP      ?= python3 $(SIMCACHE_PY) vvp
+endif
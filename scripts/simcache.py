@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+simcache.py — Content-hash cache in front of iverilog and vvp, so an
+unchanged `make sim` replays instead of recompiling and resimulating.
+
+Usage (what scripts/simcache.mk makes the lab Makefiles run):
+    python3 scripts/simcache.py iverilog -g2012 -Wall -o sim.vvp tb_foo.v foo.v
+    python3 scripts/simcache.py vvp sim.vvp
+    python3 scripts/simcache.py stats
+    python3 scripts/simcache.py clear
+
+`iverilog ARGS` and `vvp ARGS` take exactly the real tools' arguments.
+
+iverilog: the key hashes the argument list, every source file named on
+    it, the files in its -I / -y directories, the include files beside
+    the sources, every file pulled in by `include (followed recursively
+    through the source directories and -I) and the iverilog version. A hit copies the cached image to
+    the -o path.
+vvp: the key hashes the image, the other arguments, the data files the
+    simulation may read from the working directory (.hex, .mem, ...) and
+    the vvp version. A hit replays stdout, stderr and the exit status, and
+    restores the files the run wrote (VCDs, logs) in the working directory
+    and its build/ subdirectory.
+
+Backends: SIM_BACKEND=verilator (set per exercise in its Makefile, see
+simcache.mk) makes the iverilog step also build a Verilator model of the
+same sources (`verilator --binary --timing --trace`, cached like an
+image). The model only replaces vvp once it has been shown to print
+exactly what vvp prints: the first vvp step after a model is built runs
+vvp as usual, then runs the model on a scratch copy of the working
+directory and compares stdout (Verilator's own banner lines dropped) and
+exit status byte for byte. The verdict is stored with the model; on any
+difference (vvp's "VCD info" / "$finish called" notices, `%t` widths,
+...) that model is never used and every run stays on vvp. When Verilator
+is not installed, or cannot build the testbench (unsupported
+constructs), both steps fall back to iverilog/vvp; a failed build is
+cached too, so the fallback costs nothing on the next run.
+
+A miss runs the real tool (output streams as usual) and stores the
+result. Failed compiles and interrupted runs are not stored. Entries
+live in .cache/simcache/ (SIMCACHE_DIR) and the least recently used ones
+are evicted once the cache exceeds SIMCACHE_MAX_MB (default 512).
+SIMCACHE=off bypasses the cache entirely. A tool that is not installed
+gives a one-line error and exit status 127, as from the shell.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get("SIMCACHE_DIR", REPO / ".cache" / "simcache"))
+MAX_BYTES = int(float(os.environ.get("SIMCACHE_MAX_MB", "512")) * (1 << 20))
+SIMCACHE_VERSION = "2"          # bump when the key or entry layout changes
+
+HDL_EXT = (".v", ".sv", ".vh", ".svh")
+INCLUDE_EXT = (".vh", ".svh")
+DATA_EXT = (".hex", ".mem", ".txt", ".dat", ".csv")
+OUTPUT_SUBDIRS = ("build",)     # scanned for files a simulation writes
+
+# Options whose value is the next token when not attached (-o out / -oout).
+IVERILOG_VALUE_OPTS = {"-o", "-s", "-I", "-y", "-Y", "-c", "-f", "-p", "-M", "-N",
+                       "-T", "-t", "-B", "-L", "-l", "-D", "-P", "-W", "-g"}
+VVP_VALUE_OPTS = {"-M", "-m", "-l"}
+
+BACKENDS = ("iverilog", "verilator")
+VERILATOR_FLAGS = ["--binary", "--timing", "--trace", "-O2", "-Wno-fatal",
+                   "-Wno-lint", "-Wno-style"]
+VERILATOR_TIMEOUT = 600         # seconds for one model build
+# "- tb.v:42: Verilog $finish", "- S i m u l a t i o n   R e p o r t: ...",
+# "- Verilator: $finish at 1ms; walltime ..."
+CHATTER_RE = re.compile(rb"^- (?:\S+:\d+: Verilog \$finish|S i m u l a t i o n |Verilator: )")
+DECL_RE = re.compile(r"^\s*(?:module|interface|package)\s+(\w+)", re.M)
+COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+INCLUDE_RE = re.compile(r'^\s*`include\s+"([^"]+)"', re.M)
+
+
+# ---------------------------------------------------------------------------
+# Keys
+# ---------------------------------------------------------------------------
+
+def _hash_file(h, path: Path) -> None:
+    h.update(f"\0{path.name}\0".encode())
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+
+
+def _dir_files(d: Path, exts: tuple) -> list[Path]:
+    if not d.is_dir():
+        return []
+    return sorted(f for f in d.iterdir() if f.is_file() and f.suffix in exts)
+
+
+def _includes(sources: list[Path], inc_dirs: list[Path]) -> list[Path]:
+    """Every file reached through `include "..." from the sources, searched
+    (like iverilog) beside the including file, in the working directory and
+    in the -I directories. Names that resolve nowhere are left to iverilog."""
+    found, todo = [], list(sources)
+    seen = {f.resolve() for f in todo}
+    while todo:
+        src = todo.pop()
+        try:
+            text = COMMENT_RE.sub("", src.read_text(errors="replace"))
+        except OSError:
+            continue
+        for name in INCLUDE_RE.findall(text):
+            for d in (src.parent, Path("."), *inc_dirs):
+                f = d / name
+                if f.is_file():
+                    if f.resolve() not in seen:
+                        seen.add(f.resolve())
+                        found.append(f)
+                        todo.append(f)
+                    break
+    return sorted(found)
+
+
+def sim_backend() -> str:
+    name = os.environ.get("SIM_BACKEND", "iverilog").strip().lower() or "iverilog"
+    if name not in BACKENDS:
+        print(f"[simcache] SIM_BACKEND={name!r} unknown; using iverilog", file=sys.stderr)
+        return "iverilog"
+    return name
+
+
+def tool_version(tool: str) -> str | None:
+    """First line of `tool -V`, memoised by the binary's path and mtime."""
+    exe = shutil.which(tool)
+    if exe is None:
+        return None
+    st = os.stat(exe)
+    memo_key = f"{exe}:{st.st_mtime_ns}:{st.st_size}"
+    memo_path = CACHE_DIR / "tools.json"
+    try:
+        memo = json.loads(memo_path.read_text())
+    except (OSError, ValueError):
+        memo = {}
+    if memo_key not in memo:
+        try:
+            out = subprocess.run([exe, "-V"], capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        text = (out.stdout or out.stderr).strip()
+        memo[memo_key] = text.splitlines()[0] if text else "?"
+        _atomic_write(memo_path, json.dumps(memo, indent=1).encode())
+    return memo[memo_key]
+
+
+def split_args(args: list[str], value_opts: set) -> tuple[list[tuple[str, str]], list[str]]:
+    """(option, value) pairs and positional arguments, in order."""
+    opts, pos, i = [], [], 0
+    while i < len(args):
+        a = args[i]
+        if a in value_opts and i + 1 < len(args):
+            opts.append((a, args[i + 1]))
+            i += 2
+            continue
+        if a.startswith("-") and len(a) > 2 and a[:2] in value_opts:
+            opts.append((a[:2], a[2:]))
+        elif a.startswith("-") or a.startswith("+"):
+            opts.append((a, ""))
+        else:
+            pos.append(a)
+        i += 1
+    return opts, pos
+
+
+def compile_key(args: list[str], version: str) -> tuple[str, Path] | None:
+    """(key, output path) for an iverilog command line, or None to bypass."""
+    opts, sources = split_args(args, IVERILOG_VALUE_OPTS)
+    out = Path(next((v for o, v in opts if o == "-o"), "a.out"))
+    h = hashlib.sha256(f"{SIMCACHE_VERSION}\0iverilog\0{version}\0".encode())
+    h.update("\0".join(a for a in args if a != str(out)).encode())
+    files, dirs, inc_dirs = [], {Path(".")}, []
+    for o, v in opts:
+        if o in ("-c", "-f", "-l"):
+            files.append(Path(v))
+        elif o in ("-I", "-y"):
+            files += _dir_files(Path(v), HDL_EXT)
+            if o == "-I":
+                inc_dirs.append(Path(v))
+    for s in sources:
+        files.append(Path(s))
+        dirs.add(Path(s).parent)
+    for d in sorted(dirs):
+        files += _dir_files(d, INCLUDE_EXT)
+    files += _includes([Path(s) for s in sources], inc_dirs)
+    try:
+        for f in files:
+            _hash_file(h, f)
+    except OSError:
+        return None             # let iverilog report the missing file
+    return h.hexdigest(), out
+
+
+def run_key(args: list[str], version: str) -> tuple[str, Path] | None:
+    """(key, image path) for a vvp command line, or None to bypass."""
+    opts, pos = split_args(args, VVP_VALUE_OPTS)
+    if not pos:
+        return None
+    image = Path(pos[0])
+    h = hashlib.sha256(f"{SIMCACHE_VERSION}\0vvp\0{version}\0".encode())
+    h.update("\0".join(a for a in args if a != pos[0]).encode())
+    try:
+        _hash_file(h, image)
+        for f in _dir_files(Path("."), DATA_EXT):
+            _hash_file(h, f)
+    except OSError:
+        return None
+    return h.hexdigest(), image
+
+
+# ---------------------------------------------------------------------------
+# Entries
+# ---------------------------------------------------------------------------
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _entry(key: str) -> Path:
+    return CACHE_DIR / "objects" / key[:2] / key
+
+
+def lookup(key: str) -> Path | None:
+    entry = _entry(key)
+    meta = entry / "meta.json"
+    if not meta.is_file():
+        return None
+    os.utime(meta)              # LRU: a hit makes the entry recent again
+    return entry
+
+
+def store(key: str, meta: dict, files: dict) -> None:
+    """Write an entry atomically; files maps entry-relative name -> source path."""
+    final = _entry(key)
+    if final.exists():
+        return
+    final.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{key[:8]}.", dir=final.parent))
+    try:
+        for name, src in files.items():
+            dst = tmp / name
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(src, bytes):
+                dst.write_bytes(src)
+            else:
+                shutil.copy(src, dst)
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=1))
+        tmp.rename(final)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+    evict(MAX_BYTES)
+
+
+def _entries() -> list[tuple[float, int, Path]]:
+    """(last use, bytes, path) for every entry."""
+    out = []
+    for meta in (CACHE_DIR / "objects").glob("*/*/meta.json"):
+        entry = meta.parent
+        try:
+            size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+            out.append((meta.stat().st_mtime, size, entry))
+        except OSError:
+            continue
+    return out
+
+
+def evict(limit: int) -> int:
+    """Drop least recently used entries until the cache fits in limit bytes."""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry in entries:
+        if total <= limit:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Verilator backend
+# ---------------------------------------------------------------------------
+
+def top_module(sources: list[str]) -> str | None:
+    """The one module no other source instantiates (iverilog's implicit root)."""
+    decls, used = {}, {}
+    for s in sources:
+        text = COMMENT_RE.sub(" ", Path(s).read_text(errors="replace"))
+        decls[s] = set(DECL_RE.findall(text))
+        used[s] = set(re.findall(r"\b\w+\b", text)) - decls[s]
+    roots = [m for s in sources for m in sorted(decls[s])
+             if not any(m in used[o] for o in sources)]
+    return roots[0] if len(roots) == 1 else None
+
+
+def verilator_args(args: list[str]) -> list[str] | None:
+    """Translate an iverilog command line; None if it has no equivalent."""
+    opts, sources = split_args(args, IVERILOG_VALUE_OPTS)
+    out, top = [], None
+    for o, v in opts:
+        if o in ("-D", "-I"):
+            out.append(o + v)
+        elif o == "-y":
+            out += ["-y", v]
+        elif o == "-Y":
+            out.append(f"+libext+{v}")
+        elif o == "-s":
+            top = v
+        elif o == "-P":                     # -Ptb.NAME=value -> -GNAME=value
+            out.append("-G" + v.split(".", 1)[-1])
+        elif o == "-f":
+            out += ["-f", v]
+        elif o in ("-o", "-g", "-W", "-Wall") or o.startswith("-W"):
+            continue
+        else:
+            return None
+    try:
+        top = top or top_module(sources)
+    except OSError:
+        return None
+    if top is None:
+        return None
+    return [*VERILATOR_FLAGS, "--top-module", top, *out, *sources]
+
+
+def build_model(args: list[str], quiet: bool = False) -> Path | None:
+    """Cached Verilator executable for an iverilog command line, or None
+    (not installed, untranslatable, or the build failed)."""
+    version = tool_version("verilator")
+    vargs = verilator_args(args) if version else None
+    keyed = compile_key(args, f"verilator {version}") if vargs else None
+    if keyed is None:
+        return None
+    key = keyed[0]
+    entry = lookup(key)
+    if entry is None:
+        t0 = time.monotonic()
+        with tempfile.TemporaryDirectory(prefix="simcache_vl_") as t:
+            cmd = ["verilator", *vargs, "-Mdir", t, "-o", "Vsim"]
+            try:
+                res = subprocess.run(cmd, capture_output=True, timeout=VERILATOR_TIMEOUT)
+                ok, log = res.returncode == 0, res.stdout + res.stderr
+            except subprocess.TimeoutExpired:
+                ok, log = False, b"verilator build timed out"
+            exe = Path(t) / "Vsim"
+            meta = {"tool": "verilator", "args": cmd, "version": version,
+                    "seconds": round(time.monotonic() - t0, 3), "created": time.time(),
+                    "supported": ok and exe.is_file()}
+            store(key, meta, {"model": exe} if meta["supported"] else {"log": log})
+        entry = lookup(key)
+        if entry is None:
+            return None
+    if (entry / "model").is_file():
+        return entry / "model"
+    if not quiet:
+        print(f"[simcache] Verilator cannot build this testbench; using iverilog "
+              f"(log: {entry / 'log'})", file=sys.stderr)
+    return None
+
+
+def model_verdict(model: Path) -> bool | None:
+    """Whether a model's stdout matched vvp's (None: not checked yet)."""
+    try:
+        return json.loads((model.parent / "verdict.json").read_text())["match"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def verify_model(model: Path, plusargs: list[str], stdout: bytes, rc: int) -> bool:
+    """Run the model beside copies of the working directory's data files and
+    record whether its stdout and exit status equal vvp's (stdout, rc)."""
+    with tempfile.TemporaryDirectory(prefix="simcache_verify_") as t:
+        work = Path(t)
+        for d in OUTPUT_SUBDIRS:
+            (work / d).mkdir()
+        for f in _dir_files(Path("."), DATA_EXT):
+            shutil.copy(f, work / f.name)
+        try:
+            res = subprocess.run([str(model.resolve()), *plusargs], cwd=work,
+                                 capture_output=True, timeout=VERILATOR_TIMEOUT)
+            got, got_rc = strip_chatter(res.stdout), res.returncode
+        except (OSError, subprocess.TimeoutExpired):
+            got, got_rc = None, None
+    match = got == stdout and got_rc == rc
+    verdict = {"match": match, "checked": time.time()}
+    if not match:
+        want, have = stdout.splitlines(), (got or b"").splitlines()
+        i = next((i for i, (x, y) in enumerate(zip(want, have)) if x != y),
+                 min(len(want), len(have)))
+        show = lambda lines: lines[i].decode(errors="replace") if i < len(lines) else None
+        verdict.update(line=i + 1, vvp=show(want), model=show(have),
+                       returncodes=[rc, got_rc])
+        print(f"[simcache] Verilator model output differs from vvp at line {i + 1}; "
+              f"staying on vvp (see {model.parent / 'verdict.json'})", file=sys.stderr)
+    _atomic_write(model.parent / "verdict.json", json.dumps(verdict, indent=1).encode())
+    return match
+
+
+def _link(image: Path) -> Path:
+    h = hashlib.sha256()
+    _hash_file(h, image)
+    return CACHE_DIR / "links" / h.hexdigest()
+
+
+def strip_chatter(data: bytes) -> bytes:
+    """Verilator's own status lines removed from a model's stdout."""
+    return b"".join(ln for ln in data.splitlines(keepends=True)
+                    if not CHATTER_RE.match(ln))
+
+
+# ---------------------------------------------------------------------------
+# Tools
+# ---------------------------------------------------------------------------
+
+def _tee(src, dst, sink: list, keep=None) -> None:
+    if keep is None:
+        for block in iter(lambda: src.read1(1 << 16), b""):
+            sink.append(block)
+            dst.write(block)
+            dst.flush()
+        return
+    for line in iter(src.readline, b""):
+        if keep(line):
+            sink.append(line)
+            dst.write(line)
+            dst.flush()
+
+
+def _not_found(cmd: list[str], exc: OSError) -> int:
+    print(f"[simcache] {cmd[0]}: {exc.strerror or exc}", file=sys.stderr)
+    return 127                  # the shell's status for a missing command
+
+
+def call(cmd: list[str]) -> int:
+    """subprocess.call, with a one-line error and 127 if cmd can't be run."""
+    try:
+        return subprocess.call(cmd)
+    except OSError as exc:
+        return _not_found(cmd, exc)
+
+
+def run_teed(cmd: list[str], keep=None) -> tuple[int, bytes, bytes]:
+    """Run cmd with stdout/stderr streaming through and captured; keep(line)
+    filters stdout line by line."""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = [], []
+    threads = [threading.Thread(target=_tee, args=(proc.stdout, sys.stdout.buffer,
+                                                   out, keep)),
+               threading.Thread(target=_tee, args=(proc.stderr, sys.stderr.buffer, err))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return proc.wait(), b"".join(out), b"".join(err)
+
+
+def _snapshot() -> dict:
+    """{path: (mtime, size)} for files a simulation might write."""
+    snap = {}
+    for d in (Path("."), *map(Path, OUTPUT_SUBDIRS)):
+        if not d.is_dir():
+            continue
+        for f in d.iterdir():
+            if f.is_file():
+                st = f.stat()
+                snap[f] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+
+def cmd_iverilog(args: list[str]) -> int:
+    version = tool_version("iverilog")
+    keyed = compile_key(args, version) if version else None
+    if keyed is None:
+        return call(["iverilog", *args])
+    key, out = keyed
+    entry = lookup(key)
+    if entry is not None:
+        meta = json.loads((entry / "meta.json").read_text())
+        sys.stderr.buffer.write((entry / "stderr").read_bytes())
+        out.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(entry / "image", out)
+        print(f"[simcache] compile: cached ({meta['seconds']:.2f} s saved)",
+              file=sys.stderr)
+        rc = 0
+    else:
+        t0 = time.monotonic()
+        try:
+            rc, stdout, stderr = run_teed(["iverilog", *args])
+        except OSError as exc:
+            return _not_found(["iverilog"], exc)
+        if rc == 0 and out.is_file():
+            store(key, {"tool": "iverilog", "args": args, "version": version,
+                        "seconds": round(time.monotonic() - t0, 3),
+                        "created": time.time()},
+                  {"image": out, "stderr": stdout + stderr})
+    if rc == 0 and sim_backend() == "verilator":
+        # Point the image at a model of the same sources for the vvp step.
+        model = build_model(args)
+        link = _link(out)
+        if model is not None:
+            _atomic_write(link, model.parent.name.encode())
+        else:
+            link.unlink(missing_ok=True)
+    return rc
+
+
+def cmd_vvp(args: list[str]) -> int:
+    version = tool_version("vvp")
+    keyed = run_key(args, version) if version else None
+    if keyed is None:
+        return call(["vvp", *args])
+    key, image = keyed
+    model = unverified = None
+    if sim_backend() == "verilator":
+        link = _link(image)
+        if link.is_file():
+            entry = lookup(link.read_text().strip())
+            model = entry / "model" if entry and (entry / "model").is_file() else None
+        if model is not None:     # else the iverilog step reported why
+            verdict = model_verdict(model)
+            if verdict is None:   # run vvp this time and compare the model with it
+                model, unverified = None, model
+            elif not verdict:
+                model = None
+        if model is not None:
+            key = hashlib.sha256(f"{key}\0verilator\0{model.parent.name}".encode()
+                                 ).hexdigest()
+    _, pos = split_args(args, VVP_VALUE_OPTS)
+    # vvp's own options (-n, -l, -M ...) precede the image; the rest are
+    # the simulation's +plusargs.
+    plusargs = args[args.index(pos[0]) + 1:]
+    entry = lookup(key)
+    if entry is not None:
+        meta = json.loads((entry / "meta.json").read_text())
+        sys.stdout.buffer.write((entry / "stdout").read_bytes())
+        sys.stdout.flush()
+        sys.stderr.buffer.write((entry / "stderr").read_bytes())
+        for rel in meta["outputs"]:
+            dst = Path(rel)
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry / "files" / rel, dst)
+        print(f"[simcache] run: cached ({meta['seconds']:.2f} s saved)",
+              file=sys.stderr)
+        return meta["returncode"]
+    before = _snapshot()
+    t0 = time.monotonic()
+    cmd = [str(model), *plusargs] if model is not None else ["vvp", *args]
+    try:
+        rc, stdout, stderr = run_teed(
+            cmd, keep=(lambda ln: not CHATTER_RE.match(ln)) if model else None)
+    except OSError as exc:
+        return _not_found(cmd, exc)
+    seconds = time.monotonic() - t0
+    if rc < 0:                  # killed (Ctrl-C): not a result
+        return rc
+    written = [f for f, stamp in _snapshot().items()
+               if before.get(f) != stamp and f.resolve() != image.resolve()]
+    files = {"stdout": stdout, "stderr": stderr}
+    files.update({f"files/{f.as_posix()}": f for f in written})
+    store(key, {"tool": "verilator" if model else "vvp", "args": args,
+                "version": version,
+                "seconds": round(seconds, 3), "returncode": rc,
+                "outputs": [f.as_posix() for f in written], "created": time.time()},
+          files)
+    if unverified is not None:
+        verify_model(unverified, plusargs, stdout, rc)
+    return rc
+
+
+def cmd_stats(args) -> int:
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"{CACHE_DIR}: {len(entries)} entries, {total / (1 << 20):.1f} MB "
+          f"of {MAX_BYTES / (1 << 20):.0f} MB")
+    if entries:
+        saved = 0.0
+        for _, _, entry in entries:
+            try:
+                saved += json.loads((entry / "meta.json").read_text())["seconds"]
+            except (OSError, ValueError, KeyError):
+                pass
+        print(f"each entry replays in place of {saved / len(entries):.2f} s "
+              f"of tool time on average")
+    return 0
+
+
+def cmd_clear(args) -> int:
+    n = evict(0)
+    print(f"removed {n} entries from {CACHE_DIR}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    tools = {"iverilog": cmd_iverilog, "vvp": cmd_vvp}
+    if argv and argv[0] in tools:
+        if os.environ.get("SIMCACHE", "").lower() in ("off", "0", "no"):
+            return call(argv)
+        return tools[argv[0]](argv[1:])
+
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter,
+                                 epilog="Tool commands: iverilog ARGS..., vvp ARGS...")
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="entries, size and limit").set_defaults(func=cmd_stats)
+    sub.add_parser("clear", help="remove every entry").set_defaults(func=cmd_clear)
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
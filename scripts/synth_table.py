@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+synth_table.py — Course-wide resource table: `yosys synth_ice40` + `stat`
+(and optionally nextpnr timing) on every lab solution and shared/lib
+module, in parallel.
+
+Usage:
+    python3 scripts/synth_table.py                   # synth every design, all cores
+    python3 scripts/synth_table.py week1_day03 uart  # designs whose name contains any
+    python3 scripts/synth_table.py --pnr             # also place & route: Fmax column
+    python3 scripts/synth_table.py --list            # show designs and their sources
+    python3 scripts/synth_table.py --retool          # redo rows made by another toolchain
+
+Designs are discovered, not configured:
+    labs/*/ex*/solution/    ref/ (sealed layout) or the flat non-testbench files
+    shared/lib/             every module
+
+A design is a module no other source in its directory instantiates (for
+shared/lib, every module). Its sources are resolved by module name the
+way regress.py resolves a testbench's: own directory first, shared/lib
+second. Lab designs get the week's go_board.pcf for --pnr, with
+unconstrained ports allowed.
+
+Each result is cached in .cache/synth/ by a hash of the sources, the top
+module and the flow (yosys script, nextpnr arguments) — not the tool
+versions, which are recorded with the row. Refreshing the table after a
+toolchain update therefore reuses every untouched design; --retool
+rebuilds the rows an older toolchain produced. Every run writes
+.cache/synth/table.json, table.csv and table.md; prep_mkdocs.py embeds
+the markdown in the site (resources page and each day's lab page).
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO / ".cache" / "synth"
+TABLE_JSON = CACHE_DIR / "table.json"
+
+sys.path.insert(0, str(REPO / "scripts"))
+import regress  # noqa: E402
+from regress import SHARED_LIB, is_tb, scan  # noqa: E402
+
+SYNTH_VERSION = "1"             # bump when parsing or the flow changes
+YOSYS_SCRIPT = ("read_verilog -sv {sources}; synth_ice40 -top {top} -json design.json; "
+                "tee -q -o stat.txt stat")
+NEXTPNR_ARGS = ["--{device}", "--package", "{package}", "--json", "design.json",
+                "--freq", "{freq}", "--pcf-allow-unconstrained"]
+COLUMNS = ["name", "top", "cells", "lut", "ff", "carry", "bram", "fmax_mhz", "status"]
+
+# yosys < 0.40 prints "   Number of cells:   42" / "     SB_LUT4   12";
+# newer releases print "   42 cells" / "   12   SB_LUT4".
+CELLS_RE = re.compile(r"^\s*(?:Number of cells:\s+(\d+)|(\d+)\s+cells)\s*$", re.M)
+CELL_TYPE_RE = re.compile(
+    r"^\s*(?:(SB_\w+)\s+(\d+)|(\d+)\s+(?:[\d.]+\s+)?(SB_\w+))\s*$", re.M)
+FMAX_RE = re.compile(r"Max frequency for clock\s+'([^']+)':\s+([\d.]+) MHz")
+
+
+class Design(NamedTuple):
+    name: str                   # "<repo-relative dir>:<top>"
+    top: str
+    sources: tuple
+    pcf: Path | None
+
+
+# ---------------------------------------------------------------------------
+# Discovery
+# ---------------------------------------------------------------------------
+
+def _roots(files: list[Path]) -> list[tuple[str, Path]]:
+    """(module, file) for modules no other file in the set instantiates."""
+    used = set().union(*(scan(f)[1] for f in files)) if files else set()
+    return [(m, f) for f in files for m in sorted(scan(f)[0]) if m not in used]
+
+
+def discover(filters: list[str] | None = None) -> list[Design]:
+    shared_files = [f for f in regress._hdl([SHARED_LIB]) if not is_tb(f)]
+    shared = regress._index(shared_files)
+    groups = []
+    for soln in sorted(REPO.glob("labs/week*/ex*/solution")):
+        d = soln / "ref" if (soln / "ref").is_dir() else soln
+        files = [f for f in regress._hdl([d]) if not is_tb(f)]
+        pcf = soln.parent.parent / "go_board.pcf"
+        groups.append((soln, files, _roots(files), pcf if pcf.is_file() else None))
+    groups.append((SHARED_LIB, shared_files,
+                   [(m, f) for f in shared_files for m in sorted(scan(f)[0])], None))
+
+    designs = []
+    for where, files, roots, pcf in groups:
+        local = regress._index(files)
+        for top, f in roots:
+            name = f"{where.relative_to(REPO).as_posix()}:{top}"
+            if filters and not any(p in name for p in filters):
+                continue
+            sources = regress._closure(f, local, shared)
+            designs.append(Design(name, top, tuple(sources), pcf))
+    return designs
+
+
+# ---------------------------------------------------------------------------
+# Running
+# ---------------------------------------------------------------------------
+
+def design_key(design: Design, pnr_args: list[str] | None) -> str:
+    h = hashlib.sha256(f"{SYNTH_VERSION}\0{YOSYS_SCRIPT}\0{design.top}\0".encode())
+    h.update(" ".join(pnr_args or []).encode())
+    for f in design.sources + ((design.pcf,) if pnr_args and design.pcf else ()):
+        h.update(f"\0{f.name}\0".encode())
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+def parse_stat(text: str) -> dict:
+    """Cell totals from `stat` output; the last (top-level) block wins."""
+    cells = [int(a or b) for a, b in CELLS_RE.findall(text)]
+    types: dict = {}
+    for name, n, n2, name2 in CELL_TYPE_RE.findall(text):
+        types[name or name2] = int(n or n2)     # later blocks overwrite earlier
+    return {"cells": cells[-1] if cells else None,
+            "lut": types.get("SB_LUT4", 0),
+            "ff": sum(v for k, v in types.items() if k.startswith("SB_DFF")),
+            "carry": types.get("SB_CARRY", 0),
+            "bram": sum(v for k, v in types.items() if k.startswith("SB_RAM40")),
+            "cell_types": types}
+
+
+def parse_fmax(text: str) -> float | None:
+    """Slowest clock's final Fmax from a nextpnr log (None: no clocks)."""
+    clocks = {clk: float(mhz) for clk, mhz in FMAX_RE.findall(text)}
+    return min(clocks.values()) if clocks else None
+
+
+def synthesize(design: Design, pnr_args: list[str] | None, timeout: float) -> dict:
+    """yosys (+ nextpnr) for one design in a scratch dir; never raises."""
+    res = {"status": "ok", "cells": None, "lut": None, "ff": None, "carry": None,
+           "bram": None, "fmax_mhz": None, "seconds": {}, "output": ""}
+    with tempfile.TemporaryDirectory(prefix="synth_") as t:
+        work = Path(t)
+        script = YOSYS_SCRIPT.format(top=design.top,
+                                     sources=" ".join(str(f) for f in design.sources))
+        steps = [("yosys", ["yosys", "-q", "-p", script])]
+        if pnr_args is not None:
+            pcf = ["--pcf", str(design.pcf)] if design.pcf else []
+            steps.append(("nextpnr", ["nextpnr-ice40", *pnr_args, *pcf]))
+        for tool, cmd in steps:
+            t0 = time.monotonic()
+            try:
+                out = subprocess.run(cmd, cwd=work, capture_output=True, text=True,
+                                     timeout=timeout)
+            except subprocess.TimeoutExpired:
+                res.update(status="timeout", output=f"[synth] {tool} exceeded {timeout:g} s")
+                return res
+            except OSError as exc:
+                res.update(status="error", output=f"[synth] {tool}: {exc}")
+                return res
+            res["seconds"][tool] = round(time.monotonic() - t0, 3)
+            log = out.stdout + out.stderr
+            if out.returncode != 0:
+                res.update(status=f"{tool} failed", output=regress._tail(log))
+                return res
+            if tool == "yosys":
+                stat = work / "stat.txt"
+                res.update(parse_stat(stat.read_text() if stat.is_file() else log))
+            else:
+                res["fmax_mhz"] = parse_fmax(log)
+    return res
+
+
+def run_design(design: Design, pnr_args: list[str] | None, toolchain: dict,
+               args) -> dict:
+    base = {"name": design.name, "top": design.top,
+            "sources": [f.relative_to(REPO).as_posix() for f in design.sources]}
+    entry = CACHE_DIR / "results" / f"{design_key(design, pnr_args)[:32]}.json"
+    if not args.force and entry.is_file():
+        cached = json.loads(entry.read_text())
+        if not (args.retool and cached["toolchain"] != toolchain):
+            return dict(base, **cached, cached=True)
+    res = dict(synthesize(design, pnr_args, args.timeout), toolchain=toolchain)
+    if res["status"] not in ("timeout", "error"):   # tool trouble, not a result
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(res))
+        tmp.replace(entry)
+    return dict(base, **res, cached=False)
+
+
+# ---------------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------------
+
+def _cell(value) -> str:
+    if value is None:
+        return "—"
+    return f"{value:.1f}" if isinstance(value, float) else str(value)
+
+
+def load_table(path: Path = TABLE_JSON) -> dict | None:
+    """The last run's table (for the site generators), or None."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def markdown_table(rows: list[dict], strip: str = "") -> str:
+    """Rows as a Markdown table; `strip` is removed from the front of names."""
+    out = ["| Design | Top | Cells | LUT4 | FF | Carry | BRAM | Fmax (MHz) |",
+           "|--------|-----|------:|-----:|---:|------:|-----:|-----------:|"]
+    for r in rows:
+        where = r["name"].rsplit(":", 1)[0].removeprefix(strip).removesuffix("/solution")
+        note = "" if r["status"] == "ok" else f" *({r['status']})*"
+        out.append(f"| `{where}` | `{r['top']}`{note} | "
+                   + " | ".join(_cell(r[c]) for c in ("cells", "lut", "ff", "carry",
+                                                      "bram", "fmax_mhz")) + " |")
+    return "\n".join(out) + "\n"
+
+
+def write_tables(report: dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    TABLE_JSON.write_text(json.dumps(report, indent=2) + "\n")
+    with open(CACHE_DIR / "table.csv", "w", newline="") as fh:
+        w = csv.writer(fh, lineterminator="\n")
+        w.writerow(COLUMNS)
+        for r in report["rows"]:
+            w.writerow(["" if r[c] is None else r[c] for c in COLUMNS])
+    tools = ", ".join(f"{k}: {v}" for k, v in report["toolchain"].items())
+    (CACHE_DIR / "table.md").write_text(
+        f"*{report['device']}, generated {report['generated']} ({tools})*\n\n"
+        + markdown_table(report["rows"]))
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0],
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("filters", nargs="*", metavar="PATTERN",
+                    help="only designs whose name contains any of these substrings")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--pnr", action="store_true",
+                    help="also run nextpnr-ice40 for an Fmax column")
+    ap.add_argument("--device", default="hx1k")
+    ap.add_argument("--package", default="vq100")
+    ap.add_argument("--freq", type=float, default=25,
+                    help="nextpnr target MHz (the Go Board clock, as `make prog`)")
+    ap.add_argument("--timeout", type=float, default=600,
+                    help="seconds per tool run (default 600)")
+    ap.add_argument("--force", action="store_true", help="ignore cached results")
+    ap.add_argument("--retool", action="store_true",
+                    help="rebuild cached rows made by a different toolchain")
+    ap.add_argument("--list", action="store_true",
+                    help="list designs and their resolved sources, then exit")
+    args = ap.parse_args(argv)
+
+    designs = discover(args.filters)
+    if args.list:
+        for d in designs:
+            deps = " ".join(f.relative_to(REPO).as_posix() for f in d.sources)
+            print(f"{d.name}\n    {deps}")
+        print(f"{len(designs)} designs")
+        return 0
+    if not designs:
+        print(f"synth_table: no designs match {args.filters}", file=sys.stderr)
+        return 1
+    if not shutil.which("yosys") or (args.pnr and not shutil.which("nextpnr-ice40")):
+        print("synth_table: yosys/nextpnr-ice40 not found on PATH (nix develop?)",
+              file=sys.stderr)
+        return 1
+    toolchain = {"yosys": regress.tool_version(["yosys", "-V"])}
+    pnr_args = None
+    if args.pnr:
+        toolchain["nextpnr"] = regress.tool_version(["nextpnr-ice40", "--version"])
+        pnr_args = [a.format(device=args.device, package=args.package, freq=args.freq)
+                    for a in NEXTPNR_ARGS]
+
+    t0 = time.monotonic()
+    rows = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(run_design, d, pnr_args, toolchain, args) for d in designs]
+        for fut in as_completed(futures):
+            r = fut.result()
+            rows.append(r)
+            note = "cached" if r["cached"] else f"{sum(r['seconds'].values()):.1f} s"
+            print(f"[{r['status'].upper():<7}] {r['name']}  ({note})", file=sys.stderr)
+    wall = time.monotonic() - t0
+
+    if args.filters:            # keep the rest of the last full table
+        previous = load_table() or {}
+        if previous.get("pnr") == args.pnr:
+            done = {r["name"] for r in rows}
+            rows += [r for r in previous["rows"] if r["name"] not in done]
+    rows.sort(key=lambda r: r["name"])
+    report = {"generated": time.strftime("%Y-%m-%d %H:%M"), "toolchain": toolchain,
+              "device": f"iCE40 {args.device.upper()} {args.package}"
+                        + (f", Fmax target {args.freq:g} MHz" if args.pnr else ""),
+              "pnr": args.pnr, "wall_s": round(wall, 3), "rows": rows}
+    write_tables(report)
+
+    ran = {d.name for d in designs}
+    rows = [r for r in rows if r["name"] in ran]
+    width = max(len(r["name"]) for r in rows)
+    print(f"\n{'design':<{width}}  {'cells':>6} {'lut':>5} {'ff':>5} {'carry':>5} "
+          f"{'bram':>4} {'fmax':>7}")
+    for r in rows:
+        print(f"{r['name']:<{width}}  " + " ".join(
+            f"{_cell(r[c]):>{n}}" for c, n in (("cells", 6), ("lut", 5), ("ff", 5),
+                                               ("carry", 5), ("bram", 4),
+                                               ("fmax_mhz", 7)))
+              + ("" if r["status"] == "ok" else f"  {r['status']}"))
+    failed = sum(r["status"] != "ok" for r in rows)
+    print(f"\n{len(rows)} designs in {wall:.1f} s "
+          f"({sum(r['cached'] for r in rows)} cached{f', {failed} failed' if failed else ''})")
+    print(f"Tables: {CACHE_DIR / 'table.md'}  table.csv  table.json")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
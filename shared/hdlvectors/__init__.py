@@ -0,0 +1,22 @@
+"""
+hdlvectors — Golden-model test-vector generation for file-driven testbenches.
+
+Describe a DUT's operands and results, give a Python golden model and a
+packed hex layout, and ``generate`` writes $readmemh files — random,
+edge-biased, stratified or exhaustive, sharded and generated in parallel.
+``specs.SPECS`` has ready-made specs for the course's arithmetic DUTs.
+"""
+
+from .engine import MODES, Field, Result, VectorSpec, edge_values, generate, shard_paths
+from .specs import SPECS
+
+__all__ = [
+    "MODES",
+    "SPECS",
+    "Field",
+    "Result",
+    "VectorSpec",
+    "edge_values",
+    "generate",
+    "shard_paths",
+]
@@ -0,0 +1,97 @@
+"""
+Command-line entry point: ``python -m hdlvectors <command> ...`` (run from
+shared/, or with shared/ on PYTHONPATH).
+
+Commands:
+    list    Show the ready-made specs and their line layouts
+    gen     Write vectors for a spec: a name from ``list``, or
+            path/to/file.py:NAME for a VectorSpec defined in your own file
+"""
+
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+from .engine import CHUNK, MODES, VectorSpec, generate
+from .specs import SPECS
+
+
+def load_spec(ref: str) -> VectorSpec:
+    """A SPECS name, or "file.py:NAME" / "package.module:NAME"."""
+    if ref in SPECS:
+        return SPECS[ref]
+    mod_ref, _, attr = ref.rpartition(":")
+    if not mod_ref:
+        raise SystemExit(f"hdlvectors: unknown spec {ref!r} "
+                         f"(known: {', '.join(SPECS)}; or file.py:NAME)")
+    if mod_ref.endswith(".py"):
+        path = Path(mod_ref).resolve()
+        # Import by name from its directory so worker processes can too.
+        sys.path.insert(0, str(path.parent))
+        mod_ref = path.stem
+    spec = getattr(importlib.import_module(mod_ref), attr, None)
+    if not isinstance(spec, VectorSpec):
+        raise SystemExit(f"hdlvectors: {ref} is not a VectorSpec")
+    return spec
+
+
+def _cmd_list(args) -> int:
+    for name, spec in SPECS.items():
+        print(f"{name:<8} {spec.layout:<28} {spec.describe()}")
+    return 0
+
+
+def _cmd_gen(args) -> int:
+    spec = load_spec(args.spec)
+    t0 = time.perf_counter()
+    try:
+        res = generate(spec, args.out, count=args.count, mode=args.mode,
+                       seed=args.seed, shards=args.shards, workers=args.workers,
+                       chunk=args.chunk, strata=args.strata,
+                       header=not args.no_header,
+                       use_numpy=False if args.no_numpy else None)
+    except ValueError as exc:
+        print(f"hdlvectors gen: {exc}", file=sys.stderr)
+        return 1
+    dt = time.perf_counter() - t0
+    where = (str(res.paths[0]) if len(res.paths) == 1
+             else f"{len(res.paths)} files ({res.paths[0].name} .. {res.paths[-1].name})")
+    print(f"Wrote {res.vectors} vectors to {where} in {dt:.2f} s")
+    return 0
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m hdlvectors", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="show the ready-made specs")
+    p.set_defaults(func=_cmd_list)
+
+    p = sub.add_parser("gen", help="write a $readmemh vector file")
+    p.add_argument("spec", help="spec name or file.py:NAME")
+    p.add_argument("-o", "--out", default="vectors.hex")
+    p.add_argument("--mode", choices=MODES, default="random")
+    p.add_argument("--count", type=int, default=1000,
+                   help="vectors to sample (ignored by --mode exhaustive)")
+    p.add_argument("--seed", type=lambda s: int(s, 0), default=0)
+    p.add_argument("--shards", type=int, default=1,
+                   help="split into N files <out>_000.hex ... for parallel sims")
+    p.add_argument("--workers", type=int, default=None,
+                   help="generator processes (default: CPU count)")
+    p.add_argument("--chunk", type=int, default=CHUNK)
+    p.add_argument("--strata", type=int, default=4,
+                   help="bins per operand for --mode stratified (power of two)")
+    p.add_argument("--no-header", action="store_true",
+                   help="omit the // layout comment at the top of each file")
+    p.add_argument("--no-numpy", action="store_true")
+    p.set_defaults(func=_cmd_gen)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+"""
+engine.py — Golden-model test-vector generation for $readmemh testbenches.
+
+A ``VectorSpec`` names the DUT's operand and result fields, a Python golden
+model that maps operands to results, and the packed hex layout one line of
+the vector file uses. ``generate`` enumerates or samples the operand space,
+runs the golden model and streams packed lines to one or more files:
+
+    spec = VectorSpec(
+        inputs=[Field("a", 8), Field("b", 8)],
+        outputs=[Field("sum", 9)],
+        golden=add,                      # def add(a, b): return a + b
+        layout="a b _ sum:16",           # → AABB_RRRR
+    )
+    generate(spec, "vectors.hex", count=1_000_000, mode="edge", shards=8)
+
+Modes:
+    random       every operand uniform over its width
+    edge         like random, but a quarter of operands are corner values
+                 (0, 1, max, max-1, MSB, MSB-1, 0x55.., 0xAA..)
+    stratified   each operand's range is cut into ``strata`` equal bins and
+                 vectors cycle through every combination of bins, so sparse
+                 corners of a wide space get the same share as the middle
+    exhaustive   every operand combination once, first input most significant
+
+``constraint`` (a predicate over the operands) turns the sampling modes into
+constrained-random: rejected vectors are redrawn, and filtered out in
+exhaustive mode. ``pinned`` operand tuples are emitted first in the
+sampling modes, e.g. the cases a slide screenshot shows.
+
+Vector i is a pure function of (seed, i), so output does not depend on
+chunk size, shard count, worker count, or whether NumPy is installed.
+Chunks are generated in a process pool and written in order; specs whose
+golden model is not picklable (lambdas) run in-process instead. Set
+``vectorized=True`` when ``golden`` and ``constraint`` also work on NumPy
+arrays (plain arithmetic usually does) to generate whole chunks at once.
+"""
+
+import os
+import pickle
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python path, same output
+    np = None
+
+MODES = ("random", "edge", "stratified", "exhaustive")
+CHUNK = 1 << 16                 # vectors per task / write
+MAX_TRIES = 64                  # constrained-random redraws per vector
+EDGE_SHARE = 64                 # out of 256: share of corner values in "edge"
+EXHAUSTIVE_MAX_BITS = 40
+MASK64 = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15     # splitmix64 increment
+
+
+class Field(NamedTuple):
+    """One operand or result: ``width`` bits, two's complement if signed."""
+    name: str
+    width: int
+    signed: bool = False
+
+
+class VectorSpec:
+    """What to generate: operand/result fields, golden model and layout."""
+
+    def __init__(self, inputs: Sequence[Field], outputs: Sequence[Field],
+                 golden: Callable, layout: Optional[str] = None,
+                 pinned: Sequence[tuple] = (), constraint: Optional[Callable] = None,
+                 vectorized: bool = False, name: str = ""):
+        self.inputs = [Field(*f) for f in inputs]
+        self.outputs = [Field(*f) for f in outputs]
+        self.golden = golden
+        self.pinned = [tuple(p) for p in pinned]
+        self.constraint = constraint
+        self.vectorized = vectorized
+        self.name = name
+        for f in self.inputs + self.outputs:
+            if not 0 < f.width <= 64:
+                raise ValueError(f"field {f.name}: width must be 1..64")
+        if layout is None:
+            layout = " ".join([f.name for f in self.inputs] + ["_"]
+                              + [f.name for f in self.outputs])
+        self.layout = layout
+        self.slots, self.word_bits, self.breaks = self._parse_layout(layout)
+        # (index into inputs + outputs, slot bits, field mask) per slot
+        order = [f.name for f in self.inputs + self.outputs]
+        self.plan = [(order.index(f.name), bits, (1 << f.width) - 1)
+                     for f, bits in self.slots]
+
+    def _parse_layout(self, layout: str):
+        """
+        "a b _ sum:16" → [(field, bits), ...] MSB first, total bits and the
+        hex-digit offsets of the '_' separators. A bare name takes its width
+        rounded up to whole hex digits; name:N pads it to N bits.
+        """
+        fields = {f.name: f for f in self.inputs + self.outputs}
+        slots, seps = [], []
+        for tok in layout.split():
+            if tok == "_":
+                seps.append(len(slots))
+                continue
+            m = re.fullmatch(r"(\w+)(?::(\d+))?", tok)
+            if not m or m.group(1) not in fields:
+                raise ValueError(f"layout: unknown field {tok!r}")
+            f = fields[m.group(1)]
+            bits = int(m.group(2)) if m.group(2) else -(-f.width // 4) * 4
+            if bits < f.width:
+                raise ValueError(f"layout: {tok} is narrower than {f.width} bits")
+            slots.append((f, bits))
+        missing = set(fields) - {f.name for f, _ in slots}
+        if missing:
+            raise ValueError(f"layout: missing {', '.join(sorted(missing))}")
+        total = sum(b for _, b in slots)
+        digits = -(-total // 4)
+        breaks = []
+        for k in seps:
+            below = sum(b for _, b in slots[k:])
+            if below % 4:
+                raise ValueError("layout: '_' must fall on a hex-digit boundary")
+            breaks.append(digits - below // 4)
+        return slots, total, sorted(set(b for b in breaks if 0 < b < digits))
+
+    @property
+    def digits(self) -> int:
+        return -(-self.word_bits // 4)
+
+    def describe(self) -> str:
+        parts = []
+        for f, bits in self.slots:
+            s = "s" if f.signed else ""
+            parts.append(f"{f.name}[{f.width}{s}]" + (f"/{bits}" if bits != f.width else ""))
+        return " ".join(parts)
+
+
+class Result(NamedTuple):
+    vectors: int
+    paths: List[Path]
+
+
+# ---- Counter-based random stream -------------------------------------------
+
+def _splitmix64(seed: int, c: int) -> int:
+    z = (seed + (c + 1) * GOLDEN) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def _splitmix64_np(seed: int, c):
+    with np.errstate(over="ignore"):
+        z = np.uint64(seed & MASK64) + (c + np.uint64(1)) * np.uint64(GOLDEN)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _counter(i: int, slot: int, n_slots: int, k: int) -> int:
+    return (((i * n_slots + slot) << 6) | k) & MASK64
+
+
+def edge_values(width: int) -> list:
+    """Corner values of an unsigned ``width``-bit operand."""
+    top = (1 << width) - 1
+    msb = 1 << (width - 1)
+    alt = int("01" * 32, 2) & top
+    out = []
+    for v in (0, 1, top, top - 1, msb, msb - 1, alt, top ^ alt):
+        if 0 <= v <= top and v not in out:
+            out.append(v)
+    return out
+
+
+def _strata(width: int, strata: int) -> int:
+    s = min(strata, 1 << width)
+    if s & (s - 1):
+        raise ValueError("strata must be a power of two")
+    return s
+
+
+def _to_signed(v: int, width: int) -> int:
+    return v - (1 << width) if v >> (width - 1) else v
+
+
+# ---- Pure-Python chunk ------------------------------------------------------
+
+def _operands(spec: VectorSpec, mode: str, seed: int, strata: int, r: int, k: int) -> list:
+    """Unsigned operand values for sampled vector r, redraw k."""
+    n = len(spec.inputs)
+    vals = []
+    for f_idx, f in enumerate(spec.inputs):
+        mask = (1 << f.width) - 1
+        d = _splitmix64(seed, _counter(r, f_idx, 2 * n, k))
+        if mode == "edge":
+            pick = _splitmix64(seed, _counter(r, n + f_idx, 2 * n, k))
+            if (pick >> 56) < EDGE_SHARE:
+                edges = edge_values(f.width)
+                vals.append(edges[(pick & 0xFFFF) % len(edges)])
+                continue
+        if mode == "stratified":
+            s = _strata(f.width, strata)
+            cell = (r // s ** (n - 1 - f_idx)) % s
+            size = (1 << f.width) // s
+            vals.append(cell * size + (d & (size - 1)))
+            continue
+        vals.append(d & mask)
+    return vals
+
+
+def _pack(spec: VectorSpec, ins: list, outs) -> int:
+    if isinstance(outs, dict):
+        outs = [outs[f.name] for f in spec.outputs]
+    elif not isinstance(outs, (tuple, list)):
+        outs = (outs,)
+    values = ins + list(outs)
+    word = 0
+    for src, bits, mask in spec.plan:
+        word = (word << bits) | (int(values[src]) & mask)
+    return word
+
+
+def _format(spec: VectorSpec, word: int) -> str:
+    s = f"{word:0{spec.digits}X}"
+    for b in reversed(spec.breaks):
+        s = s[:b] + "_" + s[b:]
+    return s
+
+
+def _kwargs(spec: VectorSpec, vals: list) -> dict:
+    return {f.name: _to_signed(v, f.width) if f.signed else v
+            for f, v in zip(spec.inputs, vals)}
+
+
+def _chunk_py(spec, mode, seed, strata, start, stop) -> bytes:
+    lines = []
+    n_pin = 0 if mode == "exhaustive" else len(spec.pinned)
+    widths = [f.width for f in spec.inputs]
+    for i in range(start, stop):
+        if i < n_pin:
+            vals = [v & ((1 << w) - 1) for v, w in zip(spec.pinned[i], widths)]
+        elif mode == "exhaustive":
+            vals, rest = [], i
+            for w in reversed(widths):
+                vals.append(rest & ((1 << w) - 1))
+                rest >>= w
+            vals.reverse()
+            if spec.constraint and not spec.constraint(**_kwargs(spec, vals)):
+                continue
+        else:
+            for k in range(MAX_TRIES):
+                vals = _operands(spec, mode, seed, strata, i - n_pin, k)
+                if not spec.constraint or spec.constraint(**_kwargs(spec, vals)):
+                    break
+            else:
+                raise ValueError(f"constraint rejected {MAX_TRIES} draws in a row")
+        kw = _kwargs(spec, vals)
+        lines.append(_format(spec, _pack(spec, vals, spec.golden(**kw))))
+    return "".join(line + "\n" for line in lines).encode("ascii")
+
+
+# ---- NumPy chunk ------------------------------------------------------------
+
+def _operands_np(spec, mode, seed, strata, r, k: int) -> list:
+    n = len(spec.inputs)
+    vals = []
+    for f_idx, f in enumerate(spec.inputs):
+        mask = np.uint64((1 << f.width) - 1)
+        c = (((r * np.uint64(2 * n) + np.uint64(f_idx)) << np.uint64(6))
+             | np.uint64(k))
+        d = _splitmix64_np(seed, c)
+        if mode == "stratified":
+            s = _strata(f.width, strata)
+            cell = (r // np.uint64(s ** (n - 1 - f_idx))) % np.uint64(s)
+            size = (1 << f.width) // s
+            vals.append(cell * np.uint64(size) + (d & np.uint64(size - 1)))
+            continue
+        v = d & mask
+        if mode == "edge":
+            c = (((r * np.uint64(2 * n) + np.uint64(n + f_idx)) << np.uint64(6))
+                 | np.uint64(k))
+            pick = _splitmix64_np(seed, c)
+            edges = np.array(edge_values(f.width), dtype=np.uint64)
+            hit = (pick >> np.uint64(56)) < np.uint64(EDGE_SHARE)
+            choice = edges[((pick & np.uint64(0xFFFF)) % np.uint64(len(edges))).astype(np.intp)]
+            v = np.where(hit, choice, v)
+        vals.append(v)
+    return vals
+
+
+def _signed_np(spec, vals: list) -> dict:
+    kw = {}
+    for f, v in zip(spec.inputs, vals):
+        v = v.astype(np.int64)
+        if f.signed:
+            v = np.where(v >= (1 << (f.width - 1)), v - (1 << f.width), v)
+        kw[f.name] = v
+    return kw
+
+
+def _chunk_np(spec, mode, seed, strata, start, stop) -> bytes:
+    n_pin = 0 if mode == "exhaustive" else len(spec.pinned)
+    idx = np.arange(start, stop, dtype=np.uint64)
+    widths = [f.width for f in spec.inputs]
+    if mode == "exhaustive":
+        vals, shift = [], sum(widths)
+        for w in widths:
+            shift -= w
+            vals.append((idx >> np.uint64(shift)) & np.uint64((1 << w) - 1))
+        if spec.constraint:
+            keep = np.asarray(spec.constraint(**_signed_np(spec, vals)), dtype=bool)
+            vals = [v[keep] for v in vals]
+    else:
+        r = np.maximum(idx, np.uint64(n_pin)) - np.uint64(n_pin)
+        vals = _operands_np(spec, mode, seed, strata, r, 0)
+        if spec.constraint:
+            todo = ~np.asarray(spec.constraint(**_signed_np(spec, vals)), dtype=bool)
+            todo[: max(0, min(n_pin, stop) - start)] = False
+            for k in range(1, MAX_TRIES):
+                if not todo.any():
+                    break
+                redo = _operands_np(spec, mode, seed, strata, r[todo], k)
+                ok = np.asarray(spec.constraint(**_signed_np(spec, redo)), dtype=bool)
+                where = np.flatnonzero(todo)[ok]
+                for v, nv in zip(vals, redo):
+                    v[where] = nv[ok]
+                todo[where] = False
+            if todo.any():
+                raise ValueError(f"constraint rejected {MAX_TRIES} draws in a row")
+        for j in range(max(0, min(n_pin, stop) - start)):
+            for v, p, w in zip(vals, spec.pinned[start + j], widths):
+                v[j] = p & ((1 << w) - 1)
+
+    outs = spec.golden(**_signed_np(spec, vals))
+    if isinstance(outs, dict):
+        outs = [outs[f.name] for f in spec.outputs]
+    elif not isinstance(outs, (tuple, list)):
+        outs = [outs]
+    values = {f.name: v for f, v in zip(spec.inputs, vals)}
+    for f, o in zip(spec.outputs, outs):
+        values[f.name] = np.broadcast_to(np.asarray(o).astype(np.int64), vals[0].shape
+                                         ).astype(np.uint64)
+    word = np.zeros(len(vals[0]), dtype=np.uint64)
+    for f, bits in spec.slots:
+        word = (word << np.uint64(bits)) | (values[f.name] & np.uint64((1 << f.width) - 1))
+
+    digits = spec.digits
+    cols = list(range(digits + len(spec.breaks)))
+    for k, b in enumerate(spec.breaks):
+        cols.remove(b + k)
+    out = np.empty((len(word), len(cols) + len(spec.breaks) + 1), dtype=np.uint8)
+    table = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+    for d, col in enumerate(cols):
+        shift = np.uint64(4 * (digits - 1 - d))
+        out[:, col] = table[((word >> shift) & np.uint64(0xF)).astype(np.intp)]
+    for k, b in enumerate(spec.breaks):
+        out[:, b + k] = ord("_")
+    out[:, -1] = ord("\n")
+    return out.tobytes()
+
+
+def _use_numpy(spec: VectorSpec) -> bool:
+    return (np is not None and spec.vectorized and spec.word_bits <= 64
+            and all(f.width <= 62 for f in spec.inputs + spec.outputs))
+
+
+def _chunk(job) -> bytes:
+    spec, mode, seed, strata, start, stop, use_np = job
+    fn = _chunk_np if use_np else _chunk_py
+    return fn(spec, mode, seed, strata, start, stop)
+
+
+# ---- Driver -------------------------------------------------------------------
+
+def space_size(spec: VectorSpec, mode: str, count: int) -> int:
+    """Vector indices the mode enumerates (before exhaustive filtering)."""
+    if mode == "exhaustive":
+        bits = sum(f.width for f in spec.inputs)
+        if bits > EXHAUSTIVE_MAX_BITS:
+            raise ValueError(f"exhaustive space is 2^{bits}; "
+                             f"limit is 2^{EXHAUSTIVE_MAX_BITS}")
+        return 1 << bits
+    return max(count, len(spec.pinned))
+
+
+def shard_paths(out, shards: int) -> List[Path]:
+    """``out`` itself, or ``<stem>_000<suffix>`` ... for ``shards`` > 1."""
+    p = Path(out)
+    if shards <= 1:
+        return [p]
+    return [p.with_name(f"{p.stem}_{k:03d}{p.suffix}") for k in range(shards)]
+
+
+def _picklable(spec: VectorSpec) -> bool:
+    try:
+        pickle.dumps(spec)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def generate(spec: VectorSpec, out, count: int = 1000, mode: str = "random",
+             seed: int = 0, shards: int = 1, workers: Optional[int] = None,
+             chunk: int = CHUNK, strata: int = 4, header: bool = True,
+             use_numpy: Optional[bool] = None) -> Result:
+    """
+    Write the vectors for ``mode`` to ``out`` (or its shards); returns how
+    many lines were written and the file paths.
+
+    Shards are contiguous, near-equal index ranges, each a complete
+    $readmemh file. ``workers`` defaults to the CPU count; 1 runs inline.
+    ``header`` starts each file with a // comment naming the layout.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    if shards < 1 or chunk < 1:
+        raise ValueError("shards and chunk must be positive")
+    total = space_size(spec, mode, count)
+    use_np = _use_numpy(spec) if use_numpy is None else (use_numpy and _use_numpy(spec))
+    paths = shard_paths(out, shards)
+
+    jobs = []
+    for k in range(len(paths)):
+        lo, hi = k * total // len(paths), (k + 1) * total // len(paths)
+        jobs += [(k, (spec, mode, seed, strata, s, min(s + chunk, hi), use_np))
+                 for s in range(lo, hi, chunk)]
+
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and len(jobs) > 1 and _picklable(spec):
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+
+    files = [open(p, "wb") for p in paths]
+    written = 0
+    try:
+        if header:
+            line = (f"// {spec.name or 'vectors'}: {spec.describe()}  "
+                    f"mode={mode} seed={seed:#x}\n").encode()
+            for fh in files:
+                fh.write(line)
+        if pool is None:
+            results = ((k, _chunk(job)) for k, job in jobs)
+        else:
+            results = _ordered(pool, jobs, 4 * workers)
+        for k, data in results:
+            files[k].write(data)
+            written += data.count(b"\n")
+    finally:
+        for fh in files:
+            fh.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return Result(written, paths)
+
+
+def _ordered(pool, jobs, window: int):
+    """Run jobs in the pool with at most ``window`` in flight, in order."""
+    pending = deque()
+    it = iter(jobs)
+    for k, job in it:
+        pending.append((k, pool.submit(_chunk, job)))
+        if len(pending) >= window:
+            break
+    while pending:
+        k, fut = pending.popleft()
+        yield k, fut.result()
+        nxt = next(it, None)
+        if nxt is not None:
+            pending.append((nxt[0], pool.submit(_chunk, nxt[1])))
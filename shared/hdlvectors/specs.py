@@ -0,0 +1,62 @@
+"""
+specs.py — Ready-made vector specs for the course's arithmetic DUTs.
+
+Each entry pairs a DUT's ports with a golden model and a $readmemh line
+layout, so a testbench can load millions of vectors without a bespoke
+generator script:
+
+    python -m hdlvectors gen alu4 --mode exhaustive -o alu_vectors.hex
+    python -m hdlvectors gen padd32 --count 5000000 --mode edge --shards 8
+
+Golden models are module-level functions so they can be shipped to worker
+processes; the arithmetic ones work unchanged on NumPy arrays.
+"""
+
+from .engine import Field, VectorSpec
+
+
+def add(a, b):
+    return a + b
+
+
+def mul(a, b):
+    return a * b
+
+
+def alu4(a, b, opcode):
+    """Day 3 / Day 6 alu_4bit: ADD, SUB, AND, OR with carry and zero."""
+    r = (a + b, a - b, a & b, a | b)[opcode] & 0x1F   # 5-bit r_temp
+    return r & 0xF, r >> 4, int(r & 0xF == 0)
+
+
+SPECS = {
+    # d06_s4 file-driven adder: AABB_RRRR (gen_vectors.py)
+    "adder8": VectorSpec(
+        name="adder8",
+        inputs=[Field("a", 8), Field("b", 8)],
+        outputs=[Field("sum", 9)],
+        golden=add, layout="a b _ sum:16", vectorized=True,
+        pinned=[(0x4F, 0x37), (0x1C, 0xE9), (0xFF, 0xFF), (0x00, 0x00)],
+    ),
+    # labs/week2_day06/ex5_exhaustive_alu (alu_4bit): AB O _ R C Z
+    "alu4": VectorSpec(
+        name="alu4",
+        inputs=[Field("a", 4), Field("b", 4), Field("opcode", 2)],
+        outputs=[Field("result", 4), Field("carry", 1), Field("zero", 1)],
+        golden=alu4,
+    ),
+    # labs/week3_day10/ex2_shift_add_multiplier: AABB_PPPP
+    "mult8": VectorSpec(
+        name="mult8",
+        inputs=[Field("a", 8), Field("b", 8)],
+        outputs=[Field("product", 16)],
+        golden=mul, vectorized=True,
+    ),
+    # lecture_examples/week4_day14/d14_s3_ex2 pipelined_adder, W=32
+    "padd32": VectorSpec(
+        name="padd32",
+        inputs=[Field("a", 32), Field("b", 32)],
+        outputs=[Field("sum", 33)],
+        golden=add, layout="a b _ sum:36",
+    ),
+}
@@ -0,0 +1,41 @@
+"""
+hdlwaves — VCD parsing and waveform rendering shared by every lab notebook.
+
+Generated notebooks put ``shared/`` on ``sys.path`` and import from here,
+so a fix to the VCD engine reaches every notebook without regenerating
+them. ``scripts/md2nb.py --standalone`` inlines the same code instead.
+"""
+
+from .assertions import check_vcd, load_spec
+from .coverage import Coverage, merge_coverage, vcd_coverage
+from .diff import diff_vcds
+from .svg import render_cached, vcd_to_svg, wavedrom_to_svg
+from .vcd import VcdHeader, VcdTrace, VcdVar, decode_value, parse_vcd
+from .wavedrom import (
+    _vcd_to_wavedrom,
+    changes_to_wavedrom,
+    show_wavedrom,
+    show_waves,
+    vcd_to_wavedrom,
+)
+
+__all__ = [
+    "Coverage",
+    "VcdHeader",
+    "VcdTrace",
+    "VcdVar",
+    "changes_to_wavedrom",
+    "check_vcd",
+    "decode_value",
+    "diff_vcds",
+    "load_spec",
+    "merge_coverage",
+    "parse_vcd",
+    "render_cached",
+    "show_wavedrom",
+    "show_waves",
+    "vcd_to_svg",
+    "vcd_coverage",
+    "vcd_to_wavedrom",
+    "wavedrom_to_svg",
+]
@@ -0,0 +1,167 @@
+"""
+Command-line entry point: ``python -m hdlwaves <command> ...`` (run from
+shared/, or with shared/ on PYTHONPATH).
+
+Commands:
+    svg     Render a VCD to a static SVG
+    index   Build (or refresh) a VCD's columnar cache and list its signals
+    diff    Compare a reference dump with a student's; exit 1 on mismatch
+    cover   Toggle and FSM coverage of one or more dumps, merged
+    check   Evaluate an assertions spec over a dump; exit 1 on failure
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from . import columnar
+from .assertions import check_vcd, load_spec
+from .coverage import Coverage, merge_coverage
+from .diff import diff_vcds
+from .svg import vcd_to_svg, wavedrom_to_svg
+from .wavedrom import MAX_COLUMNS
+
+
+def _cmd_svg(args) -> int:
+    svg = vcd_to_svg(args.vcd, max_cycles=args.max_cycles or None,
+                     signals=args.signals, max_columns=args.max_columns or None)
+    if svg is None:
+        print(f"hdlwaves svg: nothing to draw in {args.vcd}", file=sys.stderr)
+        return 1
+    if args.out:
+        Path(args.out).write_text(svg, encoding="utf-8")
+    else:
+        sys.stdout.write(svg + "\n")
+    return 0
+
+
+def _cmd_index(args) -> int:
+    for vcd in args.vcd:
+        store = columnar.open_store(vcd)
+        print(f"{vcd} → {store.path}")
+        for code, var in store.header.select().items():
+            entry = store.index["columns"].get(code)
+            print(f"  {var.path:<40} {var.width:>3} bit  "
+                  f"{entry[1] if entry else 0:>9} changes")
+    return 0
+
+
+def _cmd_diff(args) -> int:
+    try:
+        result = diff_vcds(args.expected, args.actual, max_mismatches=args.count,
+                           signals=args.signals, context=args.context)
+    except (OSError, ValueError) as exc:
+        print(f"hdlwaves diff: {exc}", file=sys.stderr)
+        return 2
+    for label, paths in (("expected", result.only_expected),
+                         ("actual", result.only_actual)):
+        if paths:
+            print(f"only in {label} ({len(paths)}): {' '.join(paths[:8])}"
+                  + (" …" if len(paths) > 8 else ""))
+    if not result.mismatches:
+        print(f"no mismatches: {result.compared} signals agree up to "
+              f"t={result.end_time} {result.timescale}")
+        return 0
+    width = max(len(m.signal) for m in result.mismatches)
+    print(f"first {len(result.mismatches)} mismatches ({result.compared} signals "
+          f"compared, times in {result.timescale or 'dump units'}):")
+    print(f"  {'time':>12}  {'signal':<{width}}  {'expected':>10}  {'actual':>10}")
+    for m in result.mismatches:
+        print(f"  {m.time:>12}  {m.signal:<{width}}  {m.expected:>10}  {m.actual:>10}")
+    if result.window and args.wavedrom:
+        Path(args.wavedrom).write_text(json.dumps(result.window), encoding="utf-8")
+    if result.window and args.svg:
+        Path(args.svg).write_text(wavedrom_to_svg(result.window), encoding="utf-8")
+    return 1
+
+
+def _cmd_cover(args) -> int:
+    try:
+        cov = merge_coverage(args.vcd, signals=args.signals, scope=args.scope,
+                             fsm=args.fsm, workers=args.workers)
+        for prev in args.merge:
+            cov.merge(Coverage.from_dict(json.loads(Path(prev).read_text())))
+    except (OSError, ValueError) as exc:
+        print(f"hdlwaves cover: {exc}", file=sys.stderr)
+        return 2
+    print(cov.report(limit=args.limit))
+    if args.json:
+        Path(args.json).write_text(json.dumps(cov.to_dict(), indent=1), encoding="utf-8")
+    if args.min is not None and cov.percent < args.min:
+        print(f"toggle coverage {cov.percent:.1f}% is below --min {args.min:g}%")
+        return 1
+    return 0
+
+
+def _cmd_check(args) -> int:
+    try:
+        report = check_vcd(args.vcd, load_spec(args.spec), max_failures=args.count)
+    except (OSError, ValueError) as exc:
+        print(f"hdlwaves check: {exc}", file=sys.stderr)
+        return 2
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m hdlwaves", description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("svg", help="render a VCD to a static SVG")
+    p.add_argument("vcd")
+    p.add_argument("-o", "--out", help="output .svg (default: stdout)")
+    p.add_argument("--signals", nargs="+", default=None)
+    p.add_argument("--max-cycles", type=int, default=80,
+                   help="0 = whole dump")
+    p.add_argument("--max-columns", type=int, default=MAX_COLUMNS,
+                   help="0 = no bucketing")
+    p.set_defaults(func=_cmd_svg)
+
+    p = sub.add_parser("index", help="build the columnar cache for VCDs")
+    p.add_argument("vcd", nargs="+")
+    p.set_defaults(func=_cmd_index)
+
+    p = sub.add_parser("diff", help="first mismatches between two VCDs")
+    p.add_argument("expected", help="reference dump (.vcd or .vcd.gz)")
+    p.add_argument("actual", help="dump to check against it")
+    p.add_argument("-n", "--count", type=int, default=10,
+                   help="stop after this many mismatches")
+    p.add_argument("--signals", nargs="+", default=None)
+    p.add_argument("--context", type=int, default=16,
+                   help="timestamps drawn either side of the first mismatch")
+    p.add_argument("--svg", help="write the window around the first mismatch")
+    p.add_argument("--wavedrom", help="same window as WaveDrom JSON")
+    p.set_defaults(func=_cmd_diff)
+
+    p = sub.add_parser("cover", help="toggle / FSM coverage of VCDs, merged")
+    p.add_argument("vcd", nargs="*", help="dumps (.vcd or .vcd.gz), e.g. every shard's")
+    p.add_argument("--scope", help="only signals under this instance, e.g. tb.dut")
+    p.add_argument("--signals", nargs="+", default=None)
+    p.add_argument("--fsm", nargs="+", default=None,
+                   help="state registers (default: guessed from names like r_state)")
+    p.add_argument("--merge", nargs="+", default=[], metavar="JSON",
+                   help="add coverage saved by earlier --json runs")
+    p.add_argument("--json", help="save the merged coverage here")
+    p.add_argument("--min", type=float, default=None,
+                   help="exit 1 when toggle coverage is below this percent")
+    p.add_argument("--limit", type=int, default=20,
+                   help="least-covered signals listed in the report")
+    p.add_argument("-j", "--workers", type=int, default=None,
+                   help="dumps read in parallel (default: CPU count)")
+    p.set_defaults(func=_cmd_cover)
+
+    p = sub.add_parser("check", help="check assertions over a VCD")
+    p.add_argument("spec", help="assertions.yaml, or assertions.py defining SPEC")
+    p.add_argument("vcd", help="dump to check (.vcd or .vcd.gz)")
+    p.add_argument("-n", "--count", type=int, default=5,
+                   help="failures shown per property")
+    p.set_defaults(func=_cmd_check)
+
+    args = ap.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,527 @@
+"""
+assertions.py — Offline checking of simple temporal properties over a VCD.
+
+    from hdlwaves.assertions import check_vcd, load_spec
+    report = check_vcd("build/uart.vcd", load_spec("assertions.yaml"))
+    print(report.summary())
+
+A spec names a sampling clock and a set of properties, SVA-style:
+
+    clock: clk                      # or "negedge clk"
+    reset: rst                      # optional: no checks, pending ones dropped, while true
+    scope: tb_uart_tx.dut           # optional: resolve short names here first
+    properties:
+      start_sets_busy: "i_start && !o_busy |=> o_busy"
+      tx_done_in_time: "o_busy |-> ##[1:200] !o_busy"
+      idle_line_high:  "!o_busy |-> o_tx"
+      state_onehot:    "$onehot(r_state)"
+      data_held:       "disable iff (!o_busy) $stable(r_data)"
+
+Expressions use Verilog operators (! ~ & | ^ && || == != < <= > >= + -,
+bit / part selects ``sig[3]`` ``sig[7:4]``, sized literals ``4'b1010``)
+and the system functions $onehot, $onehot0, $countones, $past, $stable,
+$rose and $fell; ``$past(e, N)`` is e as sampled N edges back (N defaults
+to 1, and before the Nth edge it reads as x). ``A |-> B`` checks B on the same edge as A, ``A |-> ##N
+B`` N edges later, ``##[M:N]`` on any edge in that range (``$`` = until
+the end of the dump) and ``A |=> B`` is ``A |-> ##1 B``. A property
+without an implication must hold on every edge.
+
+Values are sampled the way SVA samples them: as they were just before
+the clock edge, so a register updated on that edge is seen with its old
+value. An antecedent that is x / z does not trigger; a consequent (or an
+invariant) that is x / z fails. Obligations still open when the dump ends
+are reported as pending, not failed.
+
+Every property is evaluated in the same pass over the dump, and only the
+signals the spec mentions are decoded. Specs are YAML (``assertions.yaml``,
+needs PyYAML) or Python (``assertions.py`` defining ``SPEC = {...}``).
+"""
+
+import importlib.util
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .diff import _open
+from .vcd import iter_batches, read_header
+
+SPEC_NAMES = ("assertions.yaml", "assertions.yml", "assertions.py")
+MAX_FAILURES = 5        # failures kept (with values) per property
+
+_TOKEN_RE = re.compile(r"""\s*(?:
+    (?P<num>\d*'[sS]?[bBoOdDhH][0-9a-fA-F_xXzZ]+ | 0[xX][0-9a-fA-F_]+ | \d[\d_]*)
+  | (?P<name>\$?[A-Za-z_][\w.$]*)
+  | (?P<op>\|->|\|=>|\#\#|&&|\|\||==|!=|<=|>=|[()!~&|^<>+\-\[\]:,$])
+)""", re.X)
+_BASES = {"b": 2, "o": 8, "d": 10, "h": 16}
+_BINARY = [                     # loosest first
+    ("||", " or "), ("&&", " and "), ("|", " | "), ("^", " ^ "), ("&", " & "),
+    ("==", " == ", "!=", " != "), ("<", " < ", "<=", " <= ", ">", " > ", ">=", " >= "),
+    ("+", " + ", "-", " - "),
+]
+_LOGICAL = {"||", "&&", "==", "!=", "<", "<=", ">", ">="}
+_FUNCS = {"$onehot", "$onehot0", "$countones", "$past", "$stable", "$rose", "$fell"}
+
+
+# ---------------------------------------------------------------------------
+# Parsing: property text -> Python source over sample vectors v (now) and
+# h (history: h[0] one edge back, h[1] two edges back, ...)
+# ---------------------------------------------------------------------------
+
+class _Parser:
+    """Recursive descent over one property; resolves names with `lookup`."""
+
+    def __init__(self, text: str, lookup):
+        self.text, self.lookup = text, lookup
+        self.toks, pos = [], 0
+        text = text.rstrip()
+        while pos < len(text):
+            m = _TOKEN_RE.match(text, pos)
+            if not m or m.end() == pos:
+                raise ValueError(f"cannot parse {text[pos:].strip()!r} in {self.text!r}")
+            kind = m.lastgroup
+            self.toks.append((kind, m.group(kind)))
+            pos = m.end()
+        self.i = 0
+        self.now, self.past = set(), set()      # indexes, (edges back, index) read
+
+    def peek(self, k: int = 0):
+        j = self.i + k
+        return self.toks[j][1] if j < len(self.toks) else None
+
+    def take(self, want: Optional[str] = None) -> str:
+        if self.i >= len(self.toks):
+            raise ValueError(f"unexpected end of {self.text!r}")
+        tok = self.toks[self.i][1]
+        if want is not None and tok != want:
+            raise ValueError(f"expected {want!r}, found {tok!r} in {self.text!r}")
+        self.i += 1
+        return tok
+
+    def number(self) -> int:
+        kind, tok = self.toks[self.i] if self.i < len(self.toks) else (None, None)
+        if kind != "num":
+            raise ValueError(f"expected a number, found {tok!r} in {self.text!r}")
+        self.i += 1
+        return _literal(tok)[0]
+
+    # Each level returns (python source, width) for the values sampled
+    # `back` edges ago; reads land in now / past.
+
+    def expr(self, level: int = 0, back: int = 0) -> tuple:
+        if level == len(_BINARY):
+            return self.unary(back)
+        ops = dict(zip(_BINARY[level][::2], _BINARY[level][1::2]))
+        src, width = self.expr(level + 1, back)
+        while self.peek() in ops:
+            op = self.take()
+            rhs, rw = self.expr(level + 1, back)
+            if op in _LOGICAL:
+                if op in ("&&", "||"):
+                    src, rhs = f"bool({src})", f"bool({rhs})"
+                src, width = f"int({src}{ops[op]}{rhs})", 1
+            else:
+                width = max(width, rw) + (op in "+-")
+                src = f"(({src}{ops[op]}{rhs}) & {(1 << width) - 1})"
+        return src, width
+
+    def unary(self, back: int) -> tuple:
+        op = self.peek()
+        if op in ("!", "~", "-"):
+            self.take()
+            src, width = self.unary(back)
+            if op == "!":
+                return f"int(not {src})", 1
+            return f"(({'~' if op == '~' else '-'}{src}) & {(1 << width) - 1})", width
+        return self.postfix(back)
+
+    def postfix(self, back: int) -> tuple:
+        src, width = self.primary(back)
+        while self.peek() == "[":
+            self.take()
+            hi = self.number()
+            lo = hi
+            if self.peek() == ":":
+                self.take()
+                lo = self.number()
+            self.take("]")
+            hi, lo = max(hi, lo), min(hi, lo)
+            width = hi - lo + 1
+            src = f"(({src} >> {lo}) & {(1 << width) - 1})"
+        return src, width
+
+    def primary(self, back: int) -> tuple:
+        kind, tok = self.toks[self.i] if self.i < len(self.toks) else (None, None)
+        if tok == "(":
+            self.take()
+            inner = self.expr(0, back)
+            self.take(")")
+            return f"({inner[0]})", inner[1]
+        if kind == "num":
+            self.take()
+            value, width = _literal(tok)
+            return str(value), width
+        if kind == "name" and tok.startswith("$"):
+            return self.call(back)
+        if kind == "name":
+            self.take()
+            index, width = self.lookup(tok)
+            if not back:
+                self.now.add(index)
+                return f"v[{index}]", width
+            self.past.add((back, index))
+            return f"h[{back - 1}][{index}]", width
+        raise ValueError(f"unexpected {tok!r} in {self.text!r}")
+
+    def call(self, back: int) -> tuple:
+        name = self.take()
+        if name not in _FUNCS:
+            raise ValueError(f"unknown function {name} in {self.text!r} "
+                             f"(known: {', '.join(sorted(_FUNCS))})")
+        self.take("(")
+        start, reads = self.i, (set(self.now), set(self.past))
+        src, width = self.expr(0, back)
+        if name in ("$past", "$stable", "$rose", "$fell"):
+            end, n = self.i, 1
+            if name == "$past" and self.peek() == ",":
+                self.take()
+                n = self.number()
+                if n < 1:
+                    raise ValueError(f"$past needs at least 1 edge back in {self.text!r}")
+                end = self.i
+            if name == "$past":
+                self.now, self.past = reads         # only the old value is read
+            self.i = start
+            old, _ = self.expr(0, back + n)         # same expression, n edges back
+            self.i = end
+        self.take(")")
+        if name == "$onehot":
+            return f"_onehot({src})", 1
+        if name == "$onehot0":
+            return f"int(({src}) & (({src}) - 1) == 0)", 1
+        if name == "$countones":
+            return f"bin({src}).count('1')", width.bit_length() + 1
+        if name == "$past":
+            return old, width
+        if name == "$stable":
+            return f"int({src} == {old})", 1
+        if name == "$rose":
+            return f"int(({src}) & 1 and not ({old}) & 1)", 1
+        return f"int(not ({src}) & 1 and ({old}) & 1)", 1     # $fell
+
+    def finish(self, src: str) -> "_Expr":
+        """Compile `src` with the reads collected since the last finish."""
+        fn = eval(f"lambda v, h: {src}", {"_onehot": _onehot})
+        expr = _Expr(fn, self.now, self.past)
+        self.now, self.past = set(), set()
+        return expr
+
+    def whole(self) -> "_Expr":
+        """The rest of the text as one expression."""
+        src, _ = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f"unexpected {self.peek()!r} in {self.text!r}")
+        return self.finish(src)
+
+
+def _onehot(x: int) -> int:
+    return int(x != 0 and x & (x - 1) == 0)
+
+
+def _literal(tok: str) -> tuple:
+    """(value, width) of 12, 0x1F or 4'b10x1 (x / z bits read as 0)."""
+    tok = tok.replace("_", "")
+    if "'" not in tok:
+        return (int(tok, 16) if tok[:2].lower() == "0x" else int(tok)), 32
+    size, _, rest = tok.partition("'")
+    rest = rest.lstrip("sS")
+    digits = re.sub(r"[xXzZ]", "0", rest[1:])
+    value = int(digits, _BASES[rest[0].lower()])
+    width = int(size) if size else max(value.bit_length(), 1)
+    return value & ((1 << width) - 1), width
+
+
+@dataclass
+class Failure:
+    time: int           # edge at which the property failed
+    start: int          # edge whose antecedent started the attempt
+    values: str         # the property's signals at the failing edge
+
+
+@dataclass
+class PropertyResult:
+    name: str
+    text: str
+    attempts: int = 0       # edges where the antecedent held
+    passed: int = 0
+    failed: int = 0
+    pending: int = 0        # attempts still open at the end of the dump
+    failures: list = field(default_factory=list)    # the first few [Failure]
+
+    @property
+    def ok(self) -> bool:
+        return self.failed == 0
+
+
+@dataclass
+class AssertionReport:
+    clock: str
+    results: list = field(default_factory=list)     # [PropertyResult]
+    cycles: int = 0             # sampling edges seen
+    end_time: int = 0
+    timescale: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.results)
+
+    def summary(self) -> str:
+        lines = [f"{len(self.results)} properties over {self.cycles} edges of "
+                 f"{self.clock} (t = 0 … {self.end_time} {self.timescale})"]
+        width = max((len(r.name) for r in self.results), default=0)
+        for r in self.results:
+            status = "PASS" if r.ok else "FAIL"
+            detail = (f"{r.failed} of {r.attempts} attempts failed" if r.failed
+                      else f"{r.attempts} attempts" if r.attempts else "never triggered")
+            if r.pending:
+                detail += f", {r.pending} pending at end"
+            lines.append(f"  {status}  {r.name:<{width}}  {detail}")
+            for fail in r.failures:
+                began = f" (from t={fail.start})" if fail.start != fail.time else ""
+                lines.append(f"        t={fail.time}{began}: {fail.values}")
+        return "\n".join(lines)
+
+
+class _Property:
+    """A compiled property and its open obligations."""
+
+    def __init__(self, name: str, text: str, lookup, names: list, max_failures: int):
+        self.result, self.names, self.max_failures = PropertyResult(name, text), names, max_failures
+        body, disable = text.strip(), None
+        m = re.match(r"disable\s+iff\s*\(", body)
+        if m:                   # balanced parens around the disable condition
+            depth, j = 1, m.end()
+            while j < len(body) and depth:
+                depth += {"(": 1, ")": -1}.get(body[j], 0)
+                j += 1
+            disable, body = body[m.end():j - 1], body[j:]
+        self.disable = _Parser(disable, lookup).whole() if disable else None
+        parser = _Parser(body, lookup)
+        if "|->" in body or "|=>" in body:
+            self.ant = parser.finish(parser.expr()[0])
+            op = parser.take()
+            lo = hi = 1 if op == "|=>" else 0
+            if op == "|->" and parser.peek() == "##":
+                parser.take()
+                if parser.peek() == "[":
+                    parser.take()
+                    lo = parser.number()
+                    parser.take(":")
+                    if parser.peek() == "$":
+                        parser.take()
+                        hi = float("inf")
+                    else:
+                        hi = parser.number()
+                    parser.take("]")
+                else:
+                    lo = hi = parser.number()
+        else:
+            self.ant, lo, hi = None, 0, 0
+        self.cons = parser.whole()
+        self.lo, self.hi = lo, hi
+        self.open: deque = deque()          # (first edge, last edge, start time)
+        exprs = [e for e in (self.ant, self.cons, self.disable) if e]
+        self.show = sorted(set().union(*(e.now | {i for _, i in e.past} for e in exprs)))
+        self.depth = max(e.depth for e in exprs)    # edges of history read
+
+    def step(self, edge: int, t: int, v: list, h) -> None:
+        r = self.result
+        if self.disable is not None and self.disable(v, h) is not False:
+            self.open.clear()               # x in the disable condition also disables
+            return
+        holds = None
+        if self.open:
+            holds = self.cons(v, h)
+            keep = deque()
+            for first, last, t0 in self.open:
+                if edge < first:
+                    keep.append((first, last, t0))
+                elif holds:
+                    r.passed += 1
+                elif edge >= last:
+                    self.fail(t, t0, v)
+                else:
+                    keep.append((first, last, t0))
+            self.open = keep
+        if self.ant is not None and not self.ant(v, h):
+            return
+        r.attempts += 1
+        if self.lo == 0:
+            if holds is None:
+                holds = self.cons(v, h)
+            if holds:
+                r.passed += 1
+                return
+            if self.hi == 0:
+                self.fail(t, t, v)
+                return
+        self.open.append((edge + max(self.lo, 1), edge + self.hi, t))
+
+    def fail(self, t: int, t0: int, v: list) -> None:
+        r = self.result
+        r.failed += 1
+        if len(r.failures) < self.max_failures:
+            shown = " ".join(f"{self.names[i]}={_show(v[i])}" for i in self.show)
+            r.failures.append(Failure(t, t0, shown))
+
+
+class _Expr:
+    """Compiled expression: True / False, or None when a signal it reads is x / z."""
+
+    def __init__(self, fn, now: set, past: set):
+        self.fn, self.now, self.past = fn, now, past
+        self._now = tuple(now)
+        self._past = tuple((back - 1, i) for back, i in past)
+        self.depth = max((back for back, _ in past), default=0)
+
+    def __call__(self, v: list, h) -> Optional[bool]:
+        for i in self._now:
+            if v[i] is None:
+                return None
+        for j, i in self._past:
+            if h[j][i] is None:
+                return None
+        return bool(self.fn(v, h))
+
+
+def _show(value) -> str:
+    return "x" if value is None else str(value) if value < 10 else f"0x{value:X}"
+
+
+# ---------------------------------------------------------------------------
+# Specs and the checking pass
+# ---------------------------------------------------------------------------
+
+def find_spec(directory) -> Optional[Path]:
+    """The assertions spec in `directory`, if it has one."""
+    for name in SPEC_NAMES:
+        path = Path(directory) / name
+        if path.is_file():
+            return path
+    return None
+
+
+def load_spec(path) -> dict:
+    """Read a YAML spec, or a Python one defining SPEC; checks its shape."""
+    path = Path(path)
+    if path.suffix == ".py":
+        module_spec = importlib.util.spec_from_file_location(f"_assertions_{path.stem}", path)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+        spec = getattr(module, "SPEC", None)
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path}: reading YAML specs needs PyYAML "
+                             f"(pip install pyyaml), or write assertions.py with SPEC = {{...}}")
+        spec = yaml.safe_load(path.read_text())
+    if not isinstance(spec, dict) or "clock" not in spec \
+            or not isinstance(spec.get("properties"), dict):
+        raise ValueError(f"{path}: a spec needs 'clock' and a 'properties' mapping")
+    return spec
+
+
+def _resolver(header, scope: Optional[str]):
+    """lookup(name) -> (sample index, width), registering codes as it goes."""
+    codes, names, widths = [], [], []
+
+    def lookup(name: str) -> tuple:
+        exact = [v for v in header.vars if v.path == name]
+        if not exact and scope:
+            exact = [v for v in header.vars if v.path == f"{scope}.{name}"]
+        found = exact or [v for v in header.vars if v.name == name]
+        distinct = list(dict.fromkeys(v.code for v in found))
+        if not distinct:
+            raise ValueError(f"no signal {name!r} in the dump")
+        if len(distinct) > 1:
+            paths = ", ".join(v.path for v in found[:4])
+            raise ValueError(f"{name!r} is ambiguous ({paths}); use the full path"
+                             + ("" if scope else " or set scope"))
+        code = distinct[0]
+        if code not in codes:
+            codes.append(code)
+            names.append(name)
+            widths.append(next(v.width for v in found))
+        i = codes.index(code)
+        return i, widths[i]
+
+    return lookup, codes, names
+
+
+def check_vcd(vcd, spec: dict, max_failures: int = MAX_FAILURES) -> AssertionReport:
+    """
+    Evaluate every property of `spec` over one dump in a single pass.
+
+    Raises ValueError for a spec that does not parse or names a signal the
+    dump does not have.
+    """
+    clock = str(spec["clock"]).split()
+    edge_kind, clock_name = (clock[0], clock[1]) if len(clock) == 2 else ("posedge", clock[0])
+    if edge_kind not in ("posedge", "negedge"):
+        raise ValueError(f"clock must be 'NAME', 'posedge NAME' or 'negedge NAME', "
+                         f"not {spec['clock']!r}")
+    reset = spec.get("reset")
+    with _open(vcd) as f:
+        header = read_header(f)
+        lookup, codes, names = _resolver(header, spec.get("scope"))
+        clk, _ = lookup(clock_name)
+        props = []
+        for name, text in spec["properties"].items():
+            text = str(text)
+            if reset and not text.lstrip().startswith("disable"):
+                text = f"disable iff ({reset}) {text}"
+            props.append(_Property(name, text, lookup, names, max_failures))
+        report = AssertionReport(clock=f"{clock_name} ({edge_kind})",
+                                 results=[p.result for p in props],
+                                 timescale=header.timescale)
+        slot = {code: i for i, code in enumerate(codes)}
+        widths = {code: next(v.width for v in header.vars if v.code == code) for code in codes}
+        clk_code, rising = codes[clk], edge_kind == "posedge"
+        v: list = [None] * len(codes)
+        # Samples at the last few edges, newest first; x until there are any.
+        depth = max([1] + [prop.depth for prop in props])
+        h = deque([[None] * len(codes)] * depth, maxlen=depth)
+        edges = 0
+        t = 0
+        for t, batch in iter_batches(f, codes):
+            for code, raw in batch:
+                if code == clk_code:
+                    old, new = v[clk], _decode(raw, 1)
+                    if old is not None and new is not None and old != new \
+                            and new == rising:
+                        edges += 1
+                        for prop in props:
+                            prop.step(edges, t, v, h)
+                        h.appendleft(list(v))
+                    break
+            for code, raw in batch:
+                v[slot[code]] = _decode(raw, widths[code])
+        report.cycles, report.end_time = edges, t
+    for prop in props:
+        prop.result.pending = len(prop.open)
+    return report
+
+
+def _decode(raw: str, width: int) -> Optional[int]:
+    """A raw VCD value as an int, or None when any bit is x / z."""
+    if len(raw) == 1:
+        return 1 if raw == "1" else 0 if raw == "0" else None
+    if raw[0] in "bB":
+        try:
+            return int(raw[1:] or "0", 2)
+        except ValueError:
+            return None
+    return None                             # reals are not supported
@@ -0,0 +1,298 @@
+"""
+columnar.py — Binary columnar cache of a VCD for fast repeated queries.
+
+The first query on a dump converts it once into ``.hdlwaves/<name>.cols``
+next to the VCD: one change-time array and one value array per signal,
+written back to back. Later queries memory-map that file and read only
+the columns they ask for, so a different signal subset or window on a
+large dump costs a few binary searches instead of a full re-parse.
+
+    from hdlwaves.columnar import load
+    trace = load("dump.vcd", signals=["clk", "o_tx"])   # a VcdTrace
+
+The cache is rebuilt whenever the VCD's size or mtime changes; delete the
+``.hdlwaves/`` directory to drop it. ``show_waves`` / ``vcd_to_wavedrom``
+use it automatically and fall back to the text parser when the VCD's
+directory is not writable.
+
+File layout (native byte order, recorded in the index):
+    8 bytes   magic  b"HDLWCOL1"
+    8 bytes   offset of the JSON index (uint64)
+    ...       column data, each array 8-byte aligned
+    ...       JSON index: source stat, timescale, $var list, columns
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Optional
+
+from .vcd import VcdHeader, VcdTrace, VcdVar, decode_value, iter_changes, read_header
+
+try:
+    import numpy as np
+except ImportError:  # pure-Python fallback for the time grid
+    np = None
+
+MAGIC = b"HDLWCOL1"
+FORMAT_VERSION = 1
+CACHE_DIRNAME = ".hdlwaves"
+
+# Value encodings: 1-bit → int8, buses up to 62 bits → int64, reals →
+# float64. Unknowns use negative sentinels; wider buses are kept as JSON.
+X, Z = -1, -2
+_WIDE = 62
+
+_open: dict = {}     # resolved VCD path → ColumnStore
+
+
+def cache_path(vcd_path) -> Path:
+    """Where the columnar cache for ``vcd_path`` lives."""
+    p = Path(vcd_path)
+    return p.parent / CACHE_DIRNAME / f"{p.name}.cols"
+
+
+def _typecode(var: VcdVar) -> str:
+    if var.kind == "real":
+        return "d"
+    if var.width == 1:
+        return "b"
+    return "q" if var.width <= _WIDE else "j"
+
+
+def _encode(value):
+    if value == "x":
+        return X
+    if value == "z":
+        return Z
+    return value
+
+
+def _decode(v):
+    if v >= 0:
+        return v
+    return "x" if v == X else "z"
+
+
+def _stamp(vcd_path) -> dict:
+    st = os.stat(vcd_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def build(vcd_path, out_path=None) -> Path:
+    """Convert ``vcd_path`` to a columnar cache file (one text pass)."""
+    vcd_path = Path(vcd_path)
+    out_path = Path(out_path) if out_path else cache_path(vcd_path)
+    stamp = _stamp(vcd_path)
+
+    with open(vcd_path) as f:
+        header = read_header(f)
+        chosen = header.select()
+        cols = {}
+        for code, var in chosen.items():
+            tc = _typecode(var)
+            cols[code] = (tc, array("q"), [] if tc == "j" else array(tc), var.width)
+        end_time = 0
+        for time, code, raw in iter_changes(f, cols.keys()):
+            tc, times, values, width = cols[code]
+            times.append(time)
+            value = decode_value(raw, width)
+            values.append(value if tc in "jd" else _encode(value))
+            end_time = time
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(".tmp")
+    index = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "source": stamp,
+        "timescale": header.timescale,
+        "end_time": end_time,
+        "vars": [[v.code, v.name, v.scope, v.width, v.kind] for v in header.vars],
+        "columns": {},
+    }
+    with open(tmp, "wb") as out:
+        out.write(MAGIC + b"\0" * 8)
+        for code, (tc, times, values, _) in cols.items():
+            if not times:
+                continue
+            t_off = out.tell()
+            times.tofile(out)
+            if tc == "j":
+                blob = json.dumps(values).encode()
+                v_off = out.tell()
+                out.write(blob)
+                out.write(b"\0" * (-len(blob) % 8))
+                index["columns"][code] = [tc, len(times), t_off, v_off, len(blob)]
+            else:
+                v_off = out.tell()
+                values.tofile(out)
+                out.write(b"\0" * (-out.tell() % 8))
+                index["columns"][code] = [tc, len(times), t_off, v_off]
+        index_off = out.tell()
+        out.write(json.dumps(index, separators=(",", ":")).encode())
+        out.seek(len(MAGIC))
+        out.write(struct.pack("<Q", index_off))
+    os.replace(tmp, out_path)
+    return out_path
+
+
+class Column:
+    """
+    One signal's changes, backed by the memory-mapped cache.
+
+    Behaves like the ``[(time, value), ...]`` list parse_vcd produces
+    (len, indexing, iteration) and adds ``sample`` for zero-order-hold
+    lookups by binary search.
+    """
+
+    def __init__(self, times, values, decode):
+        self.times = times
+        self._values = values
+        self._decode = decode
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, i):
+        return self.times[i], self._decode(self._values[i])
+
+    def __iter__(self):
+        decode = self._decode
+        return ((t, decode(v)) for t, v in zip(self.times, self._values))
+
+    def sample(self, sample_times) -> list:
+        """Value held at each of the (ascending) ``sample_times``."""
+        times, values, decode = self.times, self._values, self._decode
+        out = []
+        lo = 0
+        for t in sample_times:
+            lo = bisect_right(times, t, lo)
+            out.append(decode(values[lo - 1]) if lo else 0)
+        return out
+
+
+class ColumnStore:
+    """An open, memory-mapped columnar cache file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a columnar waveform cache")
+        (index_off,) = struct.unpack_from("<Q", self._mm, len(MAGIC))
+        self.index = json.loads(self._mm[index_off:])
+        self.header = VcdHeader(
+            vars=[VcdVar(*v) for v in self.index["vars"]],
+            timescale=self.index["timescale"],
+        )
+        self._spans: dict = {}
+
+    def close(self):
+        mm, self._mm = getattr(self, "_mm", None), None
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:  # Columns still reference it; GC unmaps
+                pass
+        self._file.close()
+
+    def fresh(self, vcd_path) -> bool:
+        """True if this cache was built from the VCD as it is now."""
+        return (self.index.get("version") == FORMAT_VERSION
+                and self.index.get("byteorder") == sys.byteorder
+                and self.index.get("source") == _stamp(vcd_path))
+
+    def _view(self, offset: int, count: int, typecode: str):
+        size = array(typecode).itemsize
+        return memoryview(self._mm)[offset:offset + count * size].cast(typecode)
+
+    def column(self, code: str) -> Optional[Column]:
+        entry = self.index["columns"].get(code)
+        if entry is None:
+            return None
+        tc, count, t_off, v_off = entry[:4]
+        times = self._view(t_off, count, "q")
+        if tc == "j":
+            values = json.loads(self._mm[v_off:v_off + entry[4]])
+            return Column(times, values, lambda v: v)
+        decode = (lambda v: v) if tc == "d" else _decode
+        return Column(times, self._view(v_off, count, tc), decode)
+
+    def span(self, codes) -> Optional[tuple]:
+        """
+        (smallest interval between changes, last change time) across the
+        given signals — the sample grid vcd_to_wavedrom draws on. Memoised
+        per signal set, so repeat queries skip the merge.
+        """
+        key = tuple(sorted(codes))
+        if key not in self._spans:
+            cols = [c for c in map(self.column, key) if c is not None]
+            self._spans[key] = _span([c.times for c in cols])
+        return self._spans[key]
+
+
+def _span(time_columns: list) -> Optional[tuple]:
+    if np is not None:
+        if not time_columns:
+            return None
+        ts = np.unique(np.concatenate([np.asarray(t) for t in time_columns]))
+        if len(ts) < 2:
+            return None
+        return int(np.diff(ts).min()), int(ts[-1])
+    ts = sorted(set().union(*time_columns))
+    if len(ts) < 2:
+        return None
+    return min(b - a for a, b in zip(ts, ts[1:])), ts[-1]
+
+
+def open_store(vcd_path) -> ColumnStore:
+    """
+    Return the open cache for ``vcd_path``, (re)building it if the VCD
+    changed since it was written. Stores stay mapped for the session.
+    """
+    key = str(Path(vcd_path).resolve())
+    store = _open.get(key)
+    if store is not None and store.fresh(vcd_path):
+        return store
+    if store is not None:
+        store.close()
+        del _open[key]
+
+    path = cache_path(vcd_path)
+    store = None
+    if path.is_file():
+        try:
+            store = ColumnStore(path)
+        except (ValueError, struct.error):
+            store = None
+        if store is not None and not store.fresh(vcd_path):
+            store.close()
+            store = None
+    if store is None:
+        store = ColumnStore(build(vcd_path, path))
+    _open[key] = store
+    return store
+
+
+def load(vcd_path, signals=None) -> VcdTrace:
+    """
+    Like vcd.parse_vcd, but served from the columnar cache: the changes
+    are Column objects that read straight from the mapped file.
+    """
+    store = open_store(vcd_path)
+    chosen = store.header.select(signals)
+    trace = VcdTrace(header=store.header, vars=chosen)
+    for code in chosen:
+        col = store.column(code)
+        if col is not None:
+            trace.changes[code] = col
+            trace.end_time = max(trace.end_time, col.times[-1])
+    return trace
@@ -0,0 +1,287 @@
+"""
+coverage.py — Toggle and FSM-state coverage from VCD dumps, in one pass.
+
+    from hdlwaves.coverage import vcd_coverage
+    cov = vcd_coverage("dump.vcd", scope="tb_uart_rx.dut")
+    print(cov.report())
+
+Toggle coverage: a bit is covered once it has been seen both to rise
+(0 → 1) and to fall (1 → 0); changes to or from x / z do not count. Each
+signal keeps two integers used as bitsets (rose, fell), so a 32-bit bus
+costs the same as a 1-bit flag, and a signal whose every bit has toggled
+both ways is dropped from the parse for the rest of the dump.
+
+FSM coverage: registers whose leaf name looks like a state variable
+(``state``, ``r_state``, ``rx_state_q`` ... but not ``next_state``) or
+that are named in ``fsm=`` also record which encodings they held and
+which from → to arcs they took, again as bitsets (bit ``v`` and bit
+``from << width | to``). The VCD does not say which encodings are legal,
+so the report lists what was visited rather than a percentage.
+
+Coverage objects merge by hierarchical name (OR of the bitsets), so the
+results of many runs — every shard of a gen_vectors regression, say —
+add up to one report. ``to_dict`` / ``from_dict`` give a JSON form that
+can be saved and merged later. ``.vcd.gz`` dumps are read directly.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Optional
+
+from .diff import _open
+from .vcd import iter_batches, read_header
+
+COVERAGE_VERSION = 1
+FSM_MAX_WIDTH = 8       # wider "state" registers are toggle-covered only
+STATE_RE = re.compile(r"(?:^|_)(?:state|fsm)(?:_(?:q|r|reg))?$", re.I)
+TOGGLE_KINDS = {"wire", "reg", "logic", "bit", "tri", "tri0", "tri1", "wand", "wor"}
+
+_UNKNOWN = str.maketrans("01xXzZ", "001111")
+_KNOWN = str.maketrans("xXzZ", "0000")
+
+
+def is_state_name(name: str) -> bool:
+    """True for leaf names that look like an FSM's current-state register."""
+    return bool(STATE_RE.search(name)) and "next" not in name.lower()
+
+
+@dataclass
+class SignalCoverage:
+    """Per-bit toggle accumulators for one signal."""
+    width: int
+    rose: int = 0       # bit i set: bit i went 0 -> 1
+    fell: int = 0       # bit i set: bit i went 1 -> 0
+
+    @property
+    def covered(self) -> int:
+        """Bits that toggled both ways."""
+        return bin(self.rose & self.fell).count("1")
+
+    def missing(self) -> str:
+        """Untoggled bits as e.g. "7 6↓ 0↑" (arrow = the direction still needed)."""
+        out = []
+        for i in range(self.width - 1, -1, -1):
+            r, f = (self.rose >> i) & 1, (self.fell >> i) & 1
+            if not (r and f):
+                out.append(str(i) if not (r or f) else f"{i}{'↓' if r else '↑'}")
+        return " ".join(out)
+
+    def merge(self, other: "SignalCoverage") -> None:
+        self.rose |= other.rose
+        self.fell |= other.fell
+
+
+@dataclass
+class FsmCoverage:
+    """Visited encodings and arcs of one state register."""
+    width: int
+    states: int = 0     # bit v set: the register held v
+    arcs: int = 0       # bit (a << width | b) set: it went from a to b
+
+    def state_list(self) -> list:
+        return [v for v in range(1 << self.width) if (self.states >> v) & 1]
+
+    def arc_list(self) -> list:
+        w, mask = self.width, (1 << self.width) - 1
+        return [(i >> w, i & mask) for i in range(1 << (2 * w)) if (self.arcs >> i) & 1]
+
+    def merge(self, other: "FsmCoverage") -> None:
+        self.states |= other.states
+        self.arcs |= other.arcs
+
+
+@dataclass
+class Coverage:
+    toggles: dict = field(default_factory=dict)     # path -> SignalCoverage
+    fsms: dict = field(default_factory=dict)        # path -> FsmCoverage
+    runs: int = 0                                   # dumps merged in
+
+    @property
+    def bits(self) -> int:
+        return sum(s.width for s in self.toggles.values())
+
+    @property
+    def covered(self) -> int:
+        return sum(s.covered for s in self.toggles.values())
+
+    @property
+    def percent(self) -> float:
+        return 100.0 * self.covered / self.bits if self.bits else 100.0
+
+    def merge(self, other: "Coverage") -> "Coverage":
+        """OR `other` into this one (signals matched by path); returns self."""
+        for mine, theirs in ((self.toggles, other.toggles), (self.fsms, other.fsms)):
+            for path, cov in theirs.items():
+                have = mine.get(path)
+                if have is None:
+                    mine[path] = replace(cov)
+                    continue
+                if have.width != cov.width:
+                    raise ValueError(f"{path}: width {have.width} in one run, "
+                                     f"{cov.width} in another")
+                have.merge(cov)
+        self.runs += other.runs
+        return self
+
+    def to_dict(self) -> dict:
+        """JSON-ready form; bitsets are hex strings."""
+        return {
+            "version": COVERAGE_VERSION,
+            "runs": self.runs,
+            "toggle": {p: [s.width, f"{s.rose:x}", f"{s.fell:x}"]
+                       for p, s in sorted(self.toggles.items())},
+            "fsm": {p: [s.width, f"{s.states:x}", f"{s.arcs:x}"]
+                    for p, s in sorted(self.fsms.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Coverage":
+        if data.get("version") != COVERAGE_VERSION:
+            raise ValueError(f"coverage format {data.get('version')!r}, "
+                             f"expected {COVERAGE_VERSION}")
+        return cls(
+            toggles={p: SignalCoverage(w, int(r, 16), int(f, 16))
+                     for p, (w, r, f) in data["toggle"].items()},
+            fsms={p: FsmCoverage(w, int(s, 16), int(a, 16))
+                  for p, (w, s, a) in data["fsm"].items()},
+            runs=data.get("runs", 0),
+        )
+
+    def report(self, limit: int = 20) -> str:
+        """Plain-text summary: totals, the least-covered signals, each FSM."""
+        lines = [f"toggle coverage: {self.percent:.1f}% ({self.covered}/{self.bits} bits, "
+                 f"{len(self.toggles)} signals, {self.runs} run{'s' * (self.runs != 1)})"]
+        short = sorted((p for p, s in self.toggles.items() if s.covered < s.width),
+                       key=lambda p: (self.toggles[p].covered / self.toggles[p].width, p))
+        if short:
+            width = max(len(p) for p in short[:limit])
+            lines.append("  untoggled bits (↑ / ↓: only that edge still missing):")
+            for p in short[:limit]:
+                s = self.toggles[p]
+                lines.append(f"    {p:<{width}}  {s.covered:>3}/{s.width:<3} {s.missing()}")
+            if len(short) > limit:
+                lines.append(f"    … {len(short) - limit} more")
+        for p, f in sorted(self.fsms.items()):
+            states, arcs = f.state_list(), f.arc_list()
+            lines.append(f"fsm {p} ({f.width} bit): {len(states)} of {1 << f.width} "
+                         f"encodings visited: {' '.join(map(str, states)) or '-'}")
+            lines.append(f"    {len(arcs)} arcs: "
+                         + (" ".join(f"{a}→{b}" for a, b in arcs) or "-"))
+        return "\n".join(lines)
+
+
+def _select(header, signals, scope, fsm) -> tuple:
+    """({code: path} to toggle-cover, {code: path} FSM registers, widths)."""
+    wanted = None if signals is None else list(signals)
+    named = None if fsm is None else list(fsm)
+    prefix = scope + "." if scope else ""
+    toggle, states, widths = {}, {}, {}
+    for var in header.vars:
+        if var.code in toggle or var.kind not in TOGGLE_KINDS:
+            continue
+        if prefix and not var.path.startswith(prefix):
+            continue
+        if wanted is not None and not var.matches(wanted):
+            continue
+        toggle[var.code], widths[var.code] = var.path, var.width
+        is_fsm = var.matches(named) if named is not None else is_state_name(var.name)
+        if is_fsm and var.width <= FSM_MAX_WIDTH:
+            states[var.code] = var.path
+    return toggle, states, widths
+
+
+def vcd_coverage(path, signals: Optional[Iterable[str]] = None,
+                 scope: Optional[str] = None,
+                 fsm: Optional[Iterable[str]] = None) -> Coverage:
+    """
+    Toggle and FSM coverage of one dump; see the module docstring.
+
+    ``signals`` limits the signals covered (leaf names or paths), ``scope``
+    to those under one instance (e.g. ``"tb_uart_rx.dut"``), and ``fsm``
+    names the state registers explicitly instead of guessing by name.
+    """
+    with _open(path) as f:
+        header = read_header(f)
+        toggle, states, widths = _select(header, signals, scope, fsm)
+        full = {c: (1 << w) - 1 for c, w in widths.items()}
+        val = dict.fromkeys(toggle, 0)
+        unk = dict(full)                        # everything starts as x
+        rose, fell = dict.fromkeys(toggle, 0), dict.fromkeys(toggle, 0)
+        seen, arcs = dict.fromkeys(states, 0), dict.fromkeys(states, 0)
+        keep = set(toggle)
+
+        stream = iter_batches(f, keep)
+        while keep:
+            batch = next(stream, None)
+            if batch is None:
+                break
+            done = []
+            for code, raw in batch[1]:
+                if code not in keep:            # saturated earlier in this batch
+                    continue
+                if len(raw) == 1:
+                    v, u = (1, 0) if raw == "1" else (0, 0) if raw == "0" else (0, 1)
+                elif raw[0] in "bB":
+                    bits = raw[1:] or "0"
+                    try:
+                        v, u = int(bits, 2), 0
+                    except ValueError:
+                        if len(bits) < widths[code] and bits[0] in "xXzZ":
+                            bits = bits.rjust(widths[code], bits[0])
+                        v, u = int(bits.translate(_KNOWN), 2), int(bits.translate(_UNKNOWN), 2)
+                else:
+                    continue                    # reals are not covered
+                pv, pu = val[code], unk[code]
+                val[code], unk[code] = v, u
+                known = ~(pu | u)
+                moved = (pv ^ v) & known
+                if moved:
+                    rose[code] |= moved & v
+                    fell[code] |= moved & pv
+                if code in seen:
+                    if not u:
+                        seen[code] |= 1 << v
+                        if not pu and pv != v:
+                            arcs[code] |= 1 << (pv << widths[code] | v)
+                elif rose[code] == full[code] and fell[code] == full[code]:
+                    done.append(code)
+            if done:
+                # Coverage ignores time, so restarting the reader with fewer
+                # codes is safe; once every bit has toggled, stop reading.
+                keep.difference_update(done)
+                stream = iter_batches(f, keep)
+
+    cov = Coverage(runs=1)
+    for code, p in toggle.items():
+        cov.toggles[p] = SignalCoverage(widths[code], rose[code], fell[code])
+    for code, p in states.items():
+        cov.fsms[p] = FsmCoverage(widths[code], seen[code], arcs[code])
+    return cov
+
+
+def _one(args) -> Coverage:
+    return vcd_coverage(*args)
+
+
+def merge_coverage(paths: Iterable, signals: Optional[Iterable[str]] = None,
+                   scope: Optional[str] = None, fsm: Optional[Iterable[str]] = None,
+                   workers: Optional[int] = None) -> Coverage:
+    """
+    Coverage of several dumps merged into one, reading them in parallel.
+
+    ``workers`` defaults to the CPU count; 1 reads the dumps in turn.
+    """
+    jobs = [(p, None if signals is None else list(signals), scope,
+             None if fsm is None else list(fsm)) for p in paths]
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    total = Coverage()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for cov in pool.map(_one, jobs):
+                total.merge(cov)
+    else:
+        for job in jobs:
+            total.merge(_one(job))
+    return total
@@ -0,0 +1,295 @@
+"""
+diff.py — Streaming comparison of two VCD dumps (reference vs. student run).
+
+    from hdlwaves.diff import diff_vcds
+    result = diff_vcds("expected.vcd", "build/dump.vcd", max_mismatches=10)
+    for m in result.mismatches:
+        print(m.time, m.signal, m.expected, m.actual)
+
+Both dumps are read once, in lockstep by timestamp. Only the current value
+of each compared signal and a few timestamps of recent changes are held,
+so memory does not grow with the dump, and reading stops as soon as the
+requested mismatches (and the window after the first) have been seen.
+
+Signals are matched by hierarchical name (``tb_uart_tx.dut.o_tx``); ones
+present in only one dump are listed, not compared. After all changes at
+a timestamp are applied, every signal that changed on either side is
+compared; each change while the two disagree is one mismatch. Vector
+values are compared bit for bit (x / z included), after the VCD rule
+that a short value is left-extended with 0, or with its own leading x / z.
+
+``result.window`` is a WaveDrom dict (the shared changes_to_wavedrom
+model) around the first mismatch: expected and actual rows for each
+signal that diverged in it. ``.vcd.gz`` dumps are read directly.
+"""
+
+import gzip
+import itertools
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from .vcd import VcdVar, decode_value, iter_batches, read_header
+from .wavedrom import changes_to_wavedrom
+
+WINDOW_SIGNALS = 6      # most diverging signals drawn in the window
+CHUNK = 1 << 22         # characters compared at a time while the dumps agree
+SEARCH_CODES = 64       # up to this many signals, find last values by rfind
+
+# (code, value) pairs of a block of dump text, for dict.update at C speed.
+_SCALAR_RE = re.compile(r"^(?=[01xXzZ](\S+)$)([01xXzZ])", re.M)
+_VECTOR_RE = re.compile(r"^(?=[bBrR]\S* (\S+)$)([bBrR]\S*)", re.M)
+
+
+@dataclass
+class Mismatch:
+    time: int
+    signal: str         # hierarchical name
+    expected: str
+    actual: str
+
+
+@dataclass
+class VcdDiff:
+    mismatches: list = field(default_factory=list)      # [Mismatch]
+    compared: int = 0                                   # signals matched by name
+    only_expected: list = field(default_factory=list)   # paths missing from actual
+    only_actual: list = field(default_factory=list)
+    timescale: str = ""
+    end_time: int = 0               # last timestamp read
+    complete: bool = True           # False when reading stopped early
+    window: Optional[dict] = None   # WaveDrom dict around the first mismatch
+
+
+def _open(path):
+    return gzip.open(path, "rt") if str(path).endswith(".gz") else open(path)
+
+
+def _norm(raw: str, width: int) -> str:
+    """Canonical raw value: scalars lower-case, vectors padded to width."""
+    head = raw[0]
+    if head in "bB":
+        bits = raw[1:].lower() or "0"
+        fill = bits[0] if bits[0] in "xz" else "0"
+        return "b" + bits.rjust(width, fill)
+    if head in "rR":
+        return "r" + repr(float(raw[1:]))
+    return head.lower()
+
+
+def display(value: str) -> str:
+    """A canonical value as it reads in a report: 0/1/x, 0x2A, or bits."""
+    if value[0] == "b":
+        bits = value[1:]
+        return bits if set(bits) - {"0", "1"} else f"0x{int(bits, 2):X}"
+    return value[1:] if value[0] == "r" else value
+
+
+def _cut(text: str, n: int) -> int:
+    """Offset of the n-th last timestamp line in text (0 if fewer)."""
+    pos = len(text)
+    for _ in range(n):
+        pos = text.rfind("\n#", 0, pos)
+        if pos < 0:
+            return 0
+    return pos + 1
+
+
+def _last_value(text: str, code: str) -> Optional[str]:
+    """The last raw value dumped for `code` in text, searching backwards."""
+    needle, end = code + "\n", len(text)
+    while True:
+        p = text.rfind(needle, 0, end)
+        if p < 0:
+            return None
+        value = text[text.rfind("\n", 0, p) + 1:p]
+        if len(value) == 1 and value in "01xXzZ":
+            return value
+        if value[:1] in "bBrR" and value.find(" ") == len(value) - 1:
+            return value[:-1]
+        end = p                             # a longer code ending in this one
+
+
+def _absorb(state: dict, text: str, codes) -> int:
+    """Apply the value changes in `text` to state; its last timestamp."""
+    if len(codes) <= SEARCH_CODES:
+        for code in codes:
+            value = _last_value(text, code)
+            if value is not None:
+                state[code] = value
+    else:
+        state.update(_SCALAR_RE.findall(text))
+        state.update(_VECTOR_RE.findall(text))
+    last = text.rfind("\n#")
+    return int(text[last + 2:text.index("\n", last + 1)]) if last >= 0 else 0
+
+
+def _skip_identical(fe, fa, keep: int, codes) -> tuple:
+    """
+    Consume the byte-identical start of two dump bodies (same header, so
+    same codes) without parsing it line by line.
+
+    Returns (raw state after the skipped text, its last timestamp, line
+    iterators for the rest of each dump). The last `keep` timestamps
+    before the first difference are left in the rest, so the window
+    before the first mismatch can still be drawn.
+    """
+    state, end_time, pending = {}, 0, ""
+    while True:
+        a, b = fe.read(CHUNK), fa.read(CHUNK)
+        if a == b and a:
+            text = pending + a
+            cut = _cut(text, keep)
+            if cut:
+                end_time = _absorb(state, text[:cut], codes) or end_time
+            pending = text[cut:]
+            continue
+        lo, hi = 0, min(len(a), len(b))
+        while lo < hi:                      # length of the common prefix
+            mid = (lo + hi + 1) // 2
+            if a[:mid] == b[:mid]:
+                lo = mid
+            else:
+                hi = mid - 1
+        same = pending + a[:lo]
+        cut = _cut(same, keep)
+        if cut:
+            end_time = _absorb(state, same[:cut], codes) or end_time
+        rest = []
+        for f, tail in ((fe, a[lo:]), (fa, b[lo:])):
+            text = same[cut:] + tail
+            if text and not text.endswith("\n"):
+                text += f.readline()        # finish the line the block split
+            rest.append(itertools.chain(text.splitlines(keepends=True), f))
+        return state, end_time, rest[0], rest[1]
+
+
+def _paths(header, signals) -> dict:
+    """{path: VcdVar} for the wanted signals (every alias of a shared code)."""
+    wanted = None if signals is None else list(signals)
+    return {v.path: v for v in header.vars if wanted is None or v.matches(wanted)}
+
+
+def _render_window(base: tuple, history: list, paths: list, codes: dict,
+                   widths: dict) -> Optional[dict]:
+    """WaveDrom dict for `paths` from the raw state `base` (before the
+    window) and `history` [(time, expected batch, actual batch)]."""
+    t0 = history[0][0]
+    vars_, changes = {}, {}
+    for i, path in enumerate(paths):
+        leaf, width = path.rsplit(".", 1)[-1], widths[path]
+        for side, label in ((0, "expected"), (1, "got")):
+            key = f"{i}{label}"
+            code = codes[path][side]
+            vars_[key] = VcdVar(key, f"{leaf} {label}", "", width)
+            ch = [(0, decode_value(_norm(base[side][code], width), width))]
+            for entry in history:
+                for c, raw in entry[1 + side]:
+                    if c == code:
+                        ch.append((entry[0] - t0, decode_value(_norm(raw, width), width)))
+            changes[key] = ch
+    wd = changes_to_wavedrom(vars_, changes, max_cycles=None)
+    if wd is not None:
+        wd["head"] = {"text": f"t = {t0} … {history[-1][0]}"}
+    return wd
+
+
+def diff_vcds(expected, actual, max_mismatches: int = 10,
+              signals: Optional[Iterable[str]] = None, context: int = 16) -> VcdDiff:
+    """
+    Compare two dumps in one streaming pass; see the module docstring.
+
+    ``context`` is the number of timestamps drawn on each side of the
+    first mismatch in ``result.window``. Raises ValueError when the dumps
+    have different timescales (their times would not line up).
+    """
+    with _open(expected) as fe, _open(actual) as fa:
+        he, ha = read_header(fe), read_header(fa)
+        if he.timescale != ha.timescale:
+            raise ValueError(f"timescales differ: {he.timescale or '?'} (expected) "
+                             f"vs {ha.timescale or '?'} (actual)")
+        pe, pa = _paths(he, signals), _paths(ha, signals)
+        common = sorted(set(pe) & set(pa))
+        result = VcdDiff(compared=len(common), timescale=he.timescale,
+                         only_expected=sorted(set(pe) - set(pa)),
+                         only_actual=sorted(set(pa) - set(pe)))
+        widths = {p: pe[p].width for p in common}
+        codes = {p: (pe[p].code, pa[p].code) for p in common}
+        # Per side: code -> [(path, other side's code)]. A code can carry
+        # several names (a testbench wire and the port it drives).
+        links = ({}, {})
+        for p, (ce, ca) in codes.items():
+            links[0].setdefault(ce, []).append((p, ca))
+            links[1].setdefault(ca, []).append((p, ce))
+        # Raw values as dumped, per side; normalised only when they differ.
+        state = ({c: "x" for c in links[0]}, {c: "x" for c in links[1]})
+        body = (fe, fa)
+        if he == ha:                # same codes: agreeing text needs no parse
+            skipped, result.end_time, *body = _skip_identical(
+                fe, fa, context + 1, list(links[0]))
+            for side in (0, 1):
+                state[side].update((c, v) for c, v in skipped.items()
+                                   if c in links[side])
+
+        recent: deque = deque()     # (time, expected batch, actual batch)
+        base = (dict(state[0]), dict(state[1]))     # raw state before `recent`
+        history = None              # frozen window, once a mismatch is seen
+        left = context              # timestamps still to add after it
+        streams = (iter_batches(body[0], links[0]), iter_batches(body[1], links[1]))
+        heads = [next(streams[0], None), next(streams[1], None)]
+        mismatches = result.mismatches
+
+        while heads[0] is not None or heads[1] is not None:
+            he_, ha_ = heads
+            t = he_[0] if ha_ is None or (he_ is not None and he_[0] <= ha_[0]) else ha_[0]
+            batches = ((), ())
+            if he_ is not None and he_[0] == t:
+                batches = (he_[1], ())
+                heads[0] = next(streams[0], None)
+            if ha_ is not None and ha_[0] == t:
+                batches = (batches[0], ha_[1])
+                heads[1] = next(streams[1], None)
+            for side in (0, 1):
+                mine = state[side]
+                for code, raw in batches[side]:
+                    mine[code] = raw
+            result.end_time = t
+
+            seen = set()
+            for side in (0, 1):
+                mine, other = state[side], state[1 - side]
+                for code, _ in batches[side]:
+                    for p, oc in links[side][code]:
+                        if p in seen:
+                            continue
+                        seen.add(p)
+                        a, b = mine[code], other[oc]
+                        if a == b:
+                            continue
+                        exp, act = (a, b) if side == 0 else (b, a)
+                        exp, act = _norm(exp, widths[p]), _norm(act, widths[p])
+                        if exp != act and len(mismatches) < max_mismatches:
+                            mismatches.append(Mismatch(t, p, display(exp), display(act)))
+
+            if history is None:
+                recent.append((t, *batches))
+                if len(recent) > context:
+                    _, old_e, old_a = recent.popleft()
+                    base[0].update(old_e)
+                    base[1].update(old_a)
+                if mismatches:
+                    history = list(recent)
+            elif left > 0:
+                history.append((t, *batches))
+                left -= 1
+
+            if len(mismatches) >= max_mismatches and left == 0:
+                result.complete = heads[0] is None and heads[1] is None
+                break
+
+    if history is not None:
+        diverged = list(dict.fromkeys(m.signal for m in mismatches))
+        result.window = _render_window(base, history, diverged[:WINDOW_SIGNALS],
+                                       codes, widths)
+    return result
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+fetch_wavedrom.py — Vendor the WaveDrom library for offline notebooks.
+
+Downloads the pinned WaveDrom release (wavedrom.min.js + the default skin)
+into shared/hdlwaves/vendor/, where show_waves() picks it up and embeds it
+once per kernel session. Files already present are kept, so the nix
+shell hook and build_all.sh run it on every entry / build and only the
+first one on a networked machine downloads anything. For offline lab
+machines, copy the vendor/ folder (or point $HDLWAVES_WAVEDROM_DIR at a
+shared copy).
+
+Usage:
+    python shared/hdlwaves/fetch_wavedrom.py            # into vendor/
+    python shared/hdlwaves/fetch_wavedrom.py --out DIR  # somewhere else
+    python shared/hdlwaves/fetch_wavedrom.py --force    # download again
+"""
+
+import argparse
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from hdlwaves.wavedrom import WAVEDROM_CDN, WAVEDROM_FILES, vendor_dir  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--out", type=Path, default=None,
+                    help="target directory (default: the hdlwaves vendor dir)")
+    ap.add_argument("--force", action="store_true",
+                    help="download even the files already present")
+    args = ap.parse_args()
+
+    out = args.out or vendor_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    for local, remote in WAVEDROM_FILES:
+        if (out / local).is_file() and not args.force:
+            continue
+        url = f"{WAVEDROM_CDN}/{remote}"
+        try:
+            with urllib.request.urlopen(url, timeout=30) as resp:
+                body = resp.read()
+        except OSError as exc:
+            print(f"fetch_wavedrom.py: {url}: {exc}", file=sys.stderr)
+            return 1
+        (out / local).write_bytes(body)
+        print(f"  {url} → {out / local} ({len(body):,} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
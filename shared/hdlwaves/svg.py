@@ -0,0 +1,221 @@
+"""
+svg.py — Server-side SVG rendering of WaveDrom signal dicts.
+
+Draws the same signal model ``vcd_to_wavedrom`` produces, in pure Python,
+so waveforms can be pre-rendered at build time for the static site and
+shown in notebooks without any JavaScript:
+
+    from hdlwaves.svg import vcd_to_svg
+    Path("uart.svg").write_text(vcd_to_svg("dump.vcd", signals=["o_tx"]))
+
+Supported wave characters: 0 1 x z = p and '.' (continue previous).
+Rendered files are cached by the VCD's content hash (``render_cached``),
+so rebuilding a site only redraws dumps that actually changed.
+
+Command line (from shared/):
+    python -m hdlwaves svg dump.vcd -o dump.svg [--signals clk o_tx]
+"""
+
+import hashlib
+import json
+import shutil
+from html import escape
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .wavedrom import MAX_COLUMNS, vcd_to_wavedrom
+
+# Bump when the drawing changes so cached SVGs are redrawn.
+SVG_RENDERER_VERSION = "1"
+
+ROW_H = 28          # vertical pitch per signal
+WAVE_H = 16         # high-to-low swing
+SLANT = 3           # bus edge slant, px
+FONT = "font-family:monospace;font-size:11px"
+CHAR_W = 7          # approx. monospace glyph width at 11px
+
+COLORS = {
+    "line": "#222", "bus": "#fff8dc", "x": "#ccc",
+    "z": "#1565C0", "grid": "#eee", "text": "#222",
+}
+
+
+def _segments(wave: str, data: list) -> list:
+    """
+    Split a wave string into (start_col, end_col, state, label) runs.
+
+    '.' extends the previous run; every '=' consumes the next data label.
+    """
+    segs: list = []
+    labels = iter(data or [])
+    for col, ch in enumerate(wave):
+        if ch == "." and segs:
+            start, _, state, label = segs[-1]
+            segs[-1] = (start, col + 1, state, label)
+            continue
+        if ch == ".":
+            ch = "x"
+        label = next(labels, "") if ch in "=23456789" else None
+        segs.append((col, col + 1, "=" if label is not None else ch, label))
+    return segs
+
+
+def _draw_signal(out: list, entry: dict, x0: float, y: float, col_w: float):
+    hi, lo, mid = y, y + WAVE_H, y + WAVE_H / 2
+    prev_level = None
+    for start, end, state, label in _segments(entry.get("wave", ""),
+                                              entry.get("data", [])):
+        xa, xb = x0 + start * col_w, x0 + end * col_w
+        if state in "01":
+            level = hi if state == "1" else lo
+            if prev_level is not None and prev_level != level:
+                out.append(f'<line x1="{xa:.1f}" y1="{hi}" x2="{xa:.1f}" '
+                           f'y2="{lo}" stroke="{COLORS["line"]}"/>')
+            out.append(f'<line x1="{xa:.1f}" y1="{level}" x2="{xb:.1f}" '
+                       f'y2="{level}" stroke="{COLORS["line"]}"/>')
+            prev_level = level
+            continue
+        if state == "p":
+            # one high-then-low pulse per column in the run
+            pts = []
+            for c in range(start, end):
+                a, m, b = x0 + c * col_w, x0 + (c + 0.5) * col_w, x0 + (c + 1) * col_w
+                pts += [f"{a:.1f},{lo}", f"{a:.1f},{hi}", f"{m:.1f},{hi}",
+                        f"{m:.1f},{lo}", f"{b:.1f},{lo}"]
+            out.append(f'<polyline points="{" ".join(pts)}" fill="none" '
+                       f'stroke="{COLORS["line"]}"/>')
+            prev_level = lo
+            continue
+        if state == "z":
+            out.append(f'<line x1="{xa:.1f}" y1="{mid}" x2="{xb:.1f}" '
+                       f'y2="{mid}" stroke="{COLORS["z"]}"/>')
+            prev_level = None
+            continue
+
+        # bus ('=') or unknown ('x'): a hexagon, filled or hatched
+        s = min(SLANT, (xb - xa) / 2)
+        pts = (f"{xa:.1f},{mid} {xa + s:.1f},{hi} {xb - s:.1f},{hi} "
+               f"{xb:.1f},{mid} {xb - s:.1f},{lo} {xa + s:.1f},{lo}")
+        fill = COLORS["bus"] if state == "=" else "url(#hatch)"
+        out.append(f'<polygon points="{pts}" fill="{fill}" '
+                   f'stroke="{COLORS["line"]}"/>')
+        if label:
+            room = int((xb - xa - 2 * s) // CHAR_W)
+            text = label if len(label) <= room else (label[:room - 1] + "…" if room > 1 else "")
+            if text:
+                out.append(f'<text x="{(xa + xb) / 2:.1f}" y="{mid + 4}" '
+                           f'text-anchor="middle" style="{FONT}" '
+                           f'fill="{COLORS["text"]}">{escape(text)}</text>')
+        prev_level = None
+
+
+def wavedrom_to_svg(wd: dict, max_width: int = 1600) -> str:
+    """Render a WaveDrom dict (as built by changes_to_wavedrom) to SVG text."""
+    signals = [s for s in wd.get("signal", []) if isinstance(s, dict)]
+    head = (wd.get("head") or {}).get("text", "")
+    n_cols = max((len(s.get("wave", "")) for s in signals), default=0)
+    hscale = (wd.get("config") or {}).get("hscale", 1)
+
+    name_w = CHAR_W * max((len(s.get("name", "")) for s in signals), default=0) + 16
+    col_w = 20.0 * hscale
+    if n_cols and name_w + n_cols * col_w > max_width:
+        col_w = max(2.0, (max_width - name_w) / n_cols)
+    top = 24 if head else 8
+    width = int(name_w + n_cols * col_w + 8)
+    height = int(top + len(signals) * ROW_H + 4)
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" viewBox="0 0 {width} {height}">',
+        '<defs><pattern id="hatch" width="4" height="4" '
+        'patternUnits="userSpaceOnUse" patternTransform="rotate(45)">'
+        f'<rect width="4" height="4" fill="#fff"/>'
+        f'<line x1="0" y1="0" x2="0" y2="4" stroke="{COLORS["x"]}" '
+        'stroke-width="2"/></pattern></defs>',
+        f'<rect width="{width}" height="{height}" fill="#fff"/>',
+    ]
+    if head:
+        out.append(f'<text x="{width / 2:.1f}" y="15" text-anchor="middle" '
+                   f'style="{FONT}" fill="{COLORS["text"]}">{escape(head)}</text>')
+    # light cycle grid, thinned so dense views stay readable
+    every = max(1, int(10 // col_w) + 1)
+    for c in range(0, n_cols + 1, every):
+        x = name_w + c * col_w
+        out.append(f'<line x1="{x:.1f}" y1="{top - 4}" x2="{x:.1f}" '
+                   f'y2="{height - 2}" stroke="{COLORS["grid"]}"/>')
+    for i, entry in enumerate(signals):
+        y = top + i * ROW_H
+        out.append(f'<text x="4" y="{y + WAVE_H - 3}" style="{FONT}" '
+                   f'fill="{COLORS["text"]}">{escape(entry.get("name", ""))}</text>')
+        _draw_signal(out, entry, name_w, y, col_w)
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def vcd_to_svg(vcd_path, max_cycles: Optional[int] = 80,
+               signals: Optional[Iterable[str]] = None,
+               max_columns: Optional[int] = MAX_COLUMNS) -> Optional[str]:
+    """VCD → SVG text (None if there is nothing to draw)."""
+    wd = vcd_to_wavedrom(vcd_path, max_cycles=max_cycles, signals=signals,
+                         max_columns=max_columns)
+    return wavedrom_to_svg(wd) if wd else None
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(vcd_path, **opts) -> str:
+    """Hash of the VCD content, render options and renderer version."""
+    h = hashlib.sha256(_file_sha256(Path(vcd_path)).encode())
+    h.update(json.dumps(opts, sort_keys=True, default=list).encode())
+    h.update(SVG_RENDERER_VERSION.encode())
+    return h.hexdigest()[:16]
+
+
+def render_cached(vcd_path, cache_dir, **opts) -> Optional[Path]:
+    """
+    Render ``vcd_path`` to ``cache_dir/<key>.svg`` unless already cached.
+
+    ``opts`` are passed to vcd_to_svg (max_cycles, signals, max_columns)
+    and are part of the cache key. Returns None if nothing could be drawn.
+    """
+    cache_dir = Path(cache_dir)
+    out = cache_dir / f"{cache_key(vcd_path, **opts)}.svg"
+    if out.exists():
+        return out
+    svg = vcd_to_svg(vcd_path, **opts)
+    if svg is None:
+        return None
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(".tmp")
+    tmp.write_text(svg, encoding="utf-8")
+    tmp.replace(out)
+    return out
+
+
+def prerender(vcd_paths: Iterable[Path], out_dir, cache_dir, **opts) -> dict:
+    """
+    Pre-render VCDs for a static site: {vcd_path: svg file name in out_dir}.
+
+    Each SVG comes from the content-hash cache and is copied into out_dir,
+    so unchanged dumps cost one hash and one copy per build.
+    """
+    out_dir = Path(out_dir)
+    rendered = {}
+    for vcd in vcd_paths:
+        try:
+            svg = render_cached(vcd, cache_dir, **opts)
+        except (OSError, ValueError) as exc:
+            print(f"  ⚠  {vcd}: {exc}")
+            continue
+        if svg is None:
+            continue
+        out_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(svg, out_dir / svg.name)
+        rendered[vcd] = svg.name
+    return rendered
@@ -0,0 +1,214 @@
+"""
+vcd.py — Streaming Value Change Dump reader for iverilog / Verilator dumps.
+
+The header ($scope / $var declarations) is parsed once; the body is then
+walked one line at a time, so memory is bounded by the value changes of
+the signals you ask for rather than by the size of the dump.
+
+    from hdlwaves.vcd import parse_vcd
+    trace = parse_vcd("dump.vcd", signals=["clk", "o_tx"])
+    for code, var in trace.vars.items():
+        print(var.path, trace.changes[code][:4])
+
+Values are decoded the same way the notebook helper always has: scalars
+become 0 / 1 / "x" / "z", vectors become ints (or "x" / "z" when any bit
+is unknown), reals become floats.
+"""
+
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator, Optional, Union
+
+Value = Union[int, float, str]
+
+_SCALAR = {"0": 0, "1": 1, "x": "x", "X": "x", "z": "z", "Z": "z"}
+
+
+@dataclass
+class VcdVar:
+    """One $var declaration."""
+    code: str           # identifier code, e.g. "!"
+    name: str           # leaf name, e.g. "o_tx"
+    scope: str          # dotted scope, e.g. "tb_uart_tx.dut"
+    width: int
+    kind: str = "wire"
+
+    @property
+    def path(self) -> str:
+        """Hierarchical name, e.g. "tb_uart_tx.dut.o_tx"."""
+        return f"{self.scope}.{self.name}" if self.scope else self.name
+
+    def matches(self, wanted: Iterable[str]) -> bool:
+        """True if any entry of ``wanted`` names this var (leaf or path)."""
+        return any(w == self.name or w == self.path for w in wanted)
+
+
+@dataclass
+class VcdHeader:
+    """Declarations from the VCD header."""
+    vars: list = field(default_factory=list)
+    timescale: str = ""
+
+    def select(self, signals: Optional[Iterable[str]] = None) -> dict:
+        """
+        Return {code: VcdVar} for the requested signals (all if None).
+
+        Several declarations can share one code (a testbench wire and the
+        DUT port it drives). The first declaration that matches wins, so
+        the outermost — usually testbench — name is what gets displayed.
+        """
+        wanted = None if signals is None else list(signals)
+        chosen: dict = {}
+        for var in self.vars:
+            if var.code in chosen:
+                continue
+            if wanted is None or var.matches(wanted):
+                chosen[var.code] = var
+        return chosen
+
+
+@dataclass
+class VcdTrace:
+    """Selected declarations plus their value changes."""
+    header: VcdHeader
+    vars: dict                                      # code → VcdVar
+    changes: dict = field(default_factory=dict)     # code → [(time, value)]
+    end_time: int = 0
+
+
+def decode_value(raw: str, width: int = 1) -> Value:
+    """Decode a raw VCD value token ("1", "b1010", "bx01", "r2.5")."""
+    head = raw[0]
+    if head in "bB":
+        bits = raw[1:]
+        if not bits:
+            return 0
+        try:
+            return int(bits, 2)
+        except ValueError:
+            low = bits.lower()
+            return "x" if "x" in low else "z"
+    if head in "rR":
+        return float(raw[1:])
+    return _SCALAR.get(head, "x")
+
+
+def read_header(f: IO[str]) -> VcdHeader:
+    """Consume the header of an open VCD up to and including $enddefinitions."""
+    header = VcdHeader()
+    scopes: list = []
+    tokens: list = []
+    for line in f:
+        tokens.extend(line.split())
+        if "$enddefinitions" in line:
+            break
+
+    i, n = 0, len(tokens)
+    while i < n:
+        tok = tokens[i]
+        if tok == "$scope" and i + 2 < n:
+            scopes.append(tokens[i + 2])
+            i += 3
+        elif tok == "$upscope":
+            if scopes:
+                scopes.pop()
+            i += 1
+        elif tok == "$var" and i + 4 < n:
+            kind, width, code, name = tokens[i + 1:i + 5]
+            header.vars.append(VcdVar(code, name, ".".join(scopes),
+                                      int(width), kind))
+            i += 5
+        elif tok == "$timescale":
+            j = i + 1
+            parts = []
+            while j < n and tokens[j] != "$end":
+                parts.append(tokens[j])
+                j += 1
+            header.timescale = "".join(parts)
+            i = j + 1
+        else:
+            i += 1
+    return header
+
+
+def iter_changes(
+    f: IO[str], codes: Optional[Iterable[str]] = None
+) -> Iterator[tuple]:
+    """
+    Yield (time, code, raw_value) for every value change after the header.
+
+    ``f`` must be positioned just past $enddefinitions (see read_header).
+    When ``codes`` is given, changes to other identifiers are skipped
+    without decoding.
+    """
+    keep = None if codes is None else set(codes)
+    time = 0
+    for line in f:
+        if not line or line[0] in " \t\r\n":
+            line = line.strip()
+            if not line:
+                continue
+        c = line[0]
+        if c == "#":
+            time = int(line[1:])
+        elif c in "01xXzZ":
+            code = line[1:].rstrip()
+            if keep is None or code in keep:
+                yield time, code, c
+        elif c in "bBrR":
+            parts = line.split()
+            if len(parts) == 2 and (keep is None or parts[1] in keep):
+                yield time, parts[1], parts[0]
+        # $dumpvars / $end / $comment and friends carry no changes
+
+
+def iter_batches(
+    f: IO[str], codes: Optional[Iterable[str]] = None
+) -> Iterator[tuple]:
+    """
+    Yield (time, [(code, raw_value), ...]) once per timestamp that has changes.
+
+    Same input and filtering as iter_changes, but one tuple per timestamp
+    instead of per change: single-pass analyses (hdlwaves.diff, coverage,
+    assertions) then do their per-timestamp work once, and the inner loop
+    is cheap enough to keep up with a multi-hundred-MB dump.
+    """
+    keep = None if codes is None else frozenset(codes)
+    time, batch = 0, []
+    for line in f:
+        c = line[:1]
+        if c in " \t":
+            line = line.strip()
+            c = line[:1]
+        if c == "#":
+            if batch:
+                yield time, batch
+                batch = []
+            time = int(line[1:])
+        elif c in "01xXzZ" and c:
+            code = line[1:].rstrip()
+            if keep is None or code in keep:
+                batch.append((code, c))
+        elif c in "bBrR" and c:
+            raw, _, code = line.partition(" ")
+            code = code.strip()
+            if code and (keep is None or code in keep):
+                batch.append((code, raw))
+    if batch:
+        yield time, batch
+
+
+def parse_vcd(path, signals: Optional[Iterable[str]] = None) -> VcdTrace:
+    """Parse a VCD file, keeping value changes only for the chosen signals."""
+    with open(path) as f:
+        header = read_header(f)
+        chosen = header.select(signals)
+        trace = VcdTrace(header=header, vars=chosen)
+        changes = trace.changes
+        widths = {code: var.width for code, var in chosen.items()}
+        last_time = 0
+        for time, code, raw in iter_changes(f, chosen.keys()):
+            changes.setdefault(code, []).append(
+                (time, decode_value(raw, widths[code])))
+            last_time = time
+        trace.end_time = last_time
+    return trace
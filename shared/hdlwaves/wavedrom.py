@@ -0,0 +1,296 @@
+"""
+wavedrom.py — VCD → WaveDrom conversion and inline notebook rendering.
+
+    from hdlwaves import show_waves
+    show_waves("dump.vcd", signals=["clk", "o_tx"], max_cycles=120)
+
+The conversion is display-independent (``vcd_to_wavedrom`` returns a plain
+dict), so build scripts can use it without IPython installed.
+
+Rendering works offline: the WaveDrom library is loaded once per kernel
+session from a vendored copy (see vendor/README.md), and long views are
+bucketed down to ``max_columns`` columns so a 10k-cycle window does not
+ship megabytes of wave strings to the browser.
+"""
+
+import itertools
+import json
+import math
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .vcd import parse_vcd
+
+WAVEDROM_VERSION = "3.5.0"
+WAVEDROM_CDN = f"https://cdnjs.cloudflare.com/ajax/libs/wavedrom/{WAVEDROM_VERSION}"
+# (vendored file, path under the CDN base) in load order
+WAVEDROM_FILES = (
+    ("wavedrom.min.js", "wavedrom.min.js"),
+    ("default.js", "skins/default.js"),
+)
+
+# Widest diagram we send to the browser; longer views are bucketed.
+MAX_COLUMNS = 512
+
+try:
+    _HERE = Path(__file__).resolve().parent
+except NameError:  # inlined into a notebook by md2nb --standalone
+    _HERE = Path.cwd()
+
+
+# {vendored file: source}; md2nb --standalone fills this in so the library
+# travels inside the notebook.
+_EMBEDDED: dict = {}
+
+
+def vendor_dir() -> Path:
+    """Directory holding the vendored WaveDrom files ($HDLWAVES_WAVEDROM_DIR wins)."""
+    override = os.environ.get("HDLWAVES_WAVEDROM_DIR")
+    return Path(override) if override else _HERE / "vendor"
+
+
+def _span(changes: dict) -> Optional[tuple]:
+    """(smallest non-zero delta between changes, last change time)."""
+    all_times = sorted({t for ch in changes.values() for t, _ in ch})
+    if len(all_times) < 2:
+        return None
+    step = min(
+        (b - a for a, b in zip(all_times, all_times[1:]) if b != a),
+        default=None,
+    )
+    return None if step is None else (step, all_times[-1])
+
+
+def _sample_times(span: Optional[tuple], max_cycles: Optional[int]) -> Optional[list]:
+    """Uniform sample grid: one sample per smallest change interval."""
+    if span is None:
+        return None
+    step, last = span
+    end_time = min(last, step * max_cycles) if max_cycles else last
+    times = range(0, end_time + 1, step)
+    return list(times[:max_cycles] if max_cycles else times)
+
+
+def _sample(ch, sample_times: list) -> list:
+    """Zero-order-hold a sorted change list onto the sample grid."""
+    if hasattr(ch, "sample"):  # columnar.Column: binary search, no decoding
+        return ch.sample(sample_times)
+    samples = []
+    cur_val = 0
+    ci, n = 0, len(ch)
+    for t in sample_times:
+        while ci < n and ch[ci][0] <= t:
+            cur_val = ch[ci][1]
+            ci += 1
+        samples.append(cur_val)
+    return samples
+
+
+def _label(v) -> str:
+    return f"0x{v:X}" if isinstance(v, int) else str(v)
+
+
+def _wave_entry(name: str, width: int, samples: list, per_column: int = 1) -> dict:
+    """
+    One WaveDrom signal entry from sampled values.
+
+    Runs are collapsed with '.', so a held value costs one character per
+    column. With ``per_column`` > 1 each column summarises that many
+    samples: it shows the bucket's final value, a 1-bit signal that
+    toggled inside the bucket is drawn as a pulse ('p'), and a bus that
+    changed inside the bucket starts a new labelled segment.
+    """
+    wave = []
+    data = []
+    prev = None          # value the current run is showing
+    prev_char = None
+    for i in range(0, len(samples), per_column):
+        bucket = samples[i:i + per_column]
+        last = bucket[-1]
+        busy = any(a != b for a, b in zip(bucket, bucket[1:]))
+        if width == 1:
+            if busy and per_column > 1:
+                char = "." if prev_char == "p" else "p"
+                prev_char = "p"
+            else:
+                char = last if last in ("x", "z") else str(int(last))
+                if char == prev_char:
+                    char = "."
+                else:
+                    prev_char = char
+            wave.append(char)
+        else:
+            if last == prev and not busy:
+                wave.append(".")
+            else:
+                wave.append("=")
+                data.append(_label(last))
+        prev = last
+
+    entry = {"name": name, "wave": "".join(wave)}
+    if width != 1:
+        entry["data"] = data
+    return entry
+
+
+def changes_to_wavedrom(vars: dict, changes: dict,
+                        max_cycles: Optional[int] = 80,
+                        max_columns: Optional[int] = MAX_COLUMNS,
+                        span: Optional[tuple] = None) -> Optional[dict]:
+    """
+    Build a WaveDrom dict from {code: VcdVar} and {code: [(time, value)]}.
+
+    This is the signal model every renderer shares: one sample per
+    smallest change interval, signals sorted by name. Views longer than
+    ``max_columns`` samples are bucketed (see _wave_entry) and the
+    diagram head notes the cycles per column. ``span`` is the (step,
+    last time) pair when the caller already knows it (columnar stores).
+    """
+    sample_times = _sample_times(span or _span(changes), max_cycles)
+    if sample_times is None:
+        return None
+    per_column = 1
+    if max_columns and len(sample_times) > max_columns:
+        per_column = math.ceil(len(sample_times) / max_columns)
+
+    wave_signals = []
+    for code, var in sorted(vars.items(), key=lambda kv: kv[1].name):
+        ch = changes.get(code, [])
+        if isinstance(ch, list):
+            ch = sorted(ch, key=lambda tv: tv[0])
+        wave_signals.append(_wave_entry(var.name, var.width,
+                                        _sample(ch, sample_times), per_column))
+    wd = {"signal": wave_signals, "config": {"hscale": 1}}
+    if per_column > 1:
+        wd["head"] = {"text": f"{len(sample_times)} cycles · "
+                              f"{per_column} cycles per column"}
+    return wd
+
+
+def vcd_to_wavedrom(vcd_path, max_cycles: Optional[int] = 80,
+                    signals: Optional[Iterable[str]] = None,
+                    max_columns: Optional[int] = MAX_COLUMNS) -> Optional[dict]:
+    """
+    VCD → WaveDrom JSON converter.
+    Works for single-bit and multi-bit signals from iverilog output.
+    ``signals`` entries may be leaf names ("o_tx") or hierarchical paths
+    ("tb_uart_tx.dut.o_tx").
+
+    Repeat queries are served from a memory-mapped columnar cache of the
+    dump (hdlwaves.columnar) when its directory is writable.
+    """
+    span = None
+    try:
+        from . import columnar
+        store = columnar.open_store(vcd_path)
+    except (ImportError, OSError):  # inlined copy, or read-only directory
+        trace = parse_vcd(vcd_path, signals=signals)
+    else:
+        trace = columnar.load(vcd_path, signals=signals)
+        span = store.span(trace.changes)
+    if not trace.vars:
+        print(f"⚠  No matching signals in {vcd_path}")
+        return None
+    return changes_to_wavedrom(trace.vars, trace.changes, max_cycles,
+                               max_columns, span)
+
+
+# Name used by notebooks generated before the helper moved into shared/.
+_vcd_to_wavedrom = vcd_to_wavedrom
+
+
+_loaded = False
+_ids = itertools.count()
+
+
+def _script_safe(text: str) -> str:
+    """Keep embedded JS/JSON from closing the surrounding <script> tag."""
+    return re.sub(r"</(script)", r"<\\/\1", text, flags=re.IGNORECASE)
+
+
+def load_wavedrom(force: bool = False) -> None:
+    """
+    Load the WaveDrom library into the notebook once per kernel session.
+
+    The vendored copy (or the one a --standalone notebook carries) is
+    embedded inline so rendering works with no network. If it is missing,
+    fall back to the CDN (online only).
+    Pass ``force=True`` after clearing the output that carried it.
+    """
+    global _loaded
+    if _loaded and not force:
+        return
+    from IPython.display import HTML, display
+
+    vdir = vendor_dir()
+    if all(local in _EMBEDDED for local, _ in WAVEDROM_FILES):
+        tags = "".join(f"<script>{_script_safe(_EMBEDDED[local])}</script>"
+                       for local, _ in WAVEDROM_FILES)
+    elif all((vdir / local).is_file() for local, _ in WAVEDROM_FILES):
+        tags = "".join(
+            f"<script>{_script_safe((vdir / local).read_text())}</script>"
+            for local, _ in WAVEDROM_FILES
+        )
+    else:
+        print(f"⚠  Vendored WaveDrom not found in {vdir} — loading from the CDN.\n"
+              f"   For offline use run: python shared/hdlwaves/fetch_wavedrom.py")
+        tags = "".join(f'<script src="{WAVEDROM_CDN}/{remote}"></script>'
+                       for _, remote in WAVEDROM_FILES)
+    display(HTML(tags))
+    _loaded = True
+
+
+def _wavedrom_html(wave_dict: dict) -> str:
+    # RenderWaveForm(index, source, prefix) draws into #<prefix><index>;
+    # poll briefly in case the library is still arriving from the CDN.
+    prefix = f"hdlwaves_{os.getpid():x}_{next(_ids)}_"
+    wd_json = _script_safe(json.dumps(wave_dict, separators=(",", ":")))
+    return f"""
+    <div id="{prefix}0"></div>
+    <script>
+    (function render(tries) {{
+        if (window.WaveDrom && window.WaveSkin) {{
+            WaveDrom.RenderWaveForm(0, {wd_json}, "{prefix}");
+        }} else if (tries < 100) {{
+            setTimeout(function () {{ render(tries + 1); }}, 50);
+        }}
+    }})(0);
+    </script>
+    """
+
+
+def show_waves(vcd_path="dump.vcd", max_cycles=80, signals=None, width=900,
+               max_columns=MAX_COLUMNS, svg=False):
+    """
+    Render VCD waveforms inline using WaveDrom.
+
+    With ``svg=True`` the diagram is drawn in Python (hdlwaves.svg) and
+    displayed as a static image — no JavaScript needed.
+    """
+    from IPython.display import HTML, SVG, display
+
+    wd = vcd_to_wavedrom(vcd_path, max_cycles=max_cycles, signals=signals,
+                         max_columns=max_columns)
+    if wd is None:
+        print("No waveform data to display.")
+        return
+    if svg:
+        try:
+            from .svg import wavedrom_to_svg
+        except ImportError:  # inlined copy: only the JS renderer is available
+            print("⚠  SVG renderer needs the hdlwaves package — using WaveDrom.")
+        else:
+            display(SVG(wavedrom_to_svg(wd)))
+            return
+    load_wavedrom()
+    display(HTML(_wavedrom_html(wd)))
+
+
+def show_wavedrom(wave_dict, width=900):
+    """Render a raw WaveDrom JSON dict inline."""
+    from IPython.display import HTML, display
+
+    load_wavedrom()
+    display(HTML(_wavedrom_html(wave_dict)))